@@ -1,70 +1,198 @@
-from flask import Flask, request, render_template
-import pickle
-import numpy as np
-import requests
+from flask import Flask, Response, request, render_template, jsonify, stream_with_context, url_for
+from dataclasses import asdict
+import gc
+import hmac
+import json
 import logging
-from urllib.parse import urlparse, parse_qs
+import math
 import ssl
 import socket
 import os
+import sys
+import threading
+import time
+from src.features import url_error
+from src.logger import configure_logging, parse_sample_rates
+from src.pipeline.probe import Deadline, ProbeConfig, ProbeEngine
+from src.pipeline.probe_jobs import PENDING, ProbeJobConfig, ProbeJobQueue
+from src.pipeline.reputation import ReputationConfig, ReputationIndex
+from src.pipeline.predict_pipeline import PredictPipeline
+from src.pipeline.cache import CacheConfig, build_caches
+from src.pipeline.model_loader import ModelLoaderConfig, ModelWatcher, load_compiled_model, load_model
+from src.pipeline.feedback import FeedbackLog
+from src.pipeline.watchlist import WatchlistConfig, WatchlistStore, parse_since
+from src.pipeline.metrics import REGISTRY, STAGE_LATENCY
 
 app = Flask(__name__)
 
-# Load the model at the start of the application
-model_path = os.path.join(os.path.dirname(__file__), "artifacts", "model.pkl")
-with open(model_path, 'rb') as model_file:
-    model = pickle.load(model_file)
+# Set up logging: records are queued to a background writer, and high-volume
+# probe logs are sampled (LOG_SAMPLE_RATES="probe_response=0.1,...")
+configure_logging(
+    log_file=os.environ.get("LOG_FILE"),
+    stream=sys.stderr,
+    sample_rates=parse_sample_rates(os.environ.get("LOG_SAMPLE_RATES", "probe_response=0.1")),
+)
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+# Load the model at the start of the application. Under `gunicorn --preload`
+# this runs once in the master and workers share the sklearn trees
+# copy-on-write until the first hot reload, after which each worker holds its
+# own copy. The compiled node arrays are memory-mapped and stay shared.
+model_loader_config = ModelLoaderConfig(
+    model_dir=os.environ.get("MODEL_DIR", os.path.join(os.path.dirname(__file__), "artifacts")))
+model = load_model(model_loader_config)
+compiled_model = load_compiled_model(model, model_loader_config)
 
-def is_ssl_certified(url):
-    try:
-        response = requests.get(url)
-        return response.ok
-    except requests.exceptions.SSLError as e:
-        logging.error(f"SSL certificate error for URL {url}: {e}")
-        return False
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Request error for URL {url}: {e}")
-        return False
-def check_server_banner(url):
-    try:
-        response = requests.get(url, timeout=5)
-        logging.info(f"Server banner check response for {url}: {response.status_code}, Headers: {response.headers}")
-        if 'Server' in response.headers:
-            return True, response.headers['Server']
-        else:
-            return False, None
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error in server banner check for {url}: {e}")
-        return False, None
+# Verdict cache keyed by the exact URL and probe cache keyed by scheme+host,
+# optionally shared between workers through a SQLite file
+verdict_cache, probe_cache = build_caches(CacheConfig(
+    verdict_ttl=float(os.environ.get("VERDICT_CACHE_TTL", CacheConfig.verdict_ttl)),
+    probe_ttl=float(os.environ.get("PROBE_CACHE_TTL", CacheConfig.probe_ttl)),
+    shared_path=os.environ.get("CACHE_DB_PATH"),
+))
+# Allow/deny lists answered before the model and the probes (memory-mapped, shared by workers)
+reputation_index = ReputationIndex.load(ReputationConfig(
+    index_dir=os.environ.get("REPUTATION_DIR", model_loader_config.model_dir)))
+# Published model versions are picked up by every worker without a restart
+model_watcher = ModelWatcher(model_loader_config, interval=float(os.environ.get("MODEL_RELOAD_INTERVAL", 5)))
+
+def build_predict_pipeline(model, compiled, version):
+    return PredictPipeline(model, cache=verdict_cache, compiled=compiled, reputation=reputation_index,
+                           cache_namespace=f"{version}:" if version else '')
+
+predict_pipeline = build_predict_pipeline(model, compiled_model, model_watcher.version)
+
+# Analyst-corrected verdicts, folded into the model by src/components/model_updater.py
+feedback_log = FeedbackLog(os.environ.get("FEEDBACK_DB_PATH", os.path.join(model_loader_config.model_dir, "feedback.db")))
+
+# Feedback becomes training data for every worker's model, so it is only accepted with
+# "Authorization: Bearer <FEEDBACK_TOKEN>"; without a token configured the endpoint is disabled
+FEEDBACK_TOKEN = os.environ.get("FEEDBACK_TOKEN")
+
+# URLs re-scanned on a schedule by `python src/pipeline/watchlist.py run`; the app registers them and reads changes
+watchlist = WatchlistStore(os.environ.get("WATCHLIST_DB_PATH", os.path.join(model_loader_config.model_dir, "watchlist.db")))
+
+# Largest number of URLs accepted by one batch prediction request
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", 10000))
+
+# Shared probe engine: pooled keep-alive connections, coalesced per-site probes and
+# per-host plus global limits on outbound checks
+probe_engine = ProbeEngine(ProbeConfig(
+    connect_timeout=float(os.environ.get("PROBE_CONNECT_TIMEOUT", ProbeConfig.connect_timeout)),
+    read_timeout=float(os.environ.get("PROBE_READ_TIMEOUT", ProbeConfig.read_timeout)),
+    max_workers=int(os.environ.get("PROBE_MAX_WORKERS", ProbeConfig.max_workers)),
+    per_host_concurrency=int(os.environ.get("PROBE_PER_HOST_CONCURRENCY", ProbeConfig.per_host_concurrency)),
+    per_host_rate=float(os.environ.get("PROBE_PER_HOST_RATE", ProbeConfig.per_host_rate)),
+    max_outbound=int(os.environ.get("PROBE_MAX_OUTBOUND", ProbeConfig.max_outbound)),
+), cache=probe_cache)
+
+# Background probe jobs: /predict returns the verdict and the checks arrive later
+ASYNC_PROBES = os.environ.get("ASYNC_PROBES", "1") != "0"
+probe_jobs = ProbeJobQueue(probe_engine, ProbeJobConfig(
+    max_pending=int(os.environ.get("PROBE_MAX_PENDING", ProbeJobConfig.max_pending)),
+    ttl=float(os.environ.get("PROBE_JOB_TTL", ProbeJobConfig.ttl)),
+    shared_path=os.environ.get("CACHE_DB_PATH"),
+))
+# Time budget (seconds) for answering /predict and synchronous batch probes, counted from
+# the request's arrival; callers may ask for another with `deadline`, up to PREDICT_MAX_DEADLINE
+PREDICT_DEADLINE = float(os.environ.get("PREDICT_DEADLINE", 6))
+PREDICT_MAX_DEADLINE = float(os.environ.get("PREDICT_MAX_DEADLINE", 30))
 
-def check_hsts(url):
-    # Function to check if HTTP Strict Transport Security (HSTS) is enabled
+# Longest a server-sent events stream waits for a job before giving up
+PROBE_EVENTS_TIMEOUT = float(os.environ.get("PROBE_EVENTS_TIMEOUT", 30))
+# An open event stream occupies a worker thread, so streams need threaded (gthread) or gevent
+# workers and are capped per worker; callers beyond the cap are told to poll instead
+PROBE_EVENT_STREAMS = int(os.environ.get("PROBE_EVENT_STREAMS", 4))
+event_stream_slots = threading.BoundedSemaphore(PROBE_EVENT_STREAMS) if PROBE_EVENT_STREAMS > 0 else None
+
+# Keep startup objects out of future GC passes so forked workers don't
+# touch (and copy) the pages holding them
+gc.freeze()
+
+# Placeholders shown while the checks run in the background, in display order
+PROBE_PENDING_MESSAGES = ["⏳ SSL Certificate: checking...", "⏳ Server banner: checking...",
+                          "⏳ HSTS: checking...", "⏳ X-XSS-Protection: checking..."]
+PROBE_BUSY_MESSAGES = ["⚠️ Security checks are busy right now, please try again shortly.", "", "", ""]
+
+def request_deadline(value):
+    # Deadline for a request from the caller's `deadline` seconds (default when None), or None if invalid
     try:
-        response = requests.get(url, timeout=5)
-        logging.info(f"HSTS check response for {url}: {response.status_code}, Headers: {response.headers}")
-        if 'Strict-Transport-Security' in response.headers:
-            return True, response.headers['Strict-Transport-Security']
-        else:
-            return False, None
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error in HSTS check for {url}: {e}")
-        return False, None
+        seconds = PREDICT_DEADLINE if value is None else float(value)
+    except (TypeError, ValueError):
+        return None
+    if not seconds > 0:
+        return None
+    return Deadline(min(seconds, PREDICT_MAX_DEADLINE))
+
+def describe_probe(probe):
+    # Human-readable lines for the SSL, banner, HSTS and XSS checks, in display order
+    certificate = probe.certificate
+    if 'certificate' in probe.timed_out:
+        result3 = "⏱️ SSL Certificate: check timed out before the response deadline."
+    elif probe.ssl_valid and certificate is not None and certificate.issuer:
+        result3 = (f"✅ SSL Certificate: The website has a valid SSL certificate issued by "
+                   f"{certificate.issuer}, expiring in {certificate.expires_in_days} days.")
+    elif probe.ssl_valid:
+        result3 = "✅ SSL Certificate: The website has a valid SSL certificate."
+    else:
+        result3 = "❌ SSL Certificate: The website does not have a valid SSL certificate."
+
+    server_banner = probe.finding('server_banner')
+    if server_banner.timed_out:
+        result4 = "⏱️ Server banner: check timed out before the response deadline."
+    elif server_banner.present:
+        result4 = "✅ Server banner is present for the website."
+    elif server_banner.error:
+        result4 = "❌ Error occurred in checking server banner."
+    else:
+        result4 = "❌ No server banner detected for the website."
 
-def check_x_xss_protection(url):
-    # Function to check if X-XSS-Protection is set
+    hsts = probe.finding('hsts')
+    if hsts.timed_out:
+        result5 = "⏱️ HSTS: check timed out before the response deadline."
+    elif hsts.present:
+        result5 = "✅ HSTS is enabled for the website."
+    elif hsts.error:
+        result5 = "❌ Error occurred in checking HSTS."
+    else:
+        result5 = "❌ HSTS is not enabled for the website."
+
+    x_xss_protection = probe.finding('x_xss_protection')
+    if x_xss_protection.timed_out:
+        result6 = "⏱️ X-XSS-Protection: check timed out before the response deadline."
+    elif x_xss_protection.present:
+        result6 = "✅ X-XSS-Protection is set for the website."
+    elif x_xss_protection.error:
+        result6 = "❌ Error occurred in checking X-XSS-Protection."
+    else:
+        result6 = "❌ X-XSS-Protection is not set for the website."
+    return [result3, result4, result5, result6]
+
+def job_payload(job):
+    # JSON view of a probe job, with display lines once it has finished
+    payload = {'id': job.id, 'url': job.url, 'status': job.status}
+    if job.result is not None:
+        payload['results'] = describe_probe(job.result)
+        payload['probe'] = asdict(job.result)
+    elif job.error is not None:
+        payload['error'] = job.error
+        payload['results'] = ["❌ Error occurred in running the security checks."] * 4
+    return payload
+
+@app.before_request
+def reload_model():
+    # Swap in a newly published model; requests already running keep the pipeline they started with
+    global predict_pipeline
+    version = model_watcher.poll()
+    if version is None:
+        return
     try:
-        response = requests.get(url, timeout=5)
-        logging.info(f"X-XSS-Protection check response for {url}: {response.status_code}, Headers: {response.headers}")
-        if 'X-XSS-Protection' in response.headers:
-            return True, response.headers['X-XSS-Protection']
-        else:
-            return False, None
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error in X_XSS-Protection check for {url}: {e}")
-        return False, None
+        new_model = load_model(model_loader_config)
+        new_compiled = load_compiled_model(new_model, model_loader_config)
+    except Exception as e:
+        logging.error(f"Could not load model version {version}, keeping the current one: {e}")
+        return
+    predict_pipeline = build_predict_pipeline(new_model, new_compiled, version)
+    logging.info(f"Serving model version {version}")
 
 @app.route('/')
 def home():
@@ -72,128 +200,237 @@ def home():
     return render_template('home.html', prediction_text='')
 
 @app.route('/predict', methods=['GET', 'POST'])
+@STAGE_LATENCY.time(stage="predict_total")
 def predict():
         # Route to handle URL prediction requests
+        # The whole response is bounded: checks still running at the deadline are reported as timed out
+        deadline = request_deadline(request.values.get('deadline'))
+        if deadline is None:
+            return render_template('home.html', prediction_made=True,
+                                   result1="⚠️ 'deadline' must be a positive number of seconds."), 400
         url = str(request.form['urlinput'])
         inputurl = f'Entered Website: {url}'
-        parsed_url = urlparse(url)
-        domain = parsed_url.netloc
         prediction_made = True
 
+        # Extracting the URL features and scoring them with the loaded model
+        prediction = predict_pipeline.predict_one(url)
+        if prediction.error is not None:
+            return render_template('home.html', prediction_made=True, inputurl=inputurl,
+                                   result1=f"⚠️ {prediction.error}"), 400
+        probability = prediction.probability
+        safe_status = prediction.safe_status
 
-        # Counting occurrences of characters and vowels in the domain
-        qty_hyphen_domain = domain.count('-')
-
-        # Extracting the path and parameters from the URL
-        parsed_url = urlparse(url)
-        path = parsed_url.path
-
-        # Counting occurrences of characters in the URL
-        qty_tilde_url = url.count('~')
-        qty_dot_url = url.count('.')
-        qty_percent_url = url.count('%')
-        params_length = len(parse_qs(parsed_url.query))
-        qty_and_params = url.count('&')
-        qty_hyphens_params = url.count('-')
-        directory_length = len(parsed_url.path.split('/'))
-        qty_equal_params = url.count('=')
-        qty_equal_url = url.count('=')
-        qty_slash_url = url.count('/')
-        qty_slash_directory = url.count('/') - 1
-        file_length = len(parsed_url.path.split('/')[-1])
-        qty_and_url = url.count('&')
-        qty_dot_params = url.count('.')
-
-        # Creating a list with the required values
-        result_list = [
-            len(domain),
-            len(path),
-            len(url.split('/')[-1]),
-            url.count('-'),
-            url.count('@'),
-            url.count('?'),
-            url.count('%'),
-            url.count('.'),
-            url.count('='),
-            url.count('http'),
-            url.count('https'),
-            url.count('www'),
-            sum(c.isdigit() for c in url),
-            sum(c.isalpha() for c in url),
-            url.count('/'),
-            1 if domain.replace('.', '').isdigit() else 0,
-            # ... other values ...
-            qty_hyphen_domain,
-            len(url),
-            qty_tilde_url,
-            qty_dot_url,
-            qty_percent_url,
-            len(domain),
-            params_length,
-            qty_and_params,
-            qty_hyphens_params,
-            directory_length,
-            qty_equal_params,
-            qty_equal_url,
-            qty_slash_url,
-            qty_slash_directory,
-            file_length,
-            qty_and_url,
-            qty_dot_params
-        ]
-        # Creating a numpy array from the extracted features and reshaping for the model
-        input_data_as_numpy_array = np.asarray(result_list)
-        input_data_reshaped = input_data_as_numpy_array.reshape(1, -1)
-            
-        # Making the prediction using the loaded model
-        prediction = model.predict(input_data_reshaped)
-
-        # Determining the prediction result and calculating the probability
-        if str(prediction[0]) == '0':
+        # Determining the prediction result
+        if safe_status == 'safe':
             result1 = f'🟢 Status: {url} website is ✅SAFE to visit.'
-            probability = model.predict_proba(input_data_reshaped)[0][1] * 100
-            probability = round(probability, 2)
             result2 = f"🔒 Safety Probability: {probability}% chance of being ✅safe."
-            safe_status='safe'
         else:
             result1 = f'🔴 Status: : {url} website is ❌NOT SAFE to visit.'
-            probability = model.predict_proba(input_data_reshaped)[0][1] * 100
-            probability = round(probability, 2)
             result2 = f"🔓 Safety Probability: {probability}% chance the Website is ❌malicious!"
-            safe_status='unsafe'
 
-        if is_ssl_certified(url):
-            result3 = "✅ SSL Certificate: The website has a valid SSL certificate."
-        else:
-            result3 = "❌ SSL Certificate: The website does not have a valid SSL certificate."
-            
-        server_banner,server_banner_error  = check_server_banner(url)
-        if server_banner:
-            result4 = "✅ Server banner is present for the website."
-        elif server_banner_error:
-            result4 = "❌ Error occurred in checking server banner."
+        probe_job = None
+        if prediction.source != 'model':
+            # Listed sites are known good or bad, so the outbound checks are skipped
+            probe_results = [f"ℹ️ Security checks skipped: this website is on the {prediction.source} list.", "", "", ""]
+        elif ASYNC_PROBES:
+            # Queue the checks instead of waiting on third-party sites; the page fetches them later
+            probe_job = probe_jobs.submit(url)
+            if probe_job is None:
+                probe_results = PROBE_BUSY_MESSAGES
+            elif probe_job.status == PENDING:
+                probe_results = PROBE_PENDING_MESSAGES
+            else:
+                probe_results = job_payload(probe_job)['results']
+                probe_job = None
         else:
-            result4 = "❌ No server banner detected for the website."
-
-        
-        hsts_enabled, hsts_error = check_hsts(url)
-        if hsts_enabled:
-            result5 = "✅ HSTS is enabled for the website."
-        elif hsts_error:
-            result5 = "❌ Error occurred in checking HSTS."
-        else:
-            result5 = "❌ HSTS is not enabled for the website."
-
-        x_xss_protection, x_xss_error = check_x_xss_protection(url)
-        if x_xss_protection:
-            result6 = "✅ X-XSS-Protection is set for the website."
-        elif x_xss_error:
-            result6 = "❌ Error occurred in checking X-XSS-Protection."
-        else:
-            result6 = "❌ X-XSS-Protection is not set for the website."
+            # One bounded request feeds every header analyzer; TLS comes from a handshake-only check.
+            # Both run side by side; the page waits for them only as long as the deadline allows.
+            with STAGE_LATENCY.time(stage="probe_wait"):
+                probe = probe_engine.result_within(probe_engine.submit(url, deadline=deadline), deadline)
+            probe_results = describe_probe(probe)
+        result3, result4, result5, result6 = probe_results
 
         # Render the prediction results back to the home page template
-        return render_template('home.html',prediction_made=prediction_made,inputurl=inputurl, result1=result1, result2=result2, result3=result3,result4=result4,result5=result5,result6=result6,safe_status=safe_status)
+        with STAGE_LATENCY.time(stage="render"):
+            return render_template('home.html',prediction_made=prediction_made,inputurl=inputurl, result1=result1, result2=result2, result3=result3,result4=result4,result5=result5,result6=result6,safe_status=safe_status,probe_job_id=probe_job.id if probe_job else None)
+
+@app.route('/api/predict/batch', methods=['POST'])
+@STAGE_LATENCY.time(stage="predict_batch_total")
+def predict_batch():
+    # Route to score a JSON list of URLs in one model call
+    payload = request.get_json(silent=True)
+    if isinstance(payload, list):
+        payload = {'urls': payload}
+    if not isinstance(payload, dict):
+        return jsonify(error="Expected a JSON list of URLs or an object with a 'urls' list."), 400
+
+    urls = payload.get('urls')
+    if not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+        return jsonify(error="'urls' must be a list of strings."), 400
+    if len(urls) > MAX_BATCH_SIZE:
+        return jsonify(error=f"At most {MAX_BATCH_SIZE} URLs are accepted per request."), 413
+    deadline = request_deadline(payload.get('deadline'))
+    if deadline is None:
+        return jsonify(error="'deadline' must be a positive number of seconds."), 400
+
+    predictions = predict_pipeline.predict(urls)
+    results = []
+    for prediction in predictions:
+        # Malformed URLs get an error entry in place; the rest of the batch is still scored
+        if prediction.error is not None:
+            results.append({'url': prediction.url, 'source': prediction.source, 'error': prediction.error})
+            continue
+        results.append({
+            'url': prediction.url,
+            'label': prediction.label,
+            'status': prediction.safe_status,
+            'probability': prediction.probability,
+            'source': prediction.source,
+        })
+
+    # Network probes are optional so high-volume callers get pure model throughput;
+    # "async" queues them as jobs and returns their ids instead of waiting.
+    # URLs answered by the reputation index are never probed.
+    run_probes = payload.get('probe', True)
+    probed = [i for i, prediction in enumerate(predictions) if prediction.source == 'model'] if run_probes else []
+    if run_probes == 'async':
+        for i in probed:
+            job = probe_jobs.submit(urls[i])
+            results[i]['probe_job'] = job.id if job is not None else None
+    else:
+        # Waits for the probes share the request's deadline; checks left unfinished are listed in "timed_out"
+        probe_futures = [probe_engine.submit(urls[i], deadline=deadline) for i in probed]
+        for i, future in zip(probed, probe_futures):
+            results[i]['probe'] = asdict(probe_engine.result_within(future, deadline))
+
+    return jsonify(results=results)
+
+@app.route('/api/probe/<job_id>')
+def probe_job_status(job_id):
+    # Route reporting a background probe job; poll until status is no longer "pending"
+    job = probe_jobs.get(job_id)
+    if job is None:
+        return jsonify(error="Unknown or expired probe job."), 404
+    return jsonify(job_payload(job))
+
+@app.route('/api/probe/<job_id>/events')
+def probe_job_events(job_id):
+    # Route streaming a probe job's result as a server-sent event once it finishes
+    if probe_jobs.get(job_id) is None:
+        return jsonify(error="Unknown or expired probe job."), 404
+    if event_stream_slots is None or not event_stream_slots.acquire(blocking=False):
+        return jsonify(error="Too many open event streams; poll the job instead.",
+                       poll=url_for('probe_job_status', job_id=job_id)), 503
+
+    def events():
+        deadline = time.monotonic() + PROBE_EVENTS_TIMEOUT
+        while True:
+            job = probe_jobs.wait(job_id, timeout=min(5, max(0, deadline - time.monotonic())))
+            if job is None or job.status != PENDING:
+                payload = job_payload(job) if job else {'id': job_id, 'status': 'expired'}
+                yield f"event: result\ndata: {json.dumps(payload)}\n\n"
+                return
+            if time.monotonic() >= deadline:
+                yield f"event: timeout\ndata: {json.dumps({'id': job_id, 'status': PENDING})}\n\n"
+                return
+            # Comment line keeps proxies from closing an idle stream
+            yield ": pending\n\n"
+
+    response = Response(stream_with_context(events()), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # Runs once the stream ends or the client goes away, even if it was never read
+    response.call_on_close(event_stream_slots.release)
+    return response
+
+@app.route('/api/feedback', methods=['POST'])
+def feedback():
+    # Route recording analyst-corrected verdicts: {"url": ..., "label": 0|1|"safe"|"unsafe"} or a list of them
+    if not FEEDBACK_TOKEN:
+        return jsonify(error="Feedback is disabled; set FEEDBACK_TOKEN to enable it."), 403
+    supplied = request.headers.get('Authorization', '').encode('utf-8')
+    if not hmac.compare_digest(supplied, f"Bearer {FEEDBACK_TOKEN}".encode('utf-8')):
+        return jsonify(error="A valid feedback token is required."), 401, {'WWW-Authenticate': 'Bearer'}
+    payload = request.get_json(silent=True)
+    items = payload if isinstance(payload, list) else [payload]
+    urls, labels = [], []
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get('url'), str):
+            return jsonify(error="Each feedback item needs a 'url' string and a 'label'."), 400
+        # Malformed URLs cannot be featurized, so they are rejected before anything is recorded
+        error = url_error(item['url'])
+        if error is not None:
+            return jsonify(error=f"Invalid URL {item['url']!r}: {error}"), 400
+        label = item.get('label')
+        if isinstance(label, str):
+            label = {'safe': 0, 'unsafe': 1}.get(label, label)
+        if label not in (0, 1) or isinstance(label, bool):
+            return jsonify(error="'label' must be 0/'safe' or 1/'unsafe'."), 400
+        urls.append(item['url'])
+        labels.append(label)
+    if len(urls) > MAX_BATCH_SIZE:
+        return jsonify(error=f"At most {MAX_BATCH_SIZE} feedback items are accepted per request."), 413
+    last_id = feedback_log.record(urls, labels)
+    return jsonify(recorded=len(urls), last_id=last_id, model_version=model_watcher.version)
+
+@app.route('/api/watchlist', methods=['POST', 'DELETE'])
+def watchlist_targets():
+    # Route registering URLs for continuous monitoring ({"urls": [...], "interval": seconds}) or removing them
+    payload = request.get_json(silent=True)
+    urls = payload.get('urls') if isinstance(payload, dict) else None
+    if not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+        return jsonify(error="Expected an object with a 'urls' list of strings."), 400
+    if len(urls) > MAX_BATCH_SIZE:
+        return jsonify(error=f"At most {MAX_BATCH_SIZE} URLs are accepted per request."), 413
+    if request.method == 'DELETE':
+        return jsonify(removed=watchlist.remove(urls))
+    interval = payload.get('interval', WatchlistConfig.interval)
+    try:
+        # Infinity and NaN parse from JSON but would give NaN due times, so the URLs would never be scanned
+        valid = not isinstance(interval, bool) and math.isfinite(interval) and interval >= WatchlistConfig.min_interval
+    except (TypeError, OverflowError):
+        valid = False
+    if not valid:
+        return jsonify(error=f"'interval' must be a finite number of at least {WatchlistConfig.min_interval:.0f} seconds."), 400
+    return jsonify(watching=watchlist.add(urls, float(interval)), interval=interval)
+
+@app.route('/api/watchlist/changes')
+def watchlist_changes():
+    # Route listing watchlist changes detected after ?since= (epoch seconds or ISO 8601), optionally for one ?url=
+    try:
+        since = parse_since(request.args.get('since', '0'))
+        after_id = int(request.args.get('after_id', 0))
+        limit = min(int(request.args.get('limit', 1000)), MAX_BATCH_SIZE)
+    except ValueError:
+        return jsonify(error="'since' must be epoch seconds or an ISO 8601 timestamp; "
+                             "'after_id' and 'limit' integers."), 400
+    # SQLite reads a negative LIMIT as no limit, which would bypass the cap
+    if limit < 1:
+        return jsonify(error="'limit' must be at least 1."), 400
+    changes = watchlist.changes(since, url=request.args.get('url'), after_id=after_id, limit=limit)
+    # Passing last_id back as ?after_id= pages through the log
+    return jsonify(changes=changes, last_id=changes[-1]['id'] if changes else after_id)
+
+@app.route('/api/cache/stats')
+def cache_stats():
+    # Route exposing hit/miss counters of the verdict and probe caches
+    return jsonify(verdicts=verdict_cache.stats(), probes=probe_cache.stats())
+
+def collect_cache_metrics():
+    # Expose the verdict and probe cache counters alongside the request metrics
+    lines = ["# HELP slm_cache_requests_total Cache lookups by cache, tier and result.",
+             "# TYPE slm_cache_requests_total counter"]
+    for cache_name, cache in (("verdicts", verdict_cache), ("probes", probe_cache)):
+        for tier, stats in cache.stats().items():
+            for result in ("hits", "misses"):
+                lines.append(f'slm_cache_requests_total{{cache="{cache_name}",tier="{tier}",result="{result}"}} {stats[result]}')
+    return lines
+
+REGISTRY.add_collector(collect_cache_metrics)
+
+@app.route('/metrics')
+def metrics():
+    # Route exposing this worker's latency histograms and counters in Prometheus text format
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
 
 if __name__ == "__main__":
     app.run(debug=True)
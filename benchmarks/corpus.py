@@ -0,0 +1,39 @@
+import random
+
+# Building blocks for synthetic URLs; phishing-style URLs favour IP hosts,
+# long paths, credential keywords and heavy query strings
+BENIGN_HOSTS = ["www.example.com", "docs.python.org", "github.com", "news.ycombinator.com",
+                "en.wikipedia.org", "mail.google.com", "www.bbc.co.uk", "shop.example.org"]
+PHISHING_WORDS = ["login", "verify", "account", "secure", "update", "banking", "signin", "confirm"]
+TLDS = ["com", "net", "xyz", "top", "info", "ru", "tk"]
+
+
+def synthetic_url(rng, phishing):
+    if not phishing:
+        path = "/".join(rng.choice(["docs", "wiki", "news", "item", "en", "2024", "about"])
+                        for _ in range(rng.randint(0, 4)))
+        query = f"?id={rng.randint(1, 99999)}" if rng.random() < 0.3 else ""
+        return f"https://{rng.choice(BENIGN_HOSTS)}/{path}{query}"
+
+    if rng.random() < 0.3:
+        host = ".".join(str(rng.randint(1, 254)) for _ in range(4))
+    else:
+        host = "-".join(rng.sample(PHISHING_WORDS, rng.randint(1, 3))) + f"{rng.randint(0, 999)}.{rng.choice(TLDS)}"
+    path = "/".join(rng.choice(PHISHING_WORDS) + rng.choice(["", ".php", ".html", "~user"])
+                    for _ in range(rng.randint(1, 6)))
+    query = "&".join(f"{rng.choice(PHISHING_WORDS)}={rng.randint(0, 10**6)}%20" for _ in range(rng.randint(0, 5)))
+    scheme = rng.choice(["http", "https"])
+    return f"{scheme}://{host}/{path}" + (f"?{query}" if query else "")
+
+
+def synthetic_corpus(size, phishing_rate=0.4, seed=0):
+    """
+    Generate a reproducible labelled URL corpus.
+
+    Returns:
+    tuple: (urls, labels) with label 1 for phishing-style URLs.
+    """
+    rng = random.Random(seed)
+    labels = [1 if rng.random() < phishing_rate else 0 for _ in range(size)]
+    urls = [synthetic_url(rng, label == 1) for label in labels]
+    return urls, labels
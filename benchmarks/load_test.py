@@ -0,0 +1,258 @@
+"""
+End-to-end load test of the gunicorn deployment against local stub sites.
+
+For each gunicorn worker/thread configuration the harness starts the app
+(`gunicorn --preload app:app`) pointed at a benchmark model, starts HTTP
+and HTTPS stub target sites (see stub_sites.py) whose CA the app trusts,
+then drives /predict and /api/predict/batch with a fixed number of
+concurrent clients for a fixed time and reports throughput and latency
+percentiles as JSON.
+
+    python benchmarks/load_test.py --configs 1x1,2x4,4x8 --concurrency 16 --duration 20
+    python benchmarks/load_test.py --probe-mode sync --mix secure=4,slow=1,hang=1
+
+Caches are disabled by default so every request scores the model and
+probes a stub; per-host probe limits are lifted because every stub shares
+the 127.0.0.1 address. Pass --keep-limits / --cache to measure the
+production settings instead.
+"""
+import argparse
+import json
+import os
+import platform
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+# Adding the project root to the system path for module import
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+import requests
+from sklearn.ensemble import RandomForestClassifier
+
+from benchmarks.corpus import synthetic_corpus
+from benchmarks.run_benchmarks import percentiles
+from benchmarks.stub_sites import StubSites
+from src.pipeline.compiled_tree import export_tree_model
+from src.pipeline.predict_pipeline import PredictPipeline
+from src.utils import save_mmap_object
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def build_model_dir(directory, train_size, seed):
+    # Train a benchmark forest on a synthetic corpus and write the serving artifacts
+    urls, labels = synthetic_corpus(train_size, seed=seed)
+    X = PredictPipeline(model=None).build_features(urls)
+    model = RandomForestClassifier(n_estimators=50, random_state=seed).fit(X, np.asarray(labels))
+    save_mmap_object(os.path.join(directory, "model.joblib"), model)
+    export_tree_model(model, os.path.join(directory, "model_trees.npz"))
+    return directory
+
+
+def app_environment(args, model_dir, ca_path):
+    env = dict(os.environ)
+    env.update({
+        "MODEL_DIR": model_dir,
+        "REPUTATION_DIR": model_dir,
+        "FEEDBACK_DB_PATH": os.path.join(model_dir, "feedback.db"),
+        "ASYNC_PROBES": "1" if args.probe_mode == "async" else "0",
+        "PROBE_CONNECT_TIMEOUT": str(args.probe_timeout),
+        "PROBE_READ_TIMEOUT": str(args.probe_timeout),
+        "LOG_SAMPLE_RATES": "probe_response=0",
+    })
+    if ca_path:
+        # Trust the stub CA for both the header fetch and the certificate inspection
+        env["REQUESTS_CA_BUNDLE"] = ca_path
+        env["SSL_CERT_FILE"] = ca_path
+    if args.deadline:
+        env["PREDICT_DEADLINE"] = str(args.deadline)
+    if not args.cache:
+        env["VERDICT_CACHE_TTL"] = "0"
+        env["PROBE_CACHE_TTL"] = "0"
+    if not args.keep_limits:
+        env["PROBE_PER_HOST_RATE"] = "1000000"
+        env["PROBE_PER_HOST_CONCURRENCY"] = "1024"
+        env["PROBE_MAX_OUTBOUND"] = "1024"
+    return env
+
+
+class GunicornServer:
+    # A gunicorn process serving app:app with the given worker and thread counts
+    def __init__(self, workers, threads, env, timeout):
+        self.port = free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        command = [
+            sys.executable, "-m", "gunicorn", "--preload", "app:app",
+            "--bind", f"127.0.0.1:{self.port}",
+            "--workers", str(workers), "--threads", str(threads),
+            "--timeout", str(timeout), "--log-level", "warning",
+        ]
+        self.process = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def wait_ready(self, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with code {self.process.returncode}")
+            try:
+                if requests.get(f"{self.base_url}/", timeout=1).status_code == 200:
+                    return
+            except requests.RequestException:
+                time.sleep(0.2)
+        raise RuntimeError("gunicorn did not become ready")
+
+    def stop(self):
+        self.process.send_signal(signal.SIGTERM)
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def drive(send, payloads, concurrency, duration, warmup):
+    """
+    Run `send(session, payload)` from `concurrency` closed-loop clients.
+
+    Returns:
+    dict: Requests, errors, throughput and latency percentiles after warmup.
+    """
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    start = time.monotonic()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    def client(index):
+        session = requests.Session()
+        i = index
+        while True:
+            sent = time.monotonic()
+            if sent >= stop_at:
+                return
+            try:
+                ok = send(session, payloads[i % len(payloads)])
+            except requests.RequestException:
+                ok = False
+            done = time.monotonic()
+            i += concurrency
+            if sent < measure_from:
+                continue
+            with lock:
+                latencies.append(done - sent)
+                if not ok:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    result = {"requests": len(latencies), "errors": errors[0], "throughput_rps": len(latencies) / duration}
+    if latencies:
+        # Milliseconds read better than microseconds for whole HTTP requests
+        result["latency"] = {key.replace("_us", "_ms"): (value if key == "n" else value / 1000)
+                             for key, value in percentiles(latencies).items()}
+    return result
+
+
+def run_config(args, workers, threads, model_dir, stubs):
+    server = GunicornServer(workers, threads, app_environment(args, model_dir, stubs.ca_path), args.request_timeout)
+    try:
+        server.wait_ready()
+        urls = stubs.urls(max(args.concurrency * 50, args.batch_size), mix=args.mix, seed=args.seed)
+        predict_url = f"{server.base_url}/predict"
+        batch_url = f"{server.base_url}/api/predict/batch"
+        timeout = args.request_timeout
+
+        def send_predict(session, url):
+            return session.post(predict_url, data={"urlinput": url}, timeout=timeout).status_code == 200
+
+        def send_batch(session, batch):
+            response = session.post(batch_url, json={"urls": batch, "probe": args.batch_probe}, timeout=timeout)
+            return response.status_code == 200
+
+        batches = [urls[i:i + args.batch_size] for i in range(0, len(urls) - args.batch_size + 1, args.batch_size)]
+        results = {"predict": drive(send_predict, urls, args.concurrency, args.duration, args.warmup)}
+        if not args.skip_batch:
+            results["predict_batch"] = drive(send_batch, batches, args.batch_concurrency, args.duration, args.warmup)
+            results["predict_batch"]["urls_per_s"] = results["predict_batch"]["throughput_rps"] * args.batch_size
+        return results
+    finally:
+        server.stop()
+
+
+def parse_mix(spec):
+    # "secure=4,slow=1" -> {"secure": 4.0, "slow": 1.0}
+    if not spec:
+        return None
+    return {name: float(weight) for name, weight in (item.split("=") for item in spec.split(","))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--configs", default="1x1,2x4,4x8", help="Comma-separated WORKERSxTHREADS gunicorn configurations")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent /predict clients")
+    parser.add_argument("--batch-concurrency", type=int, default=2, help="Concurrent batch clients")
+    parser.add_argument("--batch-size", type=int, default=100, help="URLs per batch request")
+    parser.add_argument("--batch-probe", default=False, type=lambda value: {"true": True, "false": False}.get(value, value),
+                        help="'probe' value sent with batch requests: false, true or async")
+    parser.add_argument("--duration", type=float, default=15, help="Measured seconds per endpoint and configuration")
+    parser.add_argument("--warmup", type=float, default=3, help="Unmeasured seconds before each measurement")
+    parser.add_argument("--probe-mode", choices=("async", "sync"), default="async",
+                        help="Whether /predict queues the security checks or waits for them")
+    parser.add_argument("--probe-timeout", type=float, default=3, help="Probe connect/read timeout in the app")
+    parser.add_argument("--deadline", type=float, help="PREDICT_DEADLINE (seconds) for the app")
+    parser.add_argument("--request-timeout", type=float, default=30, help="Client and gunicorn worker timeout")
+    parser.add_argument("--mix", type=parse_mix, help="Stub profile weights, e.g. secure=4,bare=2,slow=1,hang=1")
+    parser.add_argument("--stub-hosts", type=int, default=2, help="Stub listeners per profile and scheme")
+    parser.add_argument("--model-dir", help="Serve these artifacts instead of a freshly trained benchmark model")
+    parser.add_argument("--train-size", type=int, default=20000)
+    parser.add_argument("--cache", action="store_true", help="Keep the verdict and probe caches enabled")
+    parser.add_argument("--keep-limits", action="store_true", help="Keep the production per-host probe limits")
+    parser.add_argument("--skip-batch", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    configs = [tuple(int(part) for part in config.split("x")) for config in args.configs.split(",")]
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "args": {key: value for key, value in vars(args).items()},
+        },
+        "configs": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp, StubSites(hosts=args.stub_hosts) as stubs:
+        model_dir = args.model_dir or build_model_dir(tmp, args.train_size, args.seed)
+        for workers, threads in configs:
+            name = f"{workers}x{threads}"
+            print(f"Running {name} ({workers} workers, {threads} threads)", file=sys.stderr)
+            results["configs"][name] = {"workers": workers, "threads": threads,
+                                        **run_config(args, workers, threads, model_dir, stubs)}
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Reproducible performance benchmarks for secure_link_monitor.
+
+Measures feature extraction throughput, single-row and batch inference
+latency, model load time, candidate training time and end-to-end /predict
+latency through the Flask test client (with the network probes stubbed),
+on synthetic URL corpora. Results are printed (or written) as JSON so runs
+can be diffed.
+
+    python benchmarks/run_benchmarks.py --sizes 1000,10000 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import Future
+from pathlib import Path
+# Adding the project root to the system path for module import
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+import sklearn
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import GaussianNB
+from sklearn.tree import DecisionTreeClassifier
+
+from benchmarks.corpus import synthetic_corpus
+from src.features import extract_url_features
+from src.pipeline.compiled_tree import CompiledTreeModel, export_tree_model
+from src.pipeline.model_loader import ModelLoaderConfig, load_model
+from src.pipeline.predict_pipeline import PredictPipeline
+from src.pipeline.probe import HEADER_ANALYZERS, HeaderFinding, ProbeResult
+from src.utils import evaluate_models, save_object, save_mmap_object
+
+
+def percentiles(seconds):
+    # Summarize a list of durations in microseconds
+    us = np.asarray(seconds) * 1e6
+    return {
+        "n": int(us.size),
+        "mean_us": float(us.mean()),
+        "p50_us": float(np.percentile(us, 50)),
+        "p90_us": float(np.percentile(us, 90)),
+        "p99_us": float(np.percentile(us, 99)),
+    }
+
+
+def time_calls(fn, args_list):
+    durations = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def bench_extraction(sizes, seed):
+    results = {}
+    for size in sizes:
+        urls, _ = synthetic_corpus(size, seed=seed)
+        start = time.perf_counter()
+        for url in urls:
+            extract_url_features(url)
+        scalar = time.perf_counter() - start
+
+        start = time.perf_counter()
+        PredictPipeline(model=None).build_features(urls)
+        matrix = time.perf_counter() - start
+        results[str(size)] = {
+            "extract_url_features_urls_per_s": size / scalar,
+            "build_features_urls_per_s": size / matrix,
+        }
+    return results
+
+
+def train_models(X, y):
+    return {
+        "Decision Tree": DecisionTreeClassifier(random_state=0).fit(X, y),
+        "Random Forest": RandomForestClassifier(random_state=0).fit(X, y),
+    }
+
+
+def bench_training(X, y, n_jobs_options):
+    results = {}
+    split = int(len(X) * 0.8)
+    for n_jobs in n_jobs_options:
+        models = {
+            "Decision Tree": DecisionTreeClassifier(random_state=0),
+            "Logistic Regression": LogisticRegression(max_iter=200),
+            "Random Forest": RandomForestClassifier(random_state=0),
+            "Naive Bayes": GaussianNB(),
+        }
+        start = time.perf_counter()
+        report = evaluate_models(X[:split], y[:split], X[split:], y[split:], models, n_jobs=n_jobs)
+        results[f"n_jobs={n_jobs}"] = {
+            "wall_s": time.perf_counter() - start,
+            "fit_s": dict(zip(report["Model"], report["Fit Time (s)"])),
+        }
+    return results
+
+
+def bench_inference(models, urls, X, n_single, batch_size):
+    results = {}
+    rows = [(X[i:i + 1],) for i in range(n_single)]
+    batch = X[:batch_size]
+    for name, model in models.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            compiled_path = os.path.join(tmp, "model_trees.npz")
+            export_tree_model(model, compiled_path)
+            compiled = CompiledTreeModel.load(compiled_path)
+        pipeline = PredictPipeline(model, compiled=compiled)
+        start = time.perf_counter()
+        model.predict_proba(batch)
+        batch_s = time.perf_counter() - start
+        results[name] = {
+            "sklearn_single_row": percentiles(time_calls(model.predict_proba, rows)),
+            "compiled_single_row": percentiles(time_calls(compiled.predict_proba, rows)),
+            "pipeline_predict_one": percentiles(time_calls(pipeline.predict_one, [(url,) for url in urls[:n_single]])),
+            "sklearn_batch": {"rows": batch_size, "us_per_row": batch_s * 1e6 / batch_size},
+        }
+    return results
+
+
+def bench_model_load(model, repeats):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        save_object(os.path.join(tmp, "model.pkl"), model)
+        pickle_only = ModelLoaderConfig(model_dir=tmp, mmap_file_name="missing.joblib")
+        results["pickle"] = percentiles(time_calls(load_model, [(pickle_only,)] * repeats))
+        save_mmap_object(os.path.join(tmp, "model.joblib"), model)
+        mmap = ModelLoaderConfig(model_dir=tmp)
+        results["joblib_mmap"] = percentiles(time_calls(load_model, [(mmap,)] * repeats))
+        results["pickle_bytes"] = os.path.getsize(os.path.join(tmp, "model.pkl"))
+    return results
+
+
+def stub_probe(url):
+    # Canned probe result so /predict is measured without network access
+    future = Future()
+    future.set_result(ProbeResult(
+        url=url, ssl_valid=True, status_code=200,
+        findings={analyzer.name: HeaderFinding(present=True, value="stub") for analyzer in HEADER_ANALYZERS},
+    ))
+    return future
+
+
+def bench_app(model, urls, n_requests, batch_size):
+    with tempfile.TemporaryDirectory() as tmp:
+        save_mmap_object(os.path.join(tmp, "model.joblib"), model)
+        export_tree_model(model, os.path.join(tmp, "model_trees.npz"))
+        os.environ["MODEL_DIR"] = tmp
+        # Expire verdicts immediately so every request runs the full pipeline
+        os.environ["VERDICT_CACHE_TTL"] = "0"
+        import app as flask_app
+
+        flask_app.probe_engine.submit = lambda url, analyzers=None, deadline=None: stub_probe(url)
+        client = flask_app.app.test_client()
+
+        def post_predict(url):
+            response = client.post("/predict", data={"urlinput": url})
+            assert response.status_code == 200
+
+        def post_batch(batch):
+            response = client.post("/api/predict/batch", json={"urls": batch, "probe": False})
+            assert response.status_code == 200
+
+        start = time.perf_counter()
+        post_batch(urls[:batch_size])
+        batch_s = time.perf_counter() - start
+        return {
+            "predict": percentiles(time_calls(post_predict, [(url,) for url in urls[:n_requests]])),
+            "predict_batch": {"urls": batch_size, "total_ms": batch_s * 1000, "us_per_url": batch_s * 1e6 / batch_size},
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,50000", help="Comma-separated corpus sizes for extraction")
+    parser.add_argument("--train-size", type=int, default=20000, help="Corpus size used to train benchmark models")
+    parser.add_argument("--requests", type=int, default=200, help="Single-row calls / /predict requests per measurement")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per batch measurement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-training", action="store_true", help="Skip the evaluate_models benchmark")
+    parser.add_argument("--output", help="Write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    urls, labels = synthetic_corpus(args.train_size, seed=args.seed)
+    X = PredictPipeline(model=None).build_features(urls)
+    y = np.asarray(labels)
+    models = train_models(X, y)
+    # Held-out URLs so measurements don't reuse training rows
+    eval_urls, _ = synthetic_corpus(max(args.requests, args.batch_size), seed=args.seed + 1)
+    X_eval = PredictPipeline(model=None).build_features(eval_urls)
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "sklearn": sklearn.__version__,
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "extraction": bench_extraction(sizes, args.seed),
+        "inference": bench_inference(models, eval_urls, X_eval, args.requests, args.batch_size),
+        "model_load": {name: bench_model_load(model, 5) for name, model in models.items()},
+    }
+    if not args.skip_training:
+        results["training"] = bench_training(X, y, [1, -1])
+    results["app"] = bench_app(models["Random Forest"], eval_urls, args.requests, args.batch_size)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Local HTTP/HTTPS stub target sites for load testing.
+
+Every profile (latency, headers, failure mode) gets its own pool of
+loopback ports per scheme, and a listener always answers with its one
+profile. The app coalesces and caches probes per host:port, so profiles
+sharing a port would share results; URLs name the profile in their first
+path segment only for readability, e.g. http://127.0.0.1:<port>/hsts/login.
+HTTPS stubs present a certificate issued by a throwaway CA generated with
+the `openssl` command-line tool; point REQUESTS_CA_BUNDLE and SSL_CERT_FILE
+at `ca_path` to have the app trust it.
+
+    python benchmarks/stub_sites.py --hosts 4     # serve until interrupted
+"""
+import argparse
+import os
+import random
+import socket
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+SECURE_HEADERS = {
+    "Server": "stub/1.0",
+    "Strict-Transport-Security": "max-age=31536000",
+    "X-XSS-Protection": "1; mode=block",
+}
+
+
+@dataclass
+class StubProfile:
+    # How a stub answers requests routed to this profile
+    name: str
+    latency_ms: float = 0.0
+    headers: Dict[str, str] = field(default_factory=dict)
+    status: int = 200
+    # None, "reset" (close without answering) or "hang" (never answer until the client gives up)
+    failure: Optional[str] = None
+
+
+DEFAULT_PROFILES = [
+    StubProfile("secure", headers=dict(SECURE_HEADERS)),
+    StubProfile("hsts", headers={"Strict-Transport-Security": "max-age=31536000"}),
+    StubProfile("banner", headers={"Server": "stub/1.0"}),
+    StubProfile("bare"),
+    StubProfile("slow", latency_ms=250, headers=dict(SECURE_HEADERS)),
+    StubProfile("error", status=500, headers={"Server": "stub/1.0"}),
+    StubProfile("reset", failure="reset"),
+    StubProfile("hang", failure="hang"),
+]
+
+# Longest a "hang" stub holds a connection before closing it
+HANG_SECONDS = 60
+
+
+def _openssl(*args, cwd):
+    subprocess.run(["openssl", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def make_certificates(directory):
+    """
+    Create a throwaway CA and a localhost/127.0.0.1 server certificate it signed.
+
+    Returns:
+    tuple: (ca_path, cert_path, key_path)
+    """
+    _openssl("req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "2",
+             "-keyout", "ca.key", "-out", "ca.pem", "-subj", "/CN=secure_link_monitor load-test CA",
+             "-addext", "basicConstraints=critical,CA:TRUE",
+             "-addext", "keyUsage=critical,keyCertSign,cRLSign", cwd=directory)
+    _openssl("req", "-newkey", "rsa:2048", "-nodes", "-keyout", "server.key", "-out", "server.csr",
+             "-subj", "/CN=localhost", cwd=directory)
+    with open(os.path.join(directory, "server.ext"), "w") as ext_file:
+        ext_file.write("subjectAltName=DNS:localhost,IP:127.0.0.1\n"
+                       "basicConstraints=CA:FALSE\n"
+                       "keyUsage=digitalSignature,keyEncipherment\n"
+                       "extendedKeyUsage=serverAuth\n"
+                       "authorityKeyIdentifier=keyid\n")
+    _openssl("x509", "-req", "-in", "server.csr", "-CA", "ca.pem", "-CAkey", "ca.key", "-CAcreateserial",
+             "-days", "2", "-out", "server.pem", "-extfile", "server.ext", cwd=directory)
+    return tuple(os.path.join(directory, name) for name in ("ca.pem", "server.pem", "server.key"))
+
+
+def make_handler(profile):
+    # Request handler answering every path with `profile`
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if profile.failure == "reset":
+                # SO_LINGER 0 turns close() into a TCP reset
+                self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, b"\x01\x00\x00\x00\x00\x00\x00\x00")
+                self.close_connection = True
+                return
+            if profile.failure == "hang":
+                time.sleep(HANG_SECONDS)
+                self.close_connection = True
+                return
+            if profile.latency_ms:
+                time.sleep(profile.latency_ms / 1000)
+            body = f"stub {profile.name}\n".encode()
+            self.send_response(profile.status)
+            for name, value in profile.headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_HEAD = do_GET
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+class TLSStubServer(ThreadingHTTPServer):
+    # Handshakes run on the per-connection thread, so a slow client never stalls accept()
+    daemon_threads = True
+
+    def __init__(self, address, handler, context):
+        super().__init__(address, handler)
+        self.context = context
+
+    def finish_request(self, request, client_address):
+        try:
+            tls_request = self.context.wrap_socket(request, server_side=True)
+        except (ssl.SSLError, OSError):
+            return
+        try:
+            super().finish_request(tls_request, client_address)
+        finally:
+            tls_request.close()
+
+
+class StubSites:
+    """
+    Starts `hosts` HTTP and `hosts` HTTPS stub listeners per profile on loopback ports.
+
+    Use as a context manager; `urls()` picks a profile by weight, then one
+    of that profile's listeners.
+    """
+    def __init__(self, hosts=2, profiles=None, https=True, directory=None):
+        self.hosts = hosts
+        self.profiles = profiles or DEFAULT_PROFILES
+        self.https = https
+        self._tmp = None if directory else tempfile.TemporaryDirectory()
+        self.directory = directory or self._tmp.name
+        self.ca_path = None
+        # (scheme, profile name, server) per listener
+        self.servers = []
+
+    def start(self):
+        context = None
+        if self.https:
+            self.ca_path, cert_path, key_path = make_certificates(self.directory)
+            context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            context.load_cert_chain(cert_path, key_path)
+        for profile in self.profiles:
+            handler = make_handler(profile)
+            for scheme in ("http", "https") if self.https else ("http",):
+                for _ in range(self.hosts):
+                    if scheme == "https":
+                        server = TLSStubServer(("127.0.0.1", 0), handler, context)
+                    else:
+                        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+                        server.daemon_threads = True
+                    threading.Thread(target=server.serve_forever, daemon=True).start()
+                    self.servers.append((scheme, profile.name, server))
+        return self
+
+    def stop(self):
+        # shutdown() waits out a poll interval, so the listeners are stopped in parallel
+        stoppers = [threading.Thread(target=server.shutdown) for _, _, server in self.servers]
+        for stopper in stoppers:
+            stopper.start()
+        for stopper in stoppers:
+            stopper.join()
+        for _, _, server in self.servers:
+            server.server_close()
+        if self._tmp is not None:
+            self._tmp.cleanup()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def base_urls(self, profile=None):
+        # Listener base URLs, optionally only those serving `profile`
+        return [f"{scheme}://127.0.0.1:{server.server_address[1]}"
+                for scheme, name, server in self.servers if profile in (None, name)]
+
+    def urls(self, count, mix=None, seed=0):
+        """
+        Generate `count` URLs, each on a listener of a profile drawn by weight.
+
+        Parameters:
+        mix (dict): Relative weight per profile name; defaults to equal weights.
+
+        Returns:
+        list: URLs such as https://127.0.0.1:<port>/<profile>/<path>.
+        """
+        rng = random.Random(seed)
+        mix = mix or {profile.name: 1 for profile in self.profiles}
+        bases = {name: self.base_urls(name) for name in mix}
+        unknown = [name for name, listeners in bases.items() if not listeners]
+        if unknown:
+            raise ValueError(f"No stub listeners for profiles: {', '.join(unknown)}")
+        names, weights = list(mix), list(mix.values())
+        paths = ["login.php", "account/verify", "index.html", "signin?next=/home", "docs/page-1"]
+        urls = []
+        for _ in range(count):
+            name = rng.choices(names, weights)[0]
+            urls.append(f"{rng.choice(bases[name])}/{name}/{rng.choice(paths)}")
+        return urls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hosts", type=int, default=2, help="Listeners per profile and scheme")
+    parser.add_argument("--no-https", action="store_true")
+    args = parser.parse_args()
+    with StubSites(hosts=args.hosts, https=not args.no_https) as stubs:
+        print(f"CA certificate: {stubs.ca_path}")
+        for profile in stubs.profiles:
+            for base in stubs.base_urls(profile.name):
+                print(f"{base}/{profile.name}/...")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,56 @@
 import os
 import sys
+import hashlib
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 # Adding the project root to the system path for module import
 sys.path.append(str(Path(__file__).parent.parent.parent))
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from dataclasses import dataclass
-from urllib.parse import urlparse, parse_qs
 
 # Importing custom modules for logging and exceptions
 from src.logger import logging
 from src.exception import securelinkException
+from src.features import FEATURE_COLUMNS, build_feature_matrix, extract_url_features
+from src.utils import save_array, NpyAppender
+from src.components.feature_store import FeatureStore
 from src.components.data_transformation import DataTransformation
 from src.components.model_trainer import ModelTrainer
 
 @dataclass
 class DataIngestionConfig:
     # Configuration class for data ingestion paths
-    train_data_path: str = os.path.join('artifacts', 'train.csv')
-    test_data_path: str = os.path.join('artifacts', 'test.csv')
-    raw_data_path: str = os.path.join('artifacts', 'data.csv')
+    # Train/test splits are stored as memory-mappable .npy feature and label arrays
+    train_features_path: str = os.path.join('artifacts', 'train_features.npy')
+    train_labels_path: str = os.path.join('artifacts', 'train_labels.npy')
+    test_features_path: str = os.path.join('artifacts', 'test_features.npy')
+    test_labels_path: str = os.path.join('artifacts', 'test_labels.npy')
+    raw_data_path: str = os.path.join('artifacts', 'data.pkl')
+    dataset_path: str = os.path.join('src', 'datasets', 'urldata.csv')
+    target_column_name: str = 'result'
+    # Streaming mode: rows per CSV chunk, feature worker processes and split settings
+    chunksize: int = 100_000
+    n_jobs: int = os.cpu_count() or 1
+    test_size: float = 0.20
+    split_seed: int = 42
+    # Persistent feature rows so re-ingestion only extracts features for new URLs
+    feature_store_path: str = os.path.join('artifacts', 'feature_store.db')
+    use_feature_store: bool = True
+
+
+def split_is_test(url, test_size, seed):
+    # Deterministic split: a URL always lands in the same split, whatever the chunking
+    digest = hashlib.blake2b(f"{seed}:{url}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") / 2**64 < test_size
+
+
+def extract_chunk_features(urls):
+    # Worker task: feature rows for one chunk of URLs
+    return build_feature_matrix(urls)
 
 class DataIngestion:
     def __init__(self):
@@ -28,113 +59,147 @@ class DataIngestion:
 
     def extract_url_features(self, url):
         # Function to extract features from a URL
-        parsed_url = urlparse(url)
-
-        url_length = len(url)
-        domain = parsed_url.netloc
-        hostname_length = len(domain)
-
-        path = parsed_url.path
-        path_length = len(path)
-
-        fd_length = len(url.split('/')[-1])
-        count_of_dash = url.count('-')
-        count_of_at = url.count('@')
-        count_of_question = url.count('?')
-        count_of_percent = url.count('%')
-        count_of_dot = url.count('.')
-        count_of_equal = url.count('=')
-        count_of_http = url.count('http')
-        count_of_https = url.count('https')
-        count_of_www = url.count('www')
-        count_of_digits = sum(c.isdigit() for c in url)
-        count_of_letters = sum(c.isalpha() for c in url)
-        count_of_dir = url.count('/')
-
-        use_of_ip = 1 if domain.replace('.', '').isdigit() else 0
-        # Extracting various components and features from the URL
-        qty_hyphen_url = url.count('-')
-        length_url = len(url)
-        qty_tilde_url = url.count('~')
-        qty_dot_url = url.count('.')
-        qty_percent_url = url.count('%')
-        length_domain = len(domain)
-        params_length = len(parse_qs(parsed_url.query))
-        qty_and_params = url.count('&')
-        qty_hyphens_params = url.count('-')
-        directory_length = len(parsed_url.path.split('/'))
-        qty_equal_params = url.count('=')
-        qty_equal_url = url.count('=')
-        qty_slash_url = url.count('/')
-        qty_slash_directory = url.count('/') - 1
-        file_length = len(parsed_url.path.split('/')[-1])
-        qty_and_url = url.count('&')
-        qty_dot_params = url.count('.')
-
-        # Returning a list of features extracted from the URL
-        return [hostname_length, path_length, fd_length, count_of_dash,
-                count_of_at, count_of_question, count_of_percent, count_of_dot,
-                count_of_equal, count_of_http, count_of_https, count_of_www,
-                count_of_digits, count_of_letters, count_of_dir, use_of_ip,
-                qty_hyphen_url, length_url, qty_tilde_url, qty_dot_url,
-                qty_percent_url, length_domain, params_length, qty_and_params,
-                qty_hyphens_params, directory_length, qty_equal_params,
-                qty_equal_url, qty_slash_url, qty_slash_directory, file_length,
-                qty_and_url, qty_dot_params]
+        return extract_url_features(url)
+
+    def open_feature_store(self):
+        if not self.ingestion_config.use_feature_store:
+            return None
+        return FeatureStore(self.ingestion_config.feature_store_path)
 
     def initiate_data_ingestion(self):
         logging.info("Entered data ingestion method")
         try:
             
             # Reading the raw dataset
-            df = pd.read_csv("src/datasets/urldata.csv")
+            df = pd.read_csv(self.ingestion_config.dataset_path)
             logging.info("Read the data")
 
             # Define new columns
-            new_columns = ['hostname_length', 'path_length', 'fd_length', 'count_of_dash',
-                           'count_of_at', 'count_of_question', 'count_of_percent', 'count_of_dot',
-                           'count_of_equal', 'count_of_http', 'count_of_https', 'count_of_www',
-                           'count_of_digits', 'count_of_letters', 'count_of_dir', 'use_of_ip',
-                           'qty_hyphen_url', 'length_url', 'qty_tilde_url',
-                           'qty_dot_url', 'qty_percent_url', 'length_domain', 'params_length',
-                           'qty_and_params', 'qty_hyphens_params', 'directory_length',
-                           'qty_equal_params', 'qty_equal_url', 'qty_slash_url',
-                           'qty_slash_directory', 'file_length', 'qty_and_url', 'qty_dot_params']
-
-            # Apply URL feature extraction
-            df[new_columns] = df['url'].apply(self.extract_url_features).apply(pd.Series)
+            new_columns = FEATURE_COLUMNS
+
+            # Apply URL feature extraction straight into a typed feature matrix
+            urls = df['url'].astype(str).tolist()
+            store = self.open_feature_store()
+            if store is None:
+                features = extract_chunk_features(urls)
+            else:
+                features = store.get_or_compute(urls, extract_chunk_features)
+                logging.info(f"Feature store: reused {store.hits} rows, extracted {store.misses}")
+                store.close()
+            df[new_columns] = features
+            labels = df[self.ingestion_config.target_column_name].to_numpy()
             logging.info("New Columns Created")
 
             # Creating directory for saving processed files
-            os.makedirs(os.path.dirname(self.ingestion_config.train_data_path), exist_ok=True)
+            os.makedirs(os.path.dirname(self.ingestion_config.train_features_path), exist_ok=True)
 
-            # Saving the raw data with extracted features
-            df.to_csv(self.ingestion_config.raw_data_path, index=False, header=True)
+            # Saving the raw data with extracted features in binary form
+            df.to_pickle(self.ingestion_config.raw_data_path)
 
             logging.info("Train Test split initiated")
 
-            # Splitting the dataset into training and testing sets
-            train_set, test_set = train_test_split(df, test_size=0.20, random_state=42)
+            # Splitting row indices so features and labels are gathered once per split
+            train_idx, test_idx = train_test_split(np.arange(len(df)), test_size=0.20, random_state=42)
 
             # Saving the train and test sets
-            train_set.to_csv(self.ingestion_config.train_data_path, index=False, header=True)
-            test_set.to_csv(self.ingestion_config.test_data_path, index=False, header=True)
+            save_array(self.ingestion_config.train_features_path, features[train_idx])
+            save_array(self.ingestion_config.train_labels_path, labels[train_idx])
+            save_array(self.ingestion_config.test_features_path, features[test_idx])
+            save_array(self.ingestion_config.test_labels_path, labels[test_idx])
             logging.info("Ingestion Completed")
 
-            # Returning paths to the train and test datasets
+            # Returning (features, labels) paths for the train and test datasets
             return (
-                self.ingestion_config.train_data_path,
-                self.ingestion_config.test_data_path 
+                (self.ingestion_config.train_features_path, self.ingestion_config.train_labels_path),
+                (self.ingestion_config.test_features_path, self.ingestion_config.test_labels_path)
             )
         except Exception as ex:
             # Handling exceptions and logging
             raise securelinkException(ex, sys)
 
+    def iter_chunk_features(self, executor, store=None):
+        # Yield (features, is_test, labels) per CSV chunk, in order, with a bounded number in flight
+        config = self.ingestion_config
+        reader = pd.read_csv(config.dataset_path, usecols=['url', config.target_column_name],
+                             chunksize=config.chunksize)
+
+        def finish(entry):
+            future, keys, features, missing, is_test, labels = entry
+            computed = future.result() if future is not None else None
+            if store is not None:
+                features = store.fill_missing(keys, features, missing, computed)
+            else:
+                features = computed
+            return features, is_test, labels
+
+        pending = deque()
+        for chunk in reader:
+            urls = chunk['url'].astype(str).tolist()
+            labels = chunk[config.target_column_name].to_numpy(dtype=np.int64)
+            is_test = np.fromiter((split_is_test(url, config.test_size, config.split_seed) for url in urls),
+                                  dtype=bool, count=len(urls))
+            # Only URLs the feature store has not seen are sent to the workers
+            if store is not None:
+                keys, features, missing = store.split_known(urls)
+            else:
+                keys, features, missing = None, None, list(range(len(urls)))
+            future = executor.submit(extract_chunk_features, [urls[i] for i in missing]) if missing else None
+            pending.append((future, keys, features, missing, is_test, labels))
+            if len(pending) >= 2 * config.n_jobs:
+                yield finish(pending.popleft())
+        while pending:
+            yield finish(pending.popleft())
+
+    def initiate_streaming_ingestion(self):
+        """
+        Ingest a corpus larger than memory.
+
+        The CSV is read in chunks, features are extracted across a process
+        pool and each chunk is appended straight to the train/test .npy
+        artifacts. The split hashes each URL, so it is reproducible and
+        independent of chunk size. URLs already in the feature store are not
+        re-extracted. No raw data.pkl is written in this mode.
+        """
+        logging.info("Entered streaming data ingestion method")
+        try:
+            config = self.ingestion_config
+            row_shape = (len(FEATURE_COLUMNS),)
+            store = self.open_feature_store()
+            with ProcessPoolExecutor(max_workers=config.n_jobs) as executor, \
+                    NpyAppender(config.train_features_path, np.int64, row_shape) as train_features, \
+                    NpyAppender(config.train_labels_path, np.int64) as train_labels, \
+                    NpyAppender(config.test_features_path, np.int64, row_shape) as test_features, \
+                    NpyAppender(config.test_labels_path, np.int64) as test_labels:
+                for chunk_no, (features, is_test, labels) in enumerate(self.iter_chunk_features(executor, store)):
+                    train_features.append(features[~is_test])
+                    train_labels.append(labels[~is_test])
+                    test_features.append(features[is_test])
+                    test_labels.append(labels[is_test])
+                    logging.info(f"Ingested chunk {chunk_no}: {len(labels)} rows")
+
+            logging.info(f"Streaming ingestion completed: {train_labels.rows} train rows, {test_labels.rows} test rows")
+            if store is not None:
+                logging.info(f"Feature store: reused {store.hits} rows, extracted {store.misses}")
+                store.close()
+            return (
+                (config.train_features_path, config.train_labels_path),
+                (config.test_features_path, config.test_labels_path)
+            )
+        except Exception as ex:
+            raise securelinkException(ex, sys)
+
 if __name__ == '__main__':
     # Main execution block
+    parser = argparse.ArgumentParser(description="Run the ingestion, transformation and training pipeline")
+    parser.add_argument("--streaming", action="store_true", help="Ingest the corpus in chunks across worker processes")
+    args = parser.parse_args()
+
     # Creating DataIngestion object and initiating data ingestion process
     obj = DataIngestion()
-    train_data,test_data = obj.initiate_data_ingestion()
+    if args.streaming:
+        train_data,test_data = obj.initiate_streaming_ingestion()
+    else:
+        train_data,test_data = obj.initiate_data_ingestion()
 
     # Data transformation process
     data_transformation = DataTransformation()
@@ -3,12 +3,10 @@ from dataclasses import dataclass
 from pathlib import Path
 # Adding the project root to the system path for module import
 sys.path.append(str(Path(__file__).parent.parent.parent))
-import numpy as np 
-import pandas as pd
 from src.exception import securelinkException
 from src.logger import logging
 import os
-from src.utils import save_object
+from src.utils import load_array
 
 @dataclass
 class DataTransformationConfig:
@@ -21,39 +19,24 @@ class DataTransformation:
         # Initializing data transformation configuration
         self.data_transformation_config=DataTransformationConfig()
 
+    def load_split(self,split_path):
+        # Loading one split as memory-mapped (features, labels) arrays
+        features_path, labels_path = split_path
+        return load_array(features_path), load_array(labels_path)
+
     def initiate_data_transformation(self,train_path,test_path):
-        try:            
-            # Reading the training and testing datasets
-            train_df=pd.read_csv(train_path)
-            test_df=pd.read_csv(test_path)
+        try:
+            # Memory-mapping the binary train and test artifacts instead of parsing text
+            X_train, y_train = self.load_split(train_path)
+            X_test, y_test = self.load_split(test_path)
 
             logging.info("Read train and test data completed")
+            logging.info(f"Train features {X_train.shape} {X_train.dtype}, test features {X_test.shape} {X_test.dtype}")
 
-            logging.info("Obtaining preprocessing object")
-
-            # Columns to be excluded from feature set
-            input_column_name = ["url","label","result","Unnamed: 0"]
-
-            # Target/label column name
-            target_column_name="result"
-
-            input_feature_train_df = train_df.drop(columns=input_column_name, axis=1)
-            target_feature_train_df=train_df[target_column_name]
-            
-            input_feature_test_df = test_df.drop(columns=input_column_name, axis=1)
-            target_feature_test_df=test_df[target_column_name]  
-
-            logging.info(f"Column dropping perform")   
-            # Combining feature and target arrays for train and test datasets         
-            train_arr = np.c_[
-                input_feature_train_df, np.array(target_feature_train_df)
-            ]
-
-            test_arr = np.c_[input_feature_test_df, np.array(target_feature_test_df)]
-            # Returning the train and test arrays
-            return (                
-                train_arr,
-                test_arr,
+            # Returning (features, labels) views for the train and test datasets
+            return (
+                (X_train, y_train),
+                (X_test, y_test),
             )
         except Exception as e:
             # Handling exceptions and logging
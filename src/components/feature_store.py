@@ -0,0 +1,107 @@
+import os
+import sys
+import hashlib
+import sqlite3
+from pathlib import Path
+# Adding the project root to the system path for module import
+sys.path.append(str(Path(__file__).parent.parent.parent))
+import numpy as np
+
+from src.logger import logging
+from src.features import FEATURE_COLUMNS, FEATURE_SCHEMA_VERSION
+
+
+class FeatureStore:
+    """
+    Persistent URL -> feature row store used to make re-ingestion incremental.
+
+    Rows are keyed by a 128-bit hash of the URL and tagged with the feature
+    schema version; rows written under another version are dropped on open,
+    so a change to the feature code recomputes everything exactly once.
+    """
+    # SQLite caps the number of bound parameters per statement
+    LOOKUP_BATCH = 900
+
+    def __init__(self, path, schema_version=FEATURE_SCHEMA_VERSION, n_features=len(FEATURE_COLUMNS)):
+        dir_path = os.path.dirname(path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        self.path = path
+        self.schema_version = schema_version
+        self.n_features = n_features
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS features "
+            "(url_hash BLOB PRIMARY KEY, schema_version INTEGER, features BLOB)"
+        )
+        stale = self.conn.execute(
+            "DELETE FROM features WHERE schema_version != ?", (schema_version,)
+        ).rowcount
+        self.conn.commit()
+        if stale:
+            logging.info(f"Dropped {stale} feature rows from other schema versions")
+
+    @staticmethod
+    def url_key(url):
+        return hashlib.blake2b(url.encode("utf-8"), digest_size=16).digest()
+
+    def lookup(self, keys):
+        # Return {key: feature row} for the keys already stored under the current schema
+        found = {}
+        for start in range(0, len(keys), self.LOOKUP_BATCH):
+            batch = keys[start:start + self.LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(
+                f"SELECT url_hash, features FROM features WHERE url_hash IN ({placeholders})", batch
+            )
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.int64)
+        return found
+
+    def put_many(self, keys, features):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO features (url_hash, schema_version, features) VALUES (?, ?, ?)",
+            ((key, self.schema_version, row.astype(np.int64).tobytes()) for key, row in zip(keys, features)),
+        )
+        self.conn.commit()
+
+    def split_known(self, urls):
+        """
+        Look up a batch of URLs.
+
+        Returns:
+        tuple: (keys, features with stored rows filled in, indices still to compute)
+        """
+        keys = [self.url_key(url) for url in urls]
+        found = self.lookup(keys)
+        features = np.zeros((len(urls), self.n_features), dtype=np.int64)
+        missing = []
+        for i, key in enumerate(keys):
+            row = found.get(key)
+            if row is None:
+                missing.append(i)
+            else:
+                features[i] = row
+        self.hits += len(urls) - len(missing)
+        self.misses += len(missing)
+        return keys, features, missing
+
+    def fill_missing(self, keys, features, missing, computed):
+        # Store freshly computed rows and place them into the batch
+        if missing:
+            features[missing] = computed
+            self.put_many([keys[i] for i in missing], computed)
+        return features
+
+    def get_or_compute(self, urls, compute):
+        # Features for every URL, calling `compute(urls)` only for those not yet stored
+        keys, features, missing = self.split_known(urls)
+        computed = compute([urls[i] for i in missing]) if missing else None
+        return self.fill_missing(keys, features, missing, computed)
+
+    def close(self):
+        self.conn.close()
@@ -1,38 +1,128 @@
 import os
 import sys
-from dataclasses import dataclass
+import json
+from dataclasses import dataclass, asdict
+from typing import Optional
+import pandas as pd
 from sklearn.linear_model import LogisticRegression
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.naive_bayes import GaussianNB
-from src.utils import save_object, evaluate_models
+from src.utils import save_object, save_mmap_object, evaluate_models, benchmark_model_inference
 from src.logger import logging
 from src.exception import securelinkException
+from src.pipeline.compiled_tree import CompiledTreeModel, export_tree_model, is_tree_model, verify_compiled_model
+from src.pipeline.model_loader import ModelLoaderConfig, publish_model_version
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.svm import SVC
 from sklearn.neighbors import KNeighborsClassifier
 
 
+@dataclass
+class SelectionPolicy:
+    # Constraints for picking the served model; None disables a constraint
+    max_single_p99_us: Optional[float] = None
+    max_size_bytes: Optional[int] = None
+    # Models within this many accuracy points of the best are ranked by p99 latency
+    accuracy_tolerance_pct: float = 0.0
+
 @dataclass
 class ModelTrainerConfig:
     # Configuration class for the model trainer
     trained_model_file_path = os.path.join("artifacts", "model.pkl")
+    # Same model saved with joblib so serving workers can memory-map its arrays
+    mmap_model_file_path = os.path.join("artifacts", "model.joblib")
+    # Flattened node arrays for the fast single-row evaluator (tree models only)
+    compiled_model_file_path = os.path.join("artifacts", "model_trees.npz")
+    # Worker processes used to fit candidate models, -1 for one per core
+    n_jobs = -1
+    # Selection policy and the report explaining the chosen tradeoff
+    selection_policy = SelectionPolicy()
+    selection_report_file_path = os.path.join("artifacts", "model_selection.json")
 
 class ModelTrainer:
     def __init__(self):
         # Initializing the model trainer configuration
         self.model_trainer_config = ModelTrainerConfig()
 
+    def split_features_labels(self, data):
+        # Returning (features, labels) from a pair or a combined array with labels last
+        if isinstance(data, tuple):
+            return data
+        return data[:, :-1], data[:, -1]
+
+    def export_compiled_model(self, model, X_check):
+        # Exporting tree models to node arrays, kept only if they match sklearn on X_check
+        compiled_path = self.model_trainer_config.compiled_model_file_path
+        if os.path.exists(compiled_path):
+            os.remove(compiled_path)
+        if not is_tree_model(model):
+            logging.info(f"{type(model).__name__} is not a tree model, skipping compiled export")
+            return None
+
+        export_tree_model(model, compiled_path)
+        if not verify_compiled_model(model, CompiledTreeModel.load(compiled_path), X_check):
+            os.remove(compiled_path)
+            logging.error("Compiled tree model failed verification and was discarded")
+            return None
+        logging.info(f"Compiled tree model verified against sklearn and saved to {compiled_path}")
+        return compiled_path
+
+    def benchmark_models(self, models, model_report_df, X_sample):
+        # Adding inference latency, size and load time columns to the report
+        rows = []
+        for model_name in model_report_df["Model"]:
+            model = models[model_name]
+            # The app serves verdicts from predict_proba, so models without it cannot be selected
+            servable = hasattr(model, "predict_proba")
+            metrics = benchmark_model_inference(model, X_sample) if servable else {}
+            rows.append({"Model": model_name, "Servable": servable, **metrics})
+            logging.info(f"Benchmarked {model_name}: {metrics if servable else 'no predict_proba'}")
+        return model_report_df.merge(pd.DataFrame(rows), on="Model", how="left")
+
+    def select_model(self, model_report_df):
+        """
+        Pick the model to serve: best test accuracy among servable models that
+        meet the policy's latency and size limits, preferring the lowest p99
+        latency among those within `accuracy_tolerance_pct` of the best.
+        """
+        policy = self.model_trainer_config.selection_policy
+        candidates = model_report_df[model_report_df["Servable"]]
+        if candidates.empty:
+            raise ValueError("No candidate model supports predict_proba")
+
+        eligible = candidates
+        if policy.max_single_p99_us is not None:
+            eligible = eligible[eligible["Single p99 (us)"] <= policy.max_single_p99_us]
+        if policy.max_size_bytes is not None:
+            eligible = eligible[eligible["Size (bytes)"] <= policy.max_size_bytes]
+        if eligible.empty:
+            logging.warning(f"No model satisfies {policy}; falling back to accuracy-only selection")
+            eligible = candidates
+
+        best_accuracy = eligible["Test Accuracy (%)"].max()
+        shortlist = eligible[eligible["Test Accuracy (%)"] >= best_accuracy - policy.accuracy_tolerance_pct]
+        return shortlist.sort_values(["Single p99 (us)", "Test Accuracy (%)"], ascending=[True, False]).iloc[0]
+
+    def write_selection_report(self, model_report_df, best_model_name):
+        # Recording the policy, the chosen model and every candidate's tradeoffs next to model.pkl
+        columns = [column for column in model_report_df.columns if column != "Confusion Matrix"]
+        report = {
+            "selected_model": best_model_name,
+            "policy": asdict(self.model_trainer_config.selection_policy),
+            "candidates": json.loads(model_report_df[columns].to_json(orient="records"))
+        }
+        report_path = self.model_trainer_config.selection_report_file_path
+        os.makedirs(os.path.dirname(report_path), exist_ok=True)
+        with open(report_path, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+
     def initiate_model_trainer(self, train_array, test_array):
         try:
             logging.info("Split training and test input data")
-            # Splitting the input data into features and labels for both training and testing
-            X_train, y_train, X_test, y_test = (
-                train_array[:, :-1],
-                train_array[:, -1],
-                test_array[:, :-1],
-                test_array[:, -1]
-            )
+            # Splits arrive as (features, labels) pairs; legacy combined arrays are sliced
+            X_train, y_train = self.split_features_labels(train_array)
+            X_test, y_test = self.split_features_labels(test_array)
             # Dictionary of models to train
             models = {
                 "Decision Tree": DecisionTreeClassifier(),
@@ -43,12 +133,16 @@ class ModelTrainer:
                 "Naive Bayes": GaussianNB()
             }
             # Evaluating each model and storing their reports
-            model_report_df = evaluate_models(X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test, models=models)
+            model_report_df = evaluate_models(X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test, models=models, n_jobs=self.model_trainer_config.n_jobs)
+
+            # Benchmarking the serving cost of every candidate
+            model_report_df = self.benchmark_models(models, model_report_df, X_test)
 
-            # Find the best model based on test accuracy
-            best_model_row = model_report_df.loc[model_report_df["Test Accuracy (%)"].idxmax()]
+            # Find the best model under the selection policy
+            best_model_row = self.select_model(model_report_df)
             best_model_name = best_model_row["Model"]
             best_model = models[best_model_name]
+            self.write_selection_report(model_report_df, best_model_name)
 
             logging.info(f"Model accuracies and confusion matrices:\n{model_report_df}")
             logging.info(f"Best model found on both training and testing dataset: {best_model_name}")
@@ -58,6 +152,14 @@ class ModelTrainer:
                 file_path=self.model_trainer_config.trained_model_file_path,
                 obj=best_model
             )
+            save_mmap_object(
+                file_path=self.model_trainer_config.mmap_model_file_path,
+                obj=best_model
+            )
+
+            self.export_compiled_model(best_model, X_test)
+            # Running app workers reload once the new version is published
+            publish_model_version(ModelLoaderConfig(model_dir=os.path.dirname(self.model_trainer_config.trained_model_file_path)))
 
             cm = best_model_row["Confusion Matrix"]
             logging.info(f"Confusion Matrix for best model:\n{cm}")
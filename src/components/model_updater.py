@@ -0,0 +1,175 @@
+import os
+import sys
+import json
+import pickle
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+# Adding the project root to the system path for module import
+sys.path.append(str(Path(__file__).parent.parent.parent))
+import numpy as np
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+
+from src.logger import logging
+from src.exception import securelinkException
+from src.utils import save_object, save_mmap_object
+from src.components.data_ingestion import DataIngestionConfig
+from src.components.data_transformation import DataTransformation
+from src.components.model_trainer import ModelTrainer, ModelTrainerConfig
+from src.pipeline.feedback import FeedbackConfig, FeedbackLog
+from src.pipeline.model_loader import ModelLoaderConfig, publish_model_version
+
+
+@dataclass
+class ModelUpdaterConfig:
+    # Configuration for folding analyst feedback into the served model
+    model_dir: str = "artifacts"
+    feedback_path: str = FeedbackConfig.path
+    # Last feedback entry folded in, plus a history of updates
+    state_file_path: str = os.path.join("artifacts", "model_update.json")
+    # Trees added to a random forest per update
+    trees_per_update: int = 10
+    # Training rows replayed alongside each feedback row when growing a forest
+    replay_ratio: int = 4
+    # Updates that lose more than this many test accuracy points are not published
+    max_accuracy_drop_pct: float = 1.0
+    ingestion_config: DataIngestionConfig = field(default_factory=DataIngestionConfig)
+
+
+class ModelUpdater:
+    """
+    Folds logged feedback into the current model without rerunning the pipeline.
+
+    No CSV is read and no features are extracted: feedback rows come with
+    their features, and the train/test splits are memory-mapped. The update
+    depends on the model:
+
+    - `partial_fit` estimators learn from the new feedback rows only;
+    - random forests are warm-started with `trees_per_update` extra trees
+      grown on the new feedback plus a replayed sample of training rows;
+    - anything else is refit once on the stored training rows plus all
+      feedback, skipping the six-candidate search.
+
+    The result is published with a new model version, which running workers
+    pick up on their next request.
+    """
+    def __init__(self):
+        self.model_updater_config = ModelUpdaterConfig()
+
+    def load_state(self):
+        try:
+            with open(self.model_updater_config.state_file_path) as state_file:
+                return json.load(state_file)
+        except FileNotFoundError:
+            return {"last_feedback_id": 0, "updates": []}
+
+    def save_state(self, state):
+        state_path = self.model_updater_config.state_file_path
+        os.makedirs(os.path.dirname(state_path), exist_ok=True)
+        with open(f"{state_path}.tmp", "w") as state_file:
+            json.dump(state, state_file, indent=2)
+        os.replace(f"{state_path}.tmp", state_path)
+
+    def replay_sample(self, X_train, y_train, size, seed):
+        # Random training rows mixed into a forest update so new trees still see the full distribution
+        rng = np.random.default_rng(seed)
+        rows = np.sort(rng.choice(len(X_train), size=min(size, len(X_train)), replace=False))
+        return X_train[rows], y_train[rows]
+
+    def update_model(self, model, new_data, all_feedback, train_data):
+        """
+        Apply one incremental update.
+
+        Returns:
+        tuple: (updated model, name of the strategy used)
+        """
+        X_new, y_new = new_data
+        X_train, y_train = train_data
+        config = self.model_updater_config
+
+        if hasattr(model, "partial_fit"):
+            model.partial_fit(X_new, y_new)
+            return model, "partial_fit"
+
+        if isinstance(model, RandomForestClassifier):
+            X_replay, y_replay = self.replay_sample(X_train, y_train, config.replay_ratio * len(X_new), len(model.estimators_))
+            X_fit = np.vstack([X_new, X_replay])
+            y_fit = np.concatenate([y_new, y_replay]).astype(y_train.dtype)
+            # New trees must see every class, otherwise their outputs don't line up with the old ones
+            if np.array_equal(np.unique(y_fit), model.classes_):
+                model.set_params(warm_start=True, n_estimators=len(model.estimators_) + config.trees_per_update)
+                model.fit(X_fit, y_fit)
+                return model, "warm_start"
+            logging.info("Feedback and replay rows miss a class; refitting the forest instead")
+
+        X_feedback, y_feedback = all_feedback
+        refit = clone(model)
+        refit.fit(np.vstack([X_train, X_feedback]), np.concatenate([y_train, y_feedback]).astype(y_train.dtype))
+        return refit, "refit"
+
+    def publish(self, model, X_check):
+        # Writing every artifact, then the version marker that tells workers to reload
+        trainer = ModelTrainer()
+        save_object(file_path=trainer.model_trainer_config.trained_model_file_path, obj=model)
+        save_mmap_object(file_path=trainer.model_trainer_config.mmap_model_file_path, obj=model)
+        trainer.export_compiled_model(model, X_check)
+        return publish_model_version(ModelLoaderConfig(model_dir=self.model_updater_config.model_dir))
+
+    def initiate_model_update(self):
+        try:
+            config = self.model_updater_config
+            state = self.load_state()
+            feedback_log = FeedbackLog(config.feedback_path)
+            ids, X_feedback, y_feedback = feedback_log.read()
+            new = ids > state["last_feedback_id"]
+            if not new.any():
+                logging.info("No new feedback since the last update")
+                return None
+
+            ingestion_config = config.ingestion_config
+            transformation = DataTransformation()
+            X_train, y_train = transformation.load_split(
+                (ingestion_config.train_features_path, ingestion_config.train_labels_path))
+            X_test, y_test = transformation.load_split(
+                (ingestion_config.test_features_path, ingestion_config.test_labels_path))
+
+            with open(ModelTrainerConfig.trained_model_file_path, "rb") as model_file:
+                model = pickle.load(model_file)
+            baseline_accuracy = float(model.score(X_test, y_test) * 100)
+
+            start = time.perf_counter()
+            model, strategy = self.update_model(
+                model, (X_feedback[new], y_feedback[new]), (X_feedback, y_feedback), (X_train, y_train))
+            update_seconds = time.perf_counter() - start
+
+            accuracy = float(model.score(X_test, y_test) * 100)
+            feedback_accuracy = float(model.score(X_feedback, y_feedback) * 100)
+            record = {
+                "strategy": strategy,
+                "feedback_rows": int(new.sum()),
+                "test_accuracy_before": baseline_accuracy,
+                "test_accuracy_after": accuracy,
+                "feedback_accuracy_after": feedback_accuracy,
+                "update_seconds": update_seconds,
+            }
+            logging.info(f"Model update: {record}")
+
+            if accuracy < baseline_accuracy - config.max_accuracy_drop_pct:
+                logging.warning(f"Not publishing: test accuracy fell from {baseline_accuracy:.2f}% to {accuracy:.2f}%")
+                record["published"] = False
+                return record
+
+            record["version"] = self.publish(model, X_test)
+            record["published"] = True
+            state["last_feedback_id"] = int(ids[-1])
+            state["updates"].append(record)
+            self.save_state(state)
+            logging.info(f"Published model version {record['version']}")
+            return record
+        except Exception as ex:
+            raise securelinkException(ex, sys)
+
+
+if __name__ == '__main__':
+    print(ModelUpdater().initiate_model_update())
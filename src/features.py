@@ -0,0 +1,210 @@
+import re
+from urllib.parse import scheme_chars, unquote, urlparse
+
+import numpy as np
+
+# Bump whenever extract_url_features changes so stored feature rows are recomputed
+FEATURE_SCHEMA_VERSION = 1
+
+# Feature columns in the exact order the model is trained and served on
+FEATURE_COLUMNS = ['hostname_length', 'path_length', 'fd_length', 'count_of_dash',
+                   'count_of_at', 'count_of_question', 'count_of_percent', 'count_of_dot',
+                   'count_of_equal', 'count_of_http', 'count_of_https', 'count_of_www',
+                   'count_of_digits', 'count_of_letters', 'count_of_dir', 'use_of_ip',
+                   'qty_hyphen_url', 'length_url', 'qty_tilde_url',
+                   'qty_dot_url', 'qty_percent_url', 'length_domain', 'params_length',
+                   'qty_and_params', 'qty_hyphens_params', 'directory_length',
+                   'qty_equal_params', 'qty_equal_url', 'qty_slash_url',
+                   'qty_slash_directory', 'file_length', 'qty_and_url', 'qty_dot_params']
+
+# Every character counted by some feature; several features repeat the same count
+COUNTED_CHARS = '-@?%.=/~&'
+
+# Intermediate values each row is assembled from: one count per COUNTED_CHARS
+# entry, then digits, letters and URL length, then the structural values
+# returned by _structure_features
+_SOURCES = [f'char:{char}' for char in COUNTED_CHARS] + [
+    'digits', 'letters', 'length',
+    'hostname_length', 'path_length', 'fd_length', 'http', 'https', 'www',
+    'use_of_ip', 'params_length', 'directory_length', 'file_length',
+]
+
+# Source feeding each entry of FEATURE_COLUMNS
+_COLUMN_SOURCES = [
+    'hostname_length', 'path_length', 'fd_length', 'char:-',
+    'char:@', 'char:?', 'char:%', 'char:.',
+    'char:=', 'http', 'https', 'www',
+    'digits', 'letters', 'char:/', 'use_of_ip',
+    'char:-', 'length', 'char:~',
+    'char:.', 'char:%', 'hostname_length', 'params_length',
+    'char:&', 'char:-', 'directory_length',
+    'char:=', 'char:=', 'char:/',
+    'char:/', 'file_length', 'char:&', 'char:.',
+]
+_COLUMN_INDEX = np.array([_SOURCES.index(source) for source in _COLUMN_SOURCES])
+# qty_slash_directory is the slash count minus one
+_SLASH_DIRECTORY = FEATURE_COLUMNS.index('qty_slash_directory')
+
+_CHAR_CODES = np.frombuffer(COUNTED_CHARS.encode('ascii'), dtype=np.uint8)
+_DIGIT_CODES = slice(ord('0'), ord('9') + 1)
+_UPPER_CODES = slice(ord('A'), ord('Z') + 1)
+_LOWER_CODES = slice(ord('a'), ord('z') + 1)
+# Below this many URLs the per-URL path is faster than building a histogram
+VECTORIZE_MIN_BATCH = 16
+
+_DIGIT_BYTES = bytes(range(ord('0'), ord('9') + 1))
+_LETTER_BYTES = bytes(range(ord('A'), ord('Z') + 1)) + bytes(range(ord('a'), ord('z') + 1))
+
+
+# URLs containing anything but printable ASCII, brackets (IPv6 hosts) or ';'
+# (path params) are left to urlparse; the rest take the fast split below
+_NEEDS_URLPARSE = re.compile(r'[^\x21-\x7e]|[\[\];]')
+_SCHEME_CHARS = frozenset(scheme_chars)
+
+
+def _split_url(url):
+    """
+    Split a URL into the (netloc, path, query) that urlparse would return.
+
+    For printable-ASCII URLs without brackets or ';', urlparse's control
+    character stripping, IPv6 validation and params splitting are all
+    no-ops, leaving the plain scheme/netloc/fragment/query splits done here.
+    """
+    if _NEEDS_URLPARSE.search(url):
+        parsed_url = urlparse(url)
+        return parsed_url.netloc, parsed_url.path, parsed_url.query
+    rest = url
+    colon = url.find(':')
+    if colon > 0 and url[0].isalpha() and _SCHEME_CHARS.issuperset(url[:colon]):
+        rest = url[colon + 1:]
+    netloc = ''
+    if rest[:2] == '//':
+        end = len(rest)
+        for delimiter in '/?#':
+            position = rest.find(delimiter, 2)
+            if 0 <= position < end:
+                end = position
+        netloc, rest = rest[2:end], rest[end:]
+    path, _, query = rest.partition('#')[0].partition('?')
+    return netloc, path, query
+
+
+def url_error(url):
+    """
+    Check that a URL can be featurized.
+
+    Only URLs that need urlparse can fail: it rejects malformed hosts such
+    as "http://[bad" (unbalanced IPv6 brackets) or netlocs that change
+    under NFKC normalization.
+
+    Returns:
+    str: Why the URL cannot be featurized, or None when it can.
+    """
+    if not _NEEDS_URLPARSE.search(url):
+        return None
+    try:
+        urlparse(url)
+    except ValueError as e:
+        return str(e)
+    return None
+
+
+def _count_query_params(query):
+    # len(parse_qs(query)): distinct unquoted names of '&'-separated fields with a non-empty value
+    names = set()
+    for field in query.split('&'):
+        name, separator, value = field.partition('=')
+        if separator and value:
+            names.add(unquote(name.replace('+', ' ')))
+    return len(names)
+
+
+def _structure_features(url):
+    # Values that depend on the parsed URL rather than on character counts, in _SOURCES order
+    domain, path, query = _split_url(url)
+    return (len(domain), len(path), len(url.rsplit('/', 1)[-1]),
+            url.count('http'), url.count('https'), url.count('www'),
+            1 if domain.replace('.', '').isdigit() else 0,
+            _count_query_params(query) if query else 0,
+            path.count('/') + 1, len(path.rsplit('/', 1)[-1]))
+
+
+def extract_url_features(url):
+    """
+    Extract the lexical features of a URL, shared by training and serving.
+
+    Each distinct character is counted once and the URL is split once;
+    repeated features reuse those values. Output matches the original
+    urlparse/parse_qs based definitions exactly.
+
+    Parameters:
+    url (str): The URL to featurize.
+
+    Returns:
+    list: One value per entry of FEATURE_COLUMNS, in the same order.
+    """
+    values = [url.count(char) for char in COUNTED_CHARS]
+    if url.isascii():
+        # Deleting a byte class and comparing lengths counts it in C
+        encoded = url.encode('ascii')
+        values.append(len(encoded) - len(encoded.translate(None, _DIGIT_BYTES)))
+        values.append(len(encoded) - len(encoded.translate(None, _LETTER_BYTES)))
+    else:
+        values.append(sum(c.isdigit() for c in url))
+        values.append(sum(c.isalpha() for c in url))
+    values.append(len(url))
+    values.extend(_structure_features(url))
+    row = [values[index] for index in _COLUMN_INDEX]
+    row[_SLASH_DIRECTORY] -= 1
+    return row
+
+
+def _ascii_feature_matrix(urls):
+    # Vectorized features for ASCII-only URLs: one byte histogram row per URL
+    lengths = np.fromiter(map(len, urls), dtype=np.int64, count=len(urls))
+    buffer = np.frombuffer(''.join(urls).encode('ascii'), dtype=np.uint8)
+    row_ids = np.repeat(np.arange(len(urls), dtype=np.int64), lengths)
+    histogram = np.bincount(row_ids * 256 + buffer, minlength=len(urls) * 256).reshape(len(urls), 256)
+
+    sources = np.empty((len(urls), len(_SOURCES)), dtype=np.int64)
+    n_chars = len(COUNTED_CHARS)
+    sources[:, :n_chars] = histogram[:, _CHAR_CODES]
+    sources[:, n_chars] = histogram[:, _DIGIT_CODES].sum(axis=1)
+    sources[:, n_chars + 1] = histogram[:, _UPPER_CODES].sum(axis=1) + histogram[:, _LOWER_CODES].sum(axis=1)
+    sources[:, n_chars + 2] = lengths
+    sources[:, n_chars + 3:] = [_structure_features(url) for url in urls]
+
+    matrix = sources[:, _COLUMN_INDEX]
+    matrix[:, _SLASH_DIRECTORY] -= 1
+    return matrix
+
+
+def build_feature_matrix(urls, batch_size=4096):
+    """
+    Featurize many URLs into one ready-to-score matrix.
+
+    ASCII URLs are encoded into a contiguous uint8 buffer and every
+    character count comes from a per-URL byte histogram computed with NumPy;
+    non-ASCII URLs (whose digit and letter counts follow Unicode rules) and
+    batches too small to amortize NumPy's overhead go through
+    extract_url_features. Output is identical to calling
+    extract_url_features on each URL.
+
+    Parameters:
+    urls (list): URLs to featurize.
+    batch_size (int): URLs histogrammed at once, bounding the (batch_size, 256) buffer.
+
+    Returns:
+    numpy.ndarray: int64 matrix of shape (len(urls), len(FEATURE_COLUMNS)).
+    """
+    urls = [str(url) for url in urls]
+    matrix = np.empty((len(urls), len(FEATURE_COLUMNS)), dtype=np.int64)
+    for start in range(0, len(urls), batch_size):
+        batch = urls[start:start + batch_size]
+        ascii_rows = [i for i, url in enumerate(batch) if url.isascii()] if len(batch) >= VECTORIZE_MIN_BATCH else []
+        if ascii_rows:
+            matrix[start + np.asarray(ascii_rows)] = _ascii_feature_matrix([batch[i] for i in ascii_rows])
+        if len(ascii_rows) < len(batch):
+            for i in sorted(set(range(len(batch))) - set(ascii_rows)):
+                matrix[start + i] = extract_url_features(batch[i])
+    return matrix
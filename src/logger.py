@@ -1,9 +1,16 @@
+import atexit
+import copy
+import json
 import logging
-from datetime import datetime
+import logging.handlers
 import os
+import queue
+import random
+import time
+from datetime import datetime
 
 # Directory where log files will be stored
-LOG_DIR = "secure_link_monitor_logs"
+LOG_DIR = os.environ.get("LOG_DIR", "secure_link_monitor_logs")
 
 # Current timestamp for naming the log file
 CURRENT_TIME_STAMP = f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}"
@@ -11,14 +18,214 @@ CURRENT_TIME_STAMP = f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}"
 # Name of the log file including the timestamp
 LOG_FILE_NAME = f"log_{CURRENT_TIME_STAMP}.log"
 
-# Create the log directory if it doesn't already exist
-os.makedirs(LOG_DIR,exist_ok=True)
-
 # Full path for the log file
 LOG_FILE_PATH = os.path.join(LOG_DIR,LOG_FILE_NAME)
 
-logging.basicConfig(filename=LOG_FILE_PATH,
-                    filemode='w',
-                    format='[%(asctime)s]%(name)s -%(levelname)s - %(message)s',
-                    level=logging.INFO
-                    )
\ No newline at end of file
+# Rotate the log file once it reaches this many bytes or this many seconds of age
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_MAX_AGE = 24 * 60 * 60
+LOG_BACKUP_COUNT = 5
+
+# Records buffered for the background writer before new ones are dropped
+LOG_QUEUE_SIZE = 10000
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One compact JSON object per record.
+
+    Fields passed with `extra=` (e.g. `extra={'event': 'probe_response'}`)
+    are included as top-level keys.
+    """
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'pid': record.process,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        # Queued records carry the traceback already rendered in exc_text (see DroppingQueueHandler)
+        exc = record.exc_text or (self.formatException(record.exc_info) if record.exc_info else None)
+        if exc:
+            entry['exc'] = exc
+        return json.dumps(entry, default=str, separators=(',', ':'))
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of the records of each message type.
+
+    The type is the record's `event` attribute; `rates` maps it to the share
+    of records kept. Warnings and errors are always kept.
+    """
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = rates or {}
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(getattr(record, 'event', None), 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class SizeAndTimeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    # Rotates when the file exceeds maxBytes or has been open for max_age seconds
+    def __init__(self, filename, max_bytes, max_age, backup_count):
+        self.log_file = filename
+        self.max_age = max_age
+        self.opened_at = time.time()
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True)
+
+    def _open(self):
+        # The directory is only created once something is actually logged
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        self.opened_at = time.time()
+        return super()._open()
+
+    def shouldRollover(self, record):
+        if self.stream is not None and time.time() - self.opened_at >= self.max_age:
+            return True
+        return super().shouldRollover(record)
+
+    def for_process(self, pid):
+        """
+        A handler of the same configuration writing `<name>.<pid><ext>` instead.
+
+        Rotation renames the file, so two processes must never share one:
+        a forked child (e.g. a gunicorn worker) switches to its own file.
+        """
+        root, ext = os.path.splitext(self.log_file)
+        handler = SizeAndTimeRotatingFileHandler(f"{root}.{pid}{ext}", self.maxBytes, self.max_age, self.backupCount)
+        handler.setLevel(self.level)
+        handler.setFormatter(self.formatter)
+        for log_filter in self.filters:
+            handler.addFilter(log_filter)
+        return handler
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    # Never blocks the caller: records that don't fit in the queue are counted and dropped
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Like QueueHandler.prepare, but the traceback is rendered into exc_text instead of being
+        # merged into the message, so JsonFormatter can still report it as its own field
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _traceback_formatter.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+# Renders tracebacks on the logging thread, while their frames are still alive
+_traceback_formatter = logging.Formatter()
+
+# Handler and listener installed by the last configure_logging call
+_queue_handler = None
+_listener = None
+
+
+def parse_sample_rates(spec):
+    # "probe_response=0.1,cache=0.5" -> {'probe_response': 0.1, 'cache': 0.5}
+    rates = {}
+    for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+        event, _, rate = item.partition('=')
+        rates[event.strip()] = float(rate)
+    return rates
+
+
+def configure_logging(log_file=LOG_FILE_PATH, stream=None, level=logging.INFO, sample_rates=None,
+                      max_bytes=LOG_MAX_BYTES, max_age=LOG_MAX_AGE, backup_count=LOG_BACKUP_COUNT,
+                      queue_size=LOG_QUEUE_SIZE):
+    """
+    Route all logging through a queue to a background writer thread.
+
+    The calling thread only samples the record and puts it on a bounded
+    queue; JSON formatting and file or stream I/O happen on the listener
+    thread. Calling this again replaces the previous configuration.
+
+    Parameters:
+    log_file (str): Rotating log file, or None to skip file logging. Forked
+    children (gunicorn workers) each write `<name>.<pid><ext>` next to it.
+    stream (file): Optional stream (e.g. sys.stderr) that also receives records.
+    level (int): Minimum level recorded.
+    sample_rates (dict): Share of records kept per `event`, see SamplingFilter.
+
+    Returns:
+    DroppingQueueHandler: The handler installed on the root logger.
+    """
+    global _queue_handler, _listener
+    shutdown_logging()
+
+    formatter = JsonFormatter()
+    handlers = []
+    if log_file:
+        handlers.append(SizeAndTimeRotatingFileHandler(log_file, max_bytes, max_age, backup_count))
+    if stream is not None:
+        handlers.append(logging.StreamHandler(stream))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    _queue_handler = DroppingQueueHandler(log_queue)
+    # Sampling runs before enqueueing so dropped records cost nothing further
+    _queue_handler.addFilter(SamplingFilter(sample_rates))
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+    return _queue_handler
+
+
+def shutdown_logging():
+    # Flush queued records and stop the writer thread
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def _restart_in_child():
+    # The writer thread does not survive fork(); give the child its own queue, writer and log file
+    global _listener
+    if _listener is not None:
+        handlers = []
+        for handler in _listener.handlers:
+            if isinstance(handler, SizeAndTimeRotatingFileHandler):
+                # Drop the parent's file; rotating it from here would pull it out from under the parent
+                handler.close()
+                handler = handler.for_process(os.getpid())
+            handlers.append(handler)
+        _queue_handler.queue = queue.Queue(maxsize=_queue_handler.queue.maxsize)
+        _listener = logging.handlers.QueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+
+
+atexit.register(shutdown_logging)
+os.register_at_fork(after_in_child=_restart_in_child)
+
+configure_logging(sample_rates=parse_sample_rates(os.environ.get("LOG_SAMPLE_RATES")))
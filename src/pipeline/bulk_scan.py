@@ -0,0 +1,157 @@
+"""
+Offline bulk scanner: stream a URL list through the trained model and write JSONL.
+
+    python -m src.pipeline.bulk_scan urls.txt results.jsonl
+    python -m src.pipeline.bulk_scan feed.csv results.jsonl --url-column url --probe --probe-rate 5
+
+Input is read in bounded chunks (newline-delimited, or CSV when the file
+ends in .csv or --url-column is given). Chunks are scored with vectorized
+inference across worker processes, which memory-map the model, and
+results are written in input order as they complete, so memory stays
+flat regardless of input size. A line that is not a parseable URL gets a
+{"url": ..., "error": ...} record and the scan carries on.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from itertools import islice
+from pathlib import Path
+# Adding the project root to the system path for module import
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+import pandas as pd
+
+from src.pipeline.model_loader import ModelLoaderConfig, load_model
+from src.pipeline.predict_pipeline import PredictPipeline
+from src.pipeline.probe import ProbeConfig, ProbeEngine, RateLimiter
+from src.pipeline.reputation import ReputationConfig, ReputationIndex
+
+# Scoring pipeline of the current worker process, set by _init_worker
+_worker_pipeline = None
+
+
+def _init_worker(model_dir):
+    global _worker_pipeline
+    _worker_pipeline = PredictPipeline(load_model(ModelLoaderConfig(model_dir=model_dir)),
+                                       reputation=ReputationIndex.load(ReputationConfig(index_dir=model_dir)))
+
+
+def prediction_record(prediction):
+    if prediction.error is not None:
+        return {'url': prediction.url, 'error': prediction.error}
+    return {'url': prediction.url, 'label': prediction.label, 'status': prediction.safe_status,
+            'probability': prediction.probability, 'source': prediction.source}
+
+
+def score_url(url):
+    try:
+        return prediction_record(_worker_pipeline.predict([url])[0])
+    except ValueError as e:
+        return {'url': url, 'error': str(e)}
+
+
+def score_chunk(urls):
+    # Worker task: one feature matrix and one predict_proba call for the whole chunk
+    # Malformed URLs come back as {"url", "error"} records instead of failing the chunk
+    try:
+        predictions = _worker_pipeline.predict(urls)
+    except ValueError as e:
+        # Score the chunk one URL at a time so only the offending lines are lost
+        logging.warning(f"Chunk of {len(urls)} URLs failed ({e}), scoring it URL by URL")
+        return [score_url(url) for url in urls]
+    return [prediction_record(p) for p in predictions]
+
+
+def iter_url_chunks(path, chunk_size, url_column=None):
+    # Yield lists of URLs, reading at most one chunk of the input at a time
+    if url_column or path.endswith('.csv'):
+        for chunk in pd.read_csv(path, usecols=[url_column or 'url'], chunksize=chunk_size):
+            yield chunk[url_column or 'url'].dropna().astype(str).tolist()
+        return
+    with open(path, encoding='utf-8', errors='replace') as url_file:
+        lines = (line.strip() for line in url_file)
+        urls = (line for line in lines if line and not line.startswith('#'))
+        while True:
+            chunk = list(islice(urls, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def probe_records(records, engine, limiter):
+    # Attach probe results, issuing probes no faster than the rate limiter allows
+    # Reputation hits are already decided and malformed URLs cannot be probed
+    probed = [record for record in records if record.get('source') == 'model']
+    futures = []
+    for record in probed:
+        limiter.acquire()
+        futures.append(engine.submit(record['url']))
+    for record, future in zip(probed, futures):
+        record['probe'] = asdict(future.result())
+
+
+def bulk_scan(input_path, output_path, model_dir='artifacts', chunk_size=10000, workers=None,
+              url_column=None, probe=False, probe_rate=5.0):
+    """
+    Score every URL in `input_path` and write one JSON object per line to `output_path`.
+
+    Returns:
+    int: The number of URLs scanned.
+    """
+    workers = workers or os.cpu_count() or 1
+    engine = ProbeEngine(ProbeConfig()) if probe else None
+    limiter = RateLimiter(probe_rate, burst=max(1, int(probe_rate))) if probe else None
+    scanned = 0
+    start = time.perf_counter()
+
+    def write(records, output_file):
+        if engine is not None:
+            probe_records(records, engine, limiter)
+        for record in records:
+            output_file.write(json.dumps(record) + '\n')
+        output_file.flush()
+        return len(records)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_dir,)) as executor, \
+            open(output_path, 'w', encoding='utf-8') as output_file:
+        pending = deque()
+        for urls in iter_url_chunks(input_path, chunk_size, url_column):
+            pending.append(executor.submit(score_chunk, urls))
+            # Keep a bounded number of chunks in flight so memory stays flat
+            if len(pending) >= 2 * workers:
+                scanned += write(pending.popleft().result(), output_file)
+                logging.info(f"Scanned {scanned} URLs ({scanned / (time.perf_counter() - start):.0f} URLs/s)")
+        while pending:
+            scanned += write(pending.popleft().result(), output_file)
+
+    if engine is not None:
+        engine.close()
+    logging.info(f"Bulk scan finished: {scanned} URLs in {time.perf_counter() - start:.1f}s")
+    return scanned
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help='Newline-delimited URL file or CSV')
+    parser.add_argument('output', help='JSONL file to write results to')
+    parser.add_argument('--model-dir', default='artifacts', help='Directory holding model.joblib / model.pkl')
+    parser.add_argument('--url-column', help='CSV column holding the URLs (default: url)')
+    parser.add_argument('--chunk-size', type=int, default=10000, help='URLs scored per model call')
+    parser.add_argument('--workers', type=int, default=None, help='Scoring processes (default: one per core)')
+    parser.add_argument('--probe', action='store_true', help='Also run the SSL and header checks')
+    parser.add_argument('--probe-rate', type=float, default=5.0, help='Maximum probes started per second')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    bulk_scan(args.input, args.output, model_dir=args.model_dir, chunk_size=args.chunk_size,
+              workers=args.workers, url_column=args.url_column, probe=args.probe, probe_rate=args.probe_rate)
+
+
+if __name__ == '__main__':
+    main()
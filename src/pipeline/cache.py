@@ -0,0 +1,215 @@
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlsplit, urlunsplit
+
+# Ports dropped from cache keys because they are implied by the scheme
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url):
+    # Canonical form of a URL for lookups: trimmed, lower-case scheme and host, no fragment
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', parts.query, ''))
+
+
+def host_key(url):
+    # Cache key for probe results, which depend only on scheme and host
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port != DEFAULT_PORTS.get(scheme):
+        return f"{scheme}://{host}:{port}"
+    return f"{scheme}://{host}"
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with per-entry expiry and LRU eviction.
+    """
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        # `ttl` overrides the cache-wide lifetime for this entry
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {'size': len(self._data), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+
+class SQLiteCache:
+    """
+    Cache stored in a SQLite file so every gunicorn worker on a host shares it.
+
+    Entries expire after `ttl` seconds; once the table grows past `maxsize`
+    the least recently read entries are evicted.
+    """
+    # Eviction runs every this many writes rather than on each one
+    EVICT_EVERY = 64
+
+    def __init__(self, path, table, maxsize, ttl):
+        self.path = path
+        self.table = table
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        dir_path = os.path.dirname(path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+
+    @property
+    def conn(self):
+        # SQLite connections must not cross fork(), so each worker process opens its own
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value BLOB, expires REAL, accessed REAL)"
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table} (accessed)")
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key):
+        now = time.time()
+        try:
+            with self._lock:
+                row = self.conn.execute(
+                    f"SELECT value FROM {self.table} WHERE key = ? AND expires > ?", (key, now)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                self.conn.execute(f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (now, key))
+                self.hits += 1
+            return pickle.loads(row[0])
+        except sqlite3.Error as e:
+            logging.error(f"Shared cache read failed for {key}: {e}")
+            return None
+
+    def set(self, key, value):
+        now = time.time()
+        try:
+            with self._lock:
+                self.conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                    (key, pickle.dumps(value), now + self.ttl, now),
+                )
+                self._writes += 1
+                if self._writes % self.EVICT_EVERY == 0:
+                    self._evict(now)
+        except sqlite3.Error as e:
+            logging.error(f"Shared cache write failed for {key}: {e}")
+
+    def _evict(self, now):
+        self.conn.execute(f"DELETE FROM {self.table} WHERE expires <= ?", (now,))
+        self.conn.execute(
+            f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM {self.table} "
+            "ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.maxsize,),
+        )
+
+    def stats(self):
+        return {'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+
+class TieredCache:
+    """
+    In-process TTLCache in front of an optional shared SQLiteCache.
+
+    Shared hits are copied into the local tier so the next lookup stays in process.
+    """
+    def __init__(self, local, shared=None):
+        self.local = local
+        self.shared = shared
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self.local.set(key, value)
+        if self.shared is not None:
+            self.shared.set(key, value)
+
+    def stats(self):
+        stats = {'local': self.local.stats()}
+        if self.shared is not None:
+            stats['shared'] = self.shared.stats()
+        return stats
+
+
+@dataclass
+class CacheConfig:
+    # Configuration for the verdict and probe caches
+    verdict_maxsize: int = 10000
+    verdict_ttl: float = 3600
+    probe_maxsize: int = 5000
+    probe_ttl: float = 900
+    # SQLite file shared by all workers; None keeps both caches in process only
+    shared_path: Optional[str] = None
+
+
+def build_caches(config=None):
+    """
+    Create the verdict and probe caches described by a CacheConfig.
+
+    Returns:
+    tuple: (verdict_cache, probe_cache), both TieredCache instances.
+    """
+    config = config or CacheConfig()
+    shared_verdicts = shared_probes = None
+    if config.shared_path:
+        shared_verdicts = SQLiteCache(config.shared_path, 'verdicts', config.verdict_maxsize, config.verdict_ttl)
+        shared_probes = SQLiteCache(config.shared_path, 'probes', config.probe_maxsize, config.probe_ttl)
+    return (
+        TieredCache(TTLCache(config.verdict_maxsize, config.verdict_ttl), shared_verdicts),
+        TieredCache(TTLCache(config.probe_maxsize, config.probe_ttl), shared_probes),
+    )
@@ -0,0 +1,151 @@
+import logging
+import socket
+import ssl
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+from src.pipeline.cache import TTLCache
+from src.pipeline.metrics import PROBE_ERRORS, PROBE_TIMEOUTS, STAGE_LATENCY
+
+# OpenSSL verify codes reported when the certificate does not cover the host name or IP
+X509_V_ERR_HOSTNAME_MISMATCH = 62
+X509_V_ERR_IP_ADDRESS_MISMATCH = 64
+
+
+@dataclass
+class CertificateInfo:
+    # Result of one TLS handshake against host:port
+    host: str
+    port: int
+    valid: bool = False
+    hostname_match: Optional[bool] = None
+    issuer: Optional[str] = None
+    subject: Optional[str] = None
+    not_after: Optional[float] = None
+    san: List[str] = field(default_factory=list)
+    protocol: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def expires_in_days(self):
+        if self.not_after is None:
+            return None
+        return int((self.not_after - time.time()) // 86400)
+
+
+def _name_field(name, *keys):
+    # Pick the first matching attribute from an ssl-style distinguished name
+    attributes = dict(pair for rdn in name for pair in rdn)
+    for key in keys:
+        if key in attributes:
+            return attributes[key]
+    return None
+
+
+def certificate_target(url):
+    # TLS endpoint to inspect for a URL: its own port for https, otherwise 443
+    parts = urlsplit(url.strip())
+    port = parts.port if parts.scheme.lower() == 'https' and parts.port else 443
+    return (parts.hostname or '').lower(), port
+
+
+def inspect_certificate(host, port=443, connect_timeout=3.05, handshake_timeout=5, context=None):
+    """
+    Perform only a TLS handshake and report on the peer certificate.
+
+    Parameters:
+    host (str): Host name to connect to and verify the certificate against.
+    port (int): TLS port.
+    connect_timeout (float): Timeout in seconds for the TCP connect.
+    handshake_timeout (float): Timeout in seconds for the TLS handshake.
+    context (ssl.SSLContext): Verifying context, defaults to the system trust store.
+
+    Returns:
+    CertificateInfo: Validity, issuer, expiry, SAN match and protocol version.
+    """
+    info = CertificateInfo(host=host, port=port)
+    context = context or ssl.create_default_context()
+    try:
+        with socket.create_connection((host, port), timeout=connect_timeout) as sock:
+            sock.settimeout(handshake_timeout)
+            with context.wrap_socket(sock, server_hostname=host) as tls:
+                cert = tls.getpeercert()
+                info.protocol = tls.version()
+    except ssl.SSLCertVerificationError as e:
+        logging.error(f"SSL certificate error for {host}:{port}: {e.verify_message}")
+        info.error = e.verify_message or str(e)
+        if e.verify_code in (X509_V_ERR_HOSTNAME_MISMATCH, X509_V_ERR_IP_ADDRESS_MISMATCH):
+            info.hostname_match = False
+        return info
+    except TimeoutError as e:
+        logging.error(f"TLS handshake timed out for {host}:{port}: {e}")
+        PROBE_TIMEOUTS.inc(check="tls")
+        info.error = str(e) or "timed out"
+        return info
+    except (ssl.SSLError, OSError, ValueError) as e:
+        logging.error(f"TLS handshake failed for {host}:{port}: {e}")
+        PROBE_ERRORS.inc(check="tls")
+        info.error = str(e)
+        return info
+
+    # A completed handshake under the default context means the chain and host name verified
+    info.valid = True
+    info.hostname_match = True
+    info.issuer = _name_field(cert.get('issuer', ()), 'organizationName', 'commonName')
+    info.subject = _name_field(cert.get('subject', ()), 'commonName')
+    info.san = [value for kind, value in cert.get('subjectAltName', ()) if kind == 'DNS']
+    if 'notAfter' in cert:
+        info.not_after = ssl.cert_time_to_seconds(cert['notAfter'])
+    return info
+
+
+class CertificateInspector:
+    """
+    Caches certificate inspections per host:port.
+
+    A valid certificate is reused until `expiry_margin` seconds before it
+    expires (capped at `max_ttl`); failed handshakes are retried after
+    `failure_ttl` seconds.
+    """
+    def __init__(self, maxsize=5000, max_ttl=86400, expiry_margin=3600, failure_ttl=60,
+                 connect_timeout=3.05, handshake_timeout=5):
+        self.cache = TTLCache(maxsize, max_ttl)
+        self.max_ttl = max_ttl
+        self.expiry_margin = expiry_margin
+        self.failure_ttl = failure_ttl
+        self.connect_timeout = connect_timeout
+        self.handshake_timeout = handshake_timeout
+        self.context = ssl.create_default_context()
+
+    def inspect(self, host, port=443, timeout=None):
+        """
+        Parameters:
+        timeout (tuple): Optional (connect, handshake) timeouts replacing the
+        configured ones, e.g. to fit a request deadline.
+        """
+        key = f"{host}:{port}"
+        info = self.cache.get(key)
+        if info is None:
+            connect_timeout, handshake_timeout = timeout or (self.connect_timeout, self.handshake_timeout)
+            with STAGE_LATENCY.time(stage="probe_tls"):
+                info = inspect_certificate(host, port, connect_timeout, handshake_timeout, self.context)
+            # A failure under shortened timeouts says little about the site, so it is not remembered
+            if info.valid or timeout is None:
+                self.cache.set(key, info, ttl=self._ttl(info))
+        return info
+
+    def inspect_url(self, url, timeout=None):
+        return self.inspect(*certificate_target(url), timeout=timeout)
+
+    def cached(self, url):
+        # The remembered inspection for a URL's TLS endpoint, or None when a handshake is needed
+        host, port = certificate_target(url)
+        return self.cache.get(f"{host}:{port}")
+
+    def _ttl(self, info):
+        if not info.valid or info.not_after is None:
+            return self.failure_ttl
+        remaining = info.not_after - time.time() - self.expiry_margin
+        return max(0, min(self.max_ttl, remaining))
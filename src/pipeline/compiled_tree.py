@@ -0,0 +1,193 @@
+import logging
+import os
+import struct
+import zipfile
+
+import numpy as np
+
+# Child index marking a leaf in sklearn's tree arrays
+TREE_LEAF = -1
+# Per-node arrays, memory-mapped when a compiled model is loaded with mmap_mode
+NODE_ARRAYS = ("feature", "threshold", "left", "right", "value")
+# Size of a zip local file header before its variable-length name and extra fields
+_ZIP_LOCAL_HEADER = struct.Struct("<4s22xHH")
+
+
+def _map_npz_member(npz_file, info, file_path, mmap_mode):
+    # Memory-map one uncompressed .npy member of a .npz archive where it lies in the file
+    npz_file.seek(info.header_offset)
+    signature, name_length, extra_length = _ZIP_LOCAL_HEADER.unpack(npz_file.read(_ZIP_LOCAL_HEADER.size))
+    if signature != b"PK\x03\x04" or info.compress_type != zipfile.ZIP_STORED:
+        return None
+    npz_file.seek(name_length + extra_length, os.SEEK_CUR)
+    if np.lib.format.read_magic(npz_file) == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(npz_file)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(npz_file)
+    if dtype.hasobject:
+        return None
+    return np.memmap(file_path, dtype=dtype, mode=mmap_mode, offset=npz_file.tell(), shape=shape,
+                     order="F" if fortran_order else "C")
+
+
+def _estimators(model):
+    # The fitted trees of a DecisionTreeClassifier or RandomForestClassifier
+    if hasattr(model, "estimators_"):
+        return list(model.estimators_)
+    if hasattr(model, "tree_"):
+        return [model]
+    return None
+
+
+def is_tree_model(model):
+    return _estimators(model) is not None and hasattr(model, "classes_")
+
+
+def export_tree_model(model, file_path):
+    """
+    Flatten a fitted tree or forest into contiguous node arrays.
+
+    Every tree is appended to one set of arrays, with child indices offset
+    to global node ids and leaf values normalized to class probabilities.
+
+    Parameters:
+    model (object): Fitted DecisionTreeClassifier or RandomForestClassifier.
+    file_path (str): Destination .npz file, written uncompressed so the node
+    arrays can be memory-mapped in place.
+    """
+    trees = [estimator.tree_ for estimator in _estimators(model)]
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees])[:-1]
+
+    feature, threshold, left, right, value = [], [], [], [], []
+    for tree, offset in zip(trees, offsets):
+        is_leaf = tree.children_left == TREE_LEAF
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(tree.threshold)
+        # Leaves point at themselves so a walk can keep stepping once it arrives
+        own_ids = np.arange(tree.node_count) + offset
+        left.append(np.where(is_leaf, own_ids, tree.children_left + offset))
+        right.append(np.where(is_leaf, own_ids, tree.children_right + offset))
+        counts = tree.value[:, 0, :]
+        value.append(counts / counts.sum(axis=1, keepdims=True))
+
+    dir_path = os.path.dirname(file_path)
+    if dir_path:
+        os.makedirs(dir_path, exist_ok=True)
+    np.savez(
+        file_path,
+        feature=np.concatenate(feature).astype(np.intp),
+        threshold=np.concatenate(threshold).astype(np.float64),
+        left=np.concatenate(left).astype(np.intp),
+        right=np.concatenate(right).astype(np.intp),
+        value=np.concatenate(value).astype(np.float64),
+        roots=offsets.astype(np.intp),
+        max_depth=np.array(max(tree.max_depth for tree in trees)),
+        classes=np.asarray(model.classes_),
+        n_features=np.array(model.n_features_in_),
+    )
+
+
+class CompiledTreeModel:
+    """
+    Evaluates an exported tree model with plain NumPy.
+
+    A single tree is walked node by node; a forest advances all of its trees
+    one level per vectorized step and stops once every walk has reached a
+    leaf. Either way there is none of sklearn's per-call validation and
+    dispatch. Exposes `classes_` and `predict_proba` so it can stand in for
+    the estimator in PredictPipeline.
+    """
+    # Steps between checks for whether every walk has reached a leaf
+    LEAF_CHECK_EVERY = 4
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, classes, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+        self.n_features_in_ = int(n_features)
+        self.is_leaf = left == np.arange(left.shape[0])
+        # Buffer views give cheap scalar access for the single-tree walk
+        self._views = (memoryview(feature), memoryview(threshold), memoryview(left), memoryview(right))
+
+    @classmethod
+    def load(cls, file_path, mmap_mode=None):
+        """
+        Load an export written by `export_tree_model`.
+
+        With `mmap_mode` (e.g. "r") the node arrays are memory-mapped straight
+        out of the uncompressed archive instead of being read into private
+        memory, so every process that loads the same file shares their pages
+        through the OS page cache, including after a hot reload.
+        """
+        with np.load(file_path, allow_pickle=False) as arrays:
+            loaded = {name: arrays[name] for name in arrays.files if mmap_mode is None or name not in NODE_ARRAYS}
+        if mmap_mode is not None:
+            with zipfile.ZipFile(file_path) as archive, open(file_path, "rb") as npz_file:
+                for name in NODE_ARRAYS:
+                    mapped = _map_npz_member(npz_file, archive.getinfo(f"{name}.npy"), file_path, mmap_mode)
+                    # Compressed or unusual members fall back to an ordinary read
+                    if mapped is None:
+                        with np.load(file_path, allow_pickle=False) as arrays:
+                            mapped = arrays[name]
+                    loaded[name] = mapped
+        return cls(**loaded)
+
+    def _walk(self, nodes, values_at):
+        # Advance every walk to its leaf; `values_at(nodes)` gives each walk's feature values
+        for depth in range(self.max_depth):
+            go_left = values_at(nodes) <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+            if depth % self.LEAF_CHECK_EVERY == self.LEAF_CHECK_EVERY - 1 and self.is_leaf[nodes].all():
+                break
+        return nodes
+
+    def _predict_proba_row(self, x):
+        if self.roots.shape[0] == 1:
+            feature, threshold, left, right = self._views
+            values = x.tolist()
+            node = int(self.roots[0])
+            while not self.is_leaf[node]:
+                node = left[node] if values[feature[node]] <= threshold[node] else right[node]
+            return self.value[node][None, :]
+        nodes = self._walk(self.roots, lambda nodes: x[self.feature[nodes]])
+        return self.value[nodes].mean(axis=0, keepdims=True)
+
+    def predict_proba(self, X):
+        # sklearn compares float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        if X.shape[0] == 1:
+            return self._predict_proba_row(X[0])
+        rows = np.arange(X.shape[0])[:, None]
+        roots = np.broadcast_to(self.roots, (X.shape[0], self.roots.shape[0]))
+        nodes = self._walk(roots, lambda nodes: X[rows, self.feature[nodes]])
+        return self.value[nodes].mean(axis=1)
+
+    def predict_with_proba(self, X):
+        # Labels and probabilities from a single pass over the trees
+        probabilities = self.predict_proba(X)
+        return self.classes_[probabilities.argmax(axis=1)], probabilities
+
+    def predict(self, X):
+        return self.predict_with_proba(X)[0]
+
+
+def verify_compiled_model(model, compiled, X):
+    """
+    Check that a compiled model reproduces sklearn's labels and probabilities.
+
+    Returns:
+    bool: True when both match on every row of X.
+    """
+    expected_proba = model.predict_proba(X)
+    expected_labels = model.predict(X)
+    labels, probabilities = compiled.predict_with_proba(X)
+    matches = np.allclose(probabilities, expected_proba) and np.array_equal(labels, expected_labels)
+    if not matches:
+        mismatched = int((labels != expected_labels).sum())
+        logging.error(f"Compiled tree model disagrees with sklearn on {mismatched} of {len(labels)} labels")
+    return matches
@@ -0,0 +1,97 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.features import FEATURE_COLUMNS, FEATURE_SCHEMA_VERSION, build_feature_matrix, extract_url_features
+
+
+@dataclass
+class FeedbackConfig:
+    # Location of the analyst feedback log
+    path: str = os.path.join("artifacts", "feedback.db")
+
+
+class FeedbackLog:
+    """
+    Append-only log of analyst-corrected verdicts.
+
+    Each entry keeps the URL, the corrected label and the URL's feature row
+    (tagged with the feature schema version), so retraining reads ready-made
+    rows instead of re-extracting features. SQLite in WAL mode lets every
+    gunicorn worker append to the same file.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        dir_path = os.path.dirname(path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+
+    @property
+    def conn(self):
+        # SQLite connections must not cross fork(), so each worker process opens its own
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS feedback "
+                "(id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT, label INTEGER, "
+                "schema_version INTEGER, features BLOB, created REAL)"
+            )
+            self._pid = os.getpid()
+        return self._conn
+
+    def record(self, urls, labels):
+        """
+        Append corrected verdicts.
+
+        Returns:
+        int: The id of the last entry written.
+        """
+        features = build_feature_matrix(urls)
+        now = time.time()
+        rows = [
+            (url, int(label), FEATURE_SCHEMA_VERSION, row.tobytes(), now)
+            for url, label, row in zip(urls, labels, features)
+        ]
+        with self._lock:
+            self.conn.executemany(
+                "INSERT INTO feedback (url, label, schema_version, features, created) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            last_id = self.conn.execute("SELECT MAX(id) FROM feedback").fetchone()[0]
+        logging.info(f"Recorded {len(rows)} feedback entries", extra={'event': 'feedback'})
+        return last_id
+
+    def read(self, after_id=0):
+        """
+        Read the entries logged after `after_id`.
+
+        Rows stored under an older feature schema are re-extracted from their URL.
+
+        Returns:
+        tuple: (ids, features, labels) as arrays, oldest entry first.
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, url, label, schema_version, features FROM feedback WHERE id > ? ORDER BY id", (after_id,)
+            ).fetchall()
+        features = np.empty((len(rows), len(FEATURE_COLUMNS)), dtype=np.int64)
+        for i, (_, url, _, schema_version, blob) in enumerate(rows):
+            if schema_version == FEATURE_SCHEMA_VERSION:
+                features[i] = np.frombuffer(blob, dtype=np.int64)
+            else:
+                features[i] = extract_url_features(url)
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        labels = np.array([row[2] for row in rows], dtype=np.int64)
+        return ids, features, labels
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM feedback").fetchone()[0]
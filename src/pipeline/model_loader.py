@@ -0,0 +1,164 @@
+import logging
+import os
+import pickle
+import threading
+import time
+from dataclasses import dataclass
+
+import joblib
+import numpy as np
+
+from src.pipeline.compiled_tree import CompiledTreeModel, verify_compiled_model
+
+
+@dataclass
+class ModelLoaderConfig:
+    # Configuration for loading the serving model
+    model_dir: str = "artifacts"
+    mmap_file_name: str = "model.joblib"
+    pickle_file_name: str = "model.pkl"
+    compiled_file_name: str = "model_trees.npz"
+    # Written last whenever new artifacts are published; running workers reload when it changes
+    version_file_name: str = "model_version"
+    # Memory-map mode for the joblib arrays and the compiled node arrays; None reads them into private memory
+    mmap_mode: str = "r"
+
+
+def load_model(config=None):
+    """
+    Load the serving model, preferring the memory-mappable joblib artifact.
+
+    Plain ndarray attributes, such as linear model coefficients, stay mapped
+    from the file and are shared through the OS page cache. sklearn trees are
+    not: unpickling a DecisionTree or RandomForest copies its node arrays
+    into private memory, so workers only share them copy-on-write when the
+    model was loaded before forking (`gunicorn --preload`), and each hot
+    reload gives every worker its own copy. The legacy model.pkl is used
+    when no joblib artifact exists. Load time and artifact size are logged.
+
+    Returns:
+    object: The fitted estimator.
+    """
+    config = config or ModelLoaderConfig()
+    mmap_path = os.path.join(config.model_dir, config.mmap_file_name)
+    pickle_path = os.path.join(config.model_dir, config.pickle_file_name)
+    path = mmap_path if os.path.exists(mmap_path) else pickle_path
+
+    start = time.perf_counter()
+    if path == mmap_path:
+        model = joblib.load(path, mmap_mode=config.mmap_mode)
+    else:
+        with open(path, 'rb') as model_file:
+            model = pickle.load(model_file)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    logging.info(
+        f"Loaded {type(model).__name__} from {path} in {elapsed_ms:.1f} ms "
+        f"({size_mb:.2f} MB, mmap_mode={config.mmap_mode if path == mmap_path else None}, pid={os.getpid()})"
+    )
+    return model
+
+
+def load_compiled_model(model, config=None, check_rows=256):
+    """
+    Load the compiled tree evaluator exported next to the model, if any.
+
+    The evaluator is checked against `model` on synthetic feature rows so a
+    stale export left over from an earlier training run is never served. Its
+    node arrays are memory-mapped with `config.mmap_mode`, so unlike the
+    sklearn trees they stay shared between workers across reloads.
+
+    Returns:
+    CompiledTreeModel: The evaluator, or None when there is no export or it
+    disagrees with the model.
+    """
+    config = config or ModelLoaderConfig()
+    compiled_path = os.path.join(config.model_dir, config.compiled_file_name)
+    if not os.path.exists(compiled_path):
+        return None
+    compiled = CompiledTreeModel.load(compiled_path, mmap_mode=config.mmap_mode)
+    if compiled.n_features_in_ != getattr(model, "n_features_in_", None):
+        logging.warning(f"Ignoring {compiled_path}: feature count differs from the model")
+        return None
+    rng = np.random.default_rng(0)
+    X_check = rng.integers(0, 100, size=(check_rows, compiled.n_features_in_))
+    if not verify_compiled_model(model, compiled, X_check):
+        logging.warning(f"Ignoring {compiled_path}: predictions differ from the model")
+        return None
+    logging.info(f"Loaded compiled tree model from {compiled_path} ({compiled.roots.shape[0]} trees)")
+    return compiled
+
+
+def read_model_version(config=None):
+    # Version string of the published artifacts, or None if none was ever published
+    config = config or ModelLoaderConfig()
+    try:
+        with open(os.path.join(config.model_dir, config.version_file_name)) as version_file:
+            return version_file.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def publish_model_version(config=None):
+    """
+    Mark the artifacts in `config.model_dir` as a new model version.
+
+    Call once every artifact is in place: the marker is swapped in with an
+    atomic rename, so a worker never sees a version whose files are missing.
+
+    Returns:
+    str: The new version.
+    """
+    config = config or ModelLoaderConfig()
+    version = f"{time.time_ns()}-{os.getpid()}"
+    version_path = os.path.join(config.model_dir, config.version_file_name)
+    with open(f"{version_path}.tmp", "w") as version_file:
+        version_file.write(version)
+    os.replace(f"{version_path}.tmp", version_path)
+    return version
+
+
+class ModelWatcher:
+    """
+    Notices newly published model versions without a restart.
+
+    `poll()` is cheap enough to call on every request: it reads the version
+    marker at most once per `interval` seconds, and reports each new
+    version to exactly one caller.
+    """
+    def __init__(self, config=None, interval=5.0):
+        self.config = config or ModelLoaderConfig()
+        self.interval = interval
+        self.version = read_model_version(self.config)
+        self._next_check = time.monotonic() + interval
+        self._lock = threading.Lock()
+
+    def poll(self):
+        # The new version if it changed since the last poll, else None
+        if time.monotonic() < self._next_check or not self._lock.acquire(blocking=False):
+            return None
+        try:
+            self._next_check = time.monotonic() + self.interval
+            version = read_model_version(self.config)
+            if version is None or version == self.version:
+                return None
+            self.version = version
+            return version
+        finally:
+            self._lock.release()
+
+
+def export_mmap_model(config=None):
+    # Convert an existing model.pkl into the memory-mappable joblib artifact
+    config = config or ModelLoaderConfig()
+    with open(os.path.join(config.model_dir, config.pickle_file_name), 'rb') as model_file:
+        model = pickle.load(model_file)
+    mmap_path = os.path.join(config.model_dir, config.mmap_file_name)
+    # Compression must stay off, otherwise joblib cannot memory-map the arrays
+    joblib.dump(model, mmap_path, compress=0)
+    return mmap_path
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(export_mmap_model())
@@ -0,0 +1,110 @@
+from dataclasses import dataclass, replace
+from typing import List, Optional
+
+import numpy as np
+
+from src.features import build_feature_matrix, url_error
+from src.pipeline.metrics import STAGE_LATENCY
+from src.pipeline.reputation import ALLOW, DENY
+
+# Verdicts given to reputation hits: allowed URLs are safe, denied ones certainly unsafe
+REPUTATION_PREDICTIONS = {ALLOW: (0, 0.0), DENY: (1, 100.0)}
+
+
+@dataclass
+class Prediction:
+    # Model verdict for one URL
+    url: str
+    label: Optional[int]
+    # Probability (%) of the positive class, as shown on the result page
+    probability: Optional[float]
+    # "model", "allow"/"deny" when the reputation index answered, or "invalid"
+    source: str = 'model'
+    # Why an "invalid" URL could not be scored; it then has no label or probability
+    error: Optional[str] = None
+
+    @property
+    def safe_status(self):
+        return 'safe' if str(self.label) == '0' else 'unsafe'
+
+
+class PredictPipeline:
+    """
+    Scores URLs with the trained model.
+
+    All URLs in a call share one feature matrix and a single `predict_proba`
+    call; labels are derived from those probabilities instead of a separate
+    `predict` pass. With a cache, verdicts are reused per exact URL string
+    (case and fragment change the features, so they change the key) and only
+    the misses are scored. Single URLs go through the compiled tree
+    evaluator when one is available. URLs listed in the optional reputation
+    index are answered from it before any of that, and malformed URLs get
+    an "invalid" prediction carrying the error instead of failing the call.
+    """
+    def __init__(self, model, cache=None, compiled=None, reputation=None, cache_namespace=''):
+        self.model = model
+        self.cache = cache
+        self.compiled = compiled
+        self.reputation = reputation
+        # Prefix of verdict cache keys, so verdicts of a replaced model are never reused
+        self.cache_namespace = cache_namespace
+
+    def build_features(self, urls):
+        # Stack the features of every URL into one (n_urls, n_features) matrix
+        return build_feature_matrix(urls)
+
+    def reject_invalid(self, url):
+        # Prediction explaining why a URL cannot be scored, or None when it is well-formed
+        error = url_error(url)
+        if error is None:
+            return None
+        return Prediction(url=url, label=None, probability=None, source='invalid', error=f"Invalid URL: {error}")
+
+    def lookup_reputation(self, url):
+        # Prediction from the reputation index, or None when the URL is not listed
+        verdict = self.reputation.lookup(url) if self.reputation is not None else None
+        if verdict is None:
+            return None
+        label, probability = REPUTATION_PREDICTIONS[verdict]
+        return Prediction(url=url, label=label, probability=probability, source=verdict)
+
+    def predict(self, urls) -> List[Prediction]:
+        predictions = [self.reject_invalid(url) or self.lookup_reputation(url) for url in urls]
+        missing = [i for i, prediction in enumerate(predictions) if prediction is None]
+        for i, prediction in zip(missing, self.predict_unlisted([urls[i] for i in missing])):
+            predictions[i] = prediction
+        return predictions
+
+    def predict_unlisted(self, urls) -> List[Prediction]:
+        # Model verdicts, through the verdict cache when there is one
+        if self.cache is None:
+            return self.score(urls)
+
+        keys = [self.cache_namespace + url for url in urls]
+        predictions = [self.cache.get(key) for key in keys]
+        missing = [i for i, prediction in enumerate(predictions) if prediction is None]
+        scored = self.score([urls[i] for i in missing])
+        for i, prediction in zip(missing, scored):
+            self.cache.set(keys[i], prediction)
+            predictions[i] = prediction
+        return [replace(prediction, url=url) for url, prediction in zip(urls, predictions)]
+
+    def score(self, urls) -> List[Prediction]:
+        # Score URLs with the model, bypassing the cache
+        if not urls:
+            return []
+        with STAGE_LATENCY.time(stage="feature_extraction"):
+            features = self.build_features(urls)
+        # sklearn's per-call overhead dominates single rows; its batch path wins beyond that
+        scorer = self.compiled if self.compiled is not None and len(urls) == 1 else self.model
+        with STAGE_LATENCY.time(stage="inference"):
+            probabilities = scorer.predict_proba(features)
+        labels = scorer.classes_[probabilities.argmax(axis=1)]
+        positive = np.round(probabilities[:, 1] * 100, 2)
+        return [
+            Prediction(url=url, label=int(label), probability=float(p))
+            for url, label, p in zip(urls, labels, positive)
+        ]
+
+    def predict_one(self, url):
+        return self.predict([url])[0]
@@ -0,0 +1,529 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.pipeline.cache import host_key
+from src.pipeline.certificate import CertificateInfo, CertificateInspector, certificate_target
+from src.pipeline.metrics import PROBE_ERRORS, PROBE_TIMEOUTS, REGISTRY, STAGE_LATENCY
+
+PROBE_COALESCED = REGISTRY.counter(
+    "slm_probe_coalesced_total", "Probes answered by an identical probe already in flight.")
+PROBE_THROTTLED = REGISTRY.counter(
+    "slm_probe_throttled_total", "Outbound checks delayed by the per-host rate limit.")
+PROBE_DEADLINE_EXCEEDED = REGISTRY.counter(
+    "slm_probe_deadline_exceeded_total", "Checks left unfinished when a request's deadline ran out.", ("check",))
+
+# Upper bound (seconds) for the single outbound request made per probed URL
+DEFAULT_TIMEOUT = 5
+
+# Error reported for checks cut short by a deadline
+TIMED_OUT = "timed out"
+
+
+class DeadlineExceeded(Exception):
+    # Raised by a check that could not start before its deadline
+    pass
+
+
+class Deadline:
+    """
+    The point in time a request has to be answered by.
+
+    Created when the request arrives; every later stage (scoring, waiting
+    for a limiter slot, each outbound check) spends from what remains.
+    """
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+
+def _remaining(deadline):
+    # Timeout for a blocking wait: None (wait forever) without a deadline
+    return None if deadline is None else deadline.remaining()
+
+
+@dataclass
+class HeaderFinding:
+    # Outcome of one analyzer run against a probe response
+    present: bool = False
+    value: Optional[str] = None
+    error: bool = False
+    # The header fetch did not finish within the request's deadline
+    timed_out: bool = False
+
+
+@dataclass(frozen=True)
+class HeaderAnalyzer:
+    """
+    A check that inspects one response header.
+
+    Analyzers never touch the network themselves: they receive the response
+    fetched once by `probe_url`, so adding a new one costs no extra round trip.
+    """
+    name: str
+    header: str
+
+    def analyze(self, response):
+        value = response.headers.get(self.header)
+        return HeaderFinding(present=value is not None, value=value)
+
+
+# Analyzers run against every probe response, in display order.
+# Append to this list (e.g. HeaderAnalyzer("csp", "Content-Security-Policy")) to add a check.
+HEADER_ANALYZERS: List[HeaderAnalyzer] = [
+    HeaderAnalyzer("server_banner", "Server"),
+    HeaderAnalyzer("hsts", "Strict-Transport-Security"),
+    HeaderAnalyzer("x_xss_protection", "X-XSS-Protection"),
+]
+
+
+@dataclass
+class ProbeResult:
+    # Everything learned about a URL from a single outbound request
+    url: str
+    ssl_valid: bool = False
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    findings: Dict[str, HeaderFinding] = field(default_factory=dict)
+    certificate: Optional[CertificateInfo] = None
+    # Checks ("headers", "certificate") that did not finish within the request's deadline
+    timed_out: List[str] = field(default_factory=list)
+
+    def finding(self, name):
+        # Failed probes report every analyzer as errored rather than absent
+        return self.findings.get(name, HeaderFinding(error=self.error is not None,
+                                                     timed_out="headers" in self.timed_out))
+
+
+def probe_url(url, analyzers=None, timeout=DEFAULT_TIMEOUT, session=None):
+    """
+    Fetch a URL once and run every header analyzer against the response.
+
+    Parameters:
+    url (str): The URL to probe.
+    analyzers (list): Header analyzers to run, defaults to HEADER_ANALYZERS.
+    timeout (float or tuple): Timeout in seconds, or a (connect, read) pair.
+    session (requests.Session): Optional session whose connection pool is reused.
+
+    Returns:
+    ProbeResult: TLS validity, status code and one finding per analyzer.
+    """
+    analyzers = HEADER_ANALYZERS if analyzers is None else analyzers
+    result = ProbeResult(url=url)
+    try:
+        # Only the headers are needed: the body is never downloaded, so a slow one can't hold the probe
+        with STAGE_LATENCY.time(stage="probe_headers"), \
+                (session or requests).get(url, timeout=timeout, stream=True) as response:
+            result.status_code = response.status_code
+            result.ssl_valid = response.ok
+            for analyzer in analyzers:
+                result.findings[analyzer.name] = analyzer.analyze(response)
+    except requests.exceptions.SSLError as e:
+        logging.error(f"SSL certificate error for URL {url}: {e}")
+        PROBE_ERRORS.inc(check="headers")
+        result.error = str(e)
+        return result
+    except requests.exceptions.Timeout as e:
+        logging.error(f"Request timed out for URL {url}: {e}")
+        PROBE_TIMEOUTS.inc(check="headers")
+        result.error = str(e)
+        return result
+    except requests.exceptions.RequestException as e:
+        PROBE_ERRORS.inc(check="headers")
+        logging.error(f"Request error for URL {url}: {e}")
+        result.error = str(e)
+        return result
+
+    logging.info(f"Probe response for {url}: {result.status_code}",
+                 extra={'event': 'probe_response', 'status_code': result.status_code})
+    return result
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket allowing `rate` acquisitions per second with bursts up to `burst`.
+    """
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self):
+        # Take a token if one is available; returns the seconds to wait otherwise
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, timeout=None):
+        # Block until a token is available; False when none would arrive within `timeout` seconds
+        give_up = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return True
+            if give_up is not None and time.monotonic() + wait > give_up:
+                return False
+            time.sleep(wait)
+
+
+class _HostState:
+    # Concurrency and rate state for one target host
+    def __init__(self, concurrency, rate, burst):
+        self.semaphore = threading.Semaphore(concurrency)
+        self.rate_limiter = RateLimiter(rate, burst)
+        self.active = 0
+
+
+class OutboundLimiter:
+    """
+    Bounds outbound checks per target host and overall.
+
+    Each check first waits for a token from its host's rate limiter, then
+    for one of the host's concurrency slots, then for a global connection
+    slot. Idle host state is dropped once more than `max_hosts` are tracked.
+    """
+    def __init__(self, per_host_concurrency, per_host_rate, per_host_burst, max_outbound, max_hosts=10000):
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_rate = per_host_rate
+        self.per_host_burst = per_host_burst
+        self.max_hosts = max_hosts
+        self._global = threading.BoundedSemaphore(max_outbound)
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _checkout(self, host):
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = _HostState(
+                    self.per_host_concurrency, self.per_host_rate, self.per_host_burst)
+            state.active += 1
+            return state
+
+    def _checkin(self, host, state):
+        with self._lock:
+            state.active -= 1
+            if len(self._hosts) > self.max_hosts:
+                for idle in [name for name, other in self._hosts.items() if not other.active]:
+                    del self._hosts[idle]
+
+    @contextmanager
+    def slot(self, host, deadline=None):
+        # Hold a rate token, a per-host slot and a global slot for the duration of one check;
+        # raises DeadlineExceeded when they cannot all be had before `deadline`
+        state = self._checkout(host)
+        try:
+            wait = state.rate_limiter.try_acquire()
+            if wait:
+                PROBE_THROTTLED.inc()
+                if not state.rate_limiter.acquire(timeout=_remaining(deadline)):
+                    raise DeadlineExceeded(f"no rate token for {host} before the deadline")
+            if not state.semaphore.acquire(timeout=_remaining(deadline)):
+                raise DeadlineExceeded(f"no connection slot for {host} before the deadline")
+            try:
+                if not self._global.acquire(timeout=_remaining(deadline)):
+                    raise DeadlineExceeded("no outbound connection slot before the deadline")
+                try:
+                    yield
+                finally:
+                    self._global.release()
+            finally:
+                state.semaphore.release()
+        finally:
+            self._checkin(host, state)
+
+
+@dataclass
+class ProbeConfig:
+    # Configuration for the concurrent probe engine
+    connect_timeout: float = 3.05
+    read_timeout: float = DEFAULT_TIMEOUT
+    max_workers: int = 16
+    # Number of distinct hosts whose keep-alive pools are cached
+    pool_connections: int = 64
+    # Upper bound on open keep-alive connections per host
+    pool_maxsize: int = 4
+    # Outbound checks allowed at once against one host, and started per second per host
+    per_host_concurrency: int = 2
+    per_host_rate: float = 5.0
+    per_host_burst: int = 5
+    # Outbound checks allowed at once across all hosts
+    max_outbound: int = 32
+
+
+class ProbeEngine:
+    """
+    Runs probes on a bounded thread pool through one pooled requests.Session.
+
+    Keep-alive connections are reused per host, so repeat probes of a site
+    skip the TCP and TLS handshakes. Probes are submitted as futures, letting
+    callers overlap them with feature extraction and model inference.
+    Successful results are stored in the optional cache under the URL's
+    scheme and host, since the checks describe the site rather than the path.
+    For the same reason concurrent probes of one scheme and host share a
+    single in-flight probe, and every outbound check passes through an
+    OutboundLimiter so a popular link cannot flood its site.
+
+    TLS validity comes from a handshake-only certificate inspection that runs
+    alongside the header fetch instead of being inferred from the page download.
+    """
+    def __init__(self, config=None, cache=None, inspector=None):
+        self.config = config or ProbeConfig()
+        self.cache = cache
+        self.inspector = inspector or CertificateInspector(
+            connect_timeout=self.config.connect_timeout,
+            handshake_timeout=self.config.read_timeout,
+        )
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.config.pool_connections,
+            pool_maxsize=self.config.pool_maxsize,
+            pool_block=False,
+            max_retries=0,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=self.config.max_workers, thread_name_prefix="probe")
+        self.limiter = OutboundLimiter(
+            per_host_concurrency=self.config.per_host_concurrency,
+            per_host_rate=self.config.per_host_rate,
+            per_host_burst=self.config.per_host_burst,
+            max_outbound=self.config.max_outbound,
+        )
+        # Probes currently running, by host_key, shared by every caller asking for that site
+        self._in_flight = {}
+        # Reentrant: cancelling a probe's checks under it runs callbacks that take it again
+        self._in_flight_lock = threading.RLock()
+
+    @property
+    def timeout(self):
+        return (self.config.connect_timeout, self.config.read_timeout)
+
+    def timeout_within(self, deadline):
+        # Connect/read timeouts, shortened to what is left before `deadline`
+        remaining = deadline.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded("deadline passed before the check started")
+        return (min(self.config.connect_timeout, remaining), min(self.config.read_timeout, remaining))
+
+    def _fetch_headers(self, url, analyzers, deadline):
+        with self.limiter.slot((urlsplit(url).hostname or '').lower(), deadline):
+            timeout = self.timeout if deadline is None else self.timeout_within(deadline)
+            result = probe_url(url, analyzers, timeout, self.session)
+        # Timeouts shortened to the deadline fire at the deadline, so a failure past it means time ran out
+        if result.error is not None and deadline is not None and deadline.expired:
+            raise DeadlineExceeded(result.error)
+        return result
+
+    def _inspect_certificate(self, url, deadline):
+        # A remembered certificate needs no handshake, so it costs no rate token or connection slot
+        info = self.inspector.cached(url)
+        if info is not None:
+            return info
+        with self.limiter.slot((urlsplit(url).hostname or '').lower(), deadline):
+            timeout = None if deadline is None else self.timeout_within(deadline)
+            info = self.inspector.inspect_url(url, timeout=timeout)
+        if info.error is not None and deadline is not None and deadline.expired:
+            raise DeadlineExceeded(info.error)
+        return info
+
+    def submit(self, url, analyzers=None, deadline=None):
+        """
+        Schedule a probe.
+
+        Probes with the default analyzers are shared by every concurrent caller
+        for the same site and always run on the full timeouts, whatever the
+        callers' deadlines: a caller bounds only its own wait, with
+        `result_within`, so a short budget never cuts the shared probe short.
+        Its queued checks are cancelled only once every caller has given up.
+
+        Parameters:
+        deadline (Deadline): Optional, for probes with custom analyzers (never
+        shared); each check then waits for limiter slots and connects/reads
+        only within the time left, and checks it cuts short are listed in
+        `ProbeResult.timed_out`.
+
+        Returns:
+        Future: Resolves to the ProbeResult.
+        """
+        if analyzers is not None:
+            return self._start(url, analyzers, deadline)
+        key = host_key(url)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                future = Future()
+                future.set_result(replace(cached, url=url))
+                return future
+        with self._in_flight_lock:
+            shared = self._in_flight.get(key)
+            started = shared is None
+            if started:
+                shared = self._in_flight[key] = self._start(url, None, None)
+                future = shared
+            else:
+                future = self._follow(shared, url)
+            shared.waiters.add(future)
+        if started:
+            # Registered outside the lock: an already finished probe runs the callback right here
+            shared.add_done_callback(lambda _: self._forget(key, shared))
+        else:
+            PROBE_COALESCED.inc()
+        return future
+
+    def _start(self, url, analyzers, deadline):
+        headers = self.executor.submit(self._fetch_headers, url, analyzers, deadline)
+        certificate = self.executor.submit(self._inspect_certificate, url, deadline)
+        combined = self._combine(url, headers, certificate, cacheable=analyzers is None)
+        # Only the caller that owns a deadline-bound probe may cancel its checks
+        combined.owned = deadline is not None
+        # Futures of the callers still waiting on a shared probe; see _leave
+        combined.shared = combined
+        combined.waiters = set()
+        return combined
+
+    def _forget(self, key, future):
+        with self._in_flight_lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def _leave(self, future):
+        # A caller stopped waiting on a shared probe; once nobody waits, its queued checks are cancelled
+        shared = future.shared
+        with self._in_flight_lock:
+            shared.waiters.discard(future)
+            if shared.waiters or shared.done():
+                return
+            cancelled = [check.cancel() for check in shared.checks]
+            # Later callers start afresh rather than join a probe missing a check
+            if any(cancelled):
+                self._forget(host_key(shared.url), shared)
+
+    @staticmethod
+    def _follow(shared, url):
+        # A Future for `url` that resolves with a copy of the shared probe's result
+        future = Future()
+
+        def on_done(_):
+            try:
+                future.set_result(replace(shared.result(), url=url))
+            except BaseException as e:
+                future.set_exception(e)
+
+        future.url = url
+        future.checks = shared.checks
+        future.owned = False
+        future.shared = shared
+        shared.add_done_callback(on_done)
+        return future
+
+    @staticmethod
+    def _assemble(url, headers, certificate):
+        # ProbeResult from the two check futures; checks that are unfinished, cancelled,
+        # or that failed once the deadline had passed are reported as timed out
+        timed_out = []
+        if headers.done() and not headers.cancelled() and not isinstance(headers.exception(), DeadlineExceeded):
+            fetched = headers.result()
+            result = replace(fetched, url=url, timed_out=list(fetched.timed_out))
+        else:
+            result = ProbeResult(url=url, error=TIMED_OUT)
+            timed_out.append("headers")
+        if certificate.done() and not certificate.cancelled() and not isinstance(certificate.exception(), DeadlineExceeded):
+            result.certificate = certificate.result()
+        else:
+            result.certificate = CertificateInfo(*certificate_target(url), error=TIMED_OUT)
+            timed_out.append("certificate")
+        result.ssl_valid = result.certificate.valid
+        for check in timed_out:
+            PROBE_DEADLINE_EXCEEDED.inc(check=check)
+        result.timed_out.extend(timed_out)
+        return result
+
+    def _combine(self, url, headers, certificate, cacheable):
+        # Resolve one Future once both the header fetch and the TLS inspection finish
+        combined = Future()
+        pending = [2]
+        lock = threading.Lock()
+
+        def on_done(_):
+            with lock:
+                pending[0] -= 1
+                if pending[0]:
+                    return
+            try:
+                result = self._assemble(url, headers, certificate)
+            except BaseException as e:
+                combined.set_exception(e)
+                return
+            # Only cache completed probes so transient failures and timeouts are retried
+            if self.cache is not None and cacheable and result.error is None and not result.timed_out:
+                self.cache.set(host_key(url), result)
+            combined.set_result(result)
+
+        combined.url = url
+        combined.checks = (headers, certificate)
+        headers.add_done_callback(on_done)
+        certificate.add_done_callback(on_done)
+        return combined
+
+    def result_within(self, future, deadline):
+        """
+        Wait for a submitted probe no longer than `deadline` allows.
+
+        Checks still unfinished at the deadline are abandoned and reported in
+        `timed_out`. Queued ones of a probe started with this deadline are
+        cancelled and running ones end on their shortened timeouts. A shared
+        probe keeps running for the callers still waiting on it; once the last
+        of them gives up, its checks that have not started are cancelled.
+
+        Returns:
+        ProbeResult: Complete, or holding the checks that finished in time.
+        """
+        try:
+            return future.result(timeout=deadline.remaining())
+        except FutureTimeoutError:
+            pass
+        headers, certificate = future.checks
+        if future.owned:
+            headers.cancel()
+            certificate.cancel()
+        else:
+            self._leave(future)
+        return self._assemble(future.url, headers, certificate)
+
+    def probe(self, url, analyzers=None):
+        return self.submit(url, analyzers).result()
+
+    def probe_many(self, urls, analyzers=None):
+        # Probe several URLs concurrently, preserving input order
+        futures = [self.submit(url, analyzers) for url in urls]
+        return [future.result() for future in futures]
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
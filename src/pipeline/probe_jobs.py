@@ -0,0 +1,124 @@
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from src.pipeline.cache import SQLiteCache, TTLCache
+from src.pipeline.metrics import REGISTRY
+from src.pipeline.probe import ProbeResult
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+PROBE_JOBS = REGISTRY.counter(
+    "slm_probe_jobs_total", "Background probe jobs by outcome.", ("outcome",))
+
+
+@dataclass
+class ProbeJob:
+    # A background probe whose result is fetched later by id
+    id: str
+    url: str
+    status: str = PENDING
+    result: Optional[ProbeResult] = None
+    error: Optional[str] = None
+    created: float = 0.0
+    finished: Optional[float] = None
+
+
+@dataclass
+class ProbeJobConfig:
+    # Configuration for background probe jobs
+    # Jobs queued or running at once in this process; further submissions are rejected
+    max_pending: int = 256
+    # Seconds a job (and its result) stays retrievable
+    ttl: float = 300
+    maxsize: int = 10000
+    # SQLite file shared by all workers, so any worker can answer a status request
+    shared_path: Optional[str] = None
+
+
+class ProbeJobQueue:
+    """
+    Runs probes in the background and keeps their results addressable by job id.
+
+    Requests submit a job and return immediately, so a slow or hanging site
+    occupies a probe thread rather than a web worker. With `shared_path`
+    set, job state lives in SQLite and a status request can land on any
+    gunicorn worker; otherwise it is kept in this process.
+    """
+    def __init__(self, engine, config=None):
+        self.engine = engine
+        self.config = config or ProbeJobConfig()
+        if self.config.shared_path:
+            self.store = SQLiteCache(self.config.shared_path, 'probe_jobs', self.config.maxsize, self.config.ttl)
+        else:
+            self.store = TTLCache(self.config.maxsize, self.config.ttl)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._finished = threading.Condition(self._lock)
+
+    def submit(self, url):
+        """
+        Queue a probe of `url`.
+
+        Returns:
+        ProbeJob: The new job, already DONE when the probe cache answered it,
+        or None when too many jobs are pending.
+        """
+        with self._lock:
+            if self._pending >= self.config.max_pending:
+                PROBE_JOBS.inc(outcome="rejected")
+                logging.warning(f"Rejected probe job for {url}: {self._pending} jobs pending")
+                return None
+            self._pending += 1
+        job = ProbeJob(id=uuid.uuid4().hex, url=url, created=time.time())
+        try:
+            self.store.set(job.id, job)
+            future = self.engine.submit(url)
+        except Exception:
+            # Nothing will finish this job, so give its slot back (e.g. the engine was shut down)
+            with self._finished:
+                self._pending -= 1
+                self._finished.notify_all()
+            raise
+        PROBE_JOBS.inc(outcome="queued")
+        future.add_done_callback(lambda done: self._finish(job, done))
+        return self.store.get(job.id) or job
+
+    def _finish(self, job, future):
+        try:
+            finished = replace(job, status=DONE, result=future.result(), finished=time.time())
+        except Exception as e:
+            logging.error(f"Probe job {job.id} for {job.url} failed: {e}")
+            finished = replace(job, status=FAILED, error=str(e), finished=time.time())
+        self.store.set(job.id, finished)
+        with self._finished:
+            self._pending -= 1
+            self._finished.notify_all()
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def wait(self, job_id, timeout, poll_interval=0.25):
+        """
+        Block until a job finishes or `timeout` seconds pass.
+
+        Returns:
+        ProbeJob: The latest state of the job, or None if it is unknown.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job.status != PENDING or remaining <= 0:
+                return job
+            # Woken early by jobs finishing here; polling covers jobs run by other workers
+            with self._finished:
+                self._finished.wait(min(poll_interval, remaining))
+
+    def pending(self):
+        return self._pending
@@ -0,0 +1,184 @@
+"""
+Local allow/deny reputation index.
+
+Built offline from domain and URL lists:
+
+    python src/pipeline/reputation.py --allow allow.txt --deny deny.txt
+
+Each list holds one entry per line. Entries with a scheme or a path are
+matched as exact (normalized) URLs; anything else is a domain that also
+matches all of its subdomains ("example.com" covers "login.example.com";
+a leading "*." is accepted and ignored). Blank lines and "#" comments are
+skipped. The deny list wins when a URL matches both.
+"""
+import argparse
+import hashlib
+import logging
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import urlsplit
+# Adding the project root to the system path for module import
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+import numpy as np
+
+from src.pipeline.cache import normalize_url
+from src.pipeline.metrics import REGISTRY
+
+ALLOW = "allow"
+DENY = "deny"
+# Code stored per key; the list names are indexed by it
+LISTS = (ALLOW, DENY)
+
+REPUTATION_HITS = REGISTRY.counter(
+    "slm_reputation_hits_total", "URLs answered by the local reputation index, by list.", ("list",))
+
+
+@dataclass
+class ReputationConfig:
+    # Location of the reputation index arrays
+    index_dir: str = "artifacts"
+    # Sorted uint64 key hashes, and the list (index into LISTS) of each key
+    keys_file_name: str = "reputation_keys.npy"
+    lists_file_name: str = "reputation_lists.npy"
+
+
+def _digest(kind, value):
+    # 8-byte key of a domain ("d") or normalized URL ("u") entry, read as a little-endian uint64
+    return hashlib.blake2b(f"{kind}:{value}".encode("utf-8"), digest_size=8).digest()
+
+
+def _hash(kind, value):
+    return int.from_bytes(_digest(kind, value), "little")
+
+
+def _clean_host(host):
+    return host.strip().lower().rstrip(".")
+
+
+def _with_scheme(url):
+    # Scheme-less input ("evil.com/login") is read as http, the way a browser would
+    url = url.strip()
+    return url if "://" in url else f"http://{url}"
+
+
+def entry_hash(entry):
+    # Hash of one list entry, as a URL or as a domain
+    entry = entry.strip()
+    if "://" in entry or "/" in entry:
+        return _hash("u", normalize_url(_with_scheme(entry)))
+    if entry.startswith("*."):
+        entry = entry[2:]
+    return _hash("d", _clean_host(entry))
+
+
+def lookup_hashes(url):
+    # Every key a URL can match: the URL itself, then its host and each parent domain
+    url = _with_scheme(url)
+    digests = [_digest("u", normalize_url(url))]
+    host = _clean_host(urlsplit(url).hostname or "")
+    labels = host.split(".") if host else []
+    digests.extend(_digest("d", ".".join(labels[i:])) for i in range(len(labels)))
+    return np.frombuffer(b"".join(digests), dtype="<u8")
+
+
+def read_entries(path):
+    with open(path, encoding="utf-8") as entries_file:
+        for line in entries_file:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                yield line
+
+
+def build_reputation_index(allow_paths=(), deny_paths=(), config=None):
+    """
+    Hash the allow and deny lists into one sorted uint64 key array, with a
+    parallel uint8 array naming each key's list, saved as .npy files.
+
+    Parameters:
+    allow_paths (list): Text files of allowed domains and URLs.
+    deny_paths (list): Text files of denied domains and URLs.
+
+    Returns:
+    tuple: Paths of the key and list arrays.
+    """
+    config = config or ReputationConfig()
+    entries = {}
+    for code, paths in enumerate((allow_paths, deny_paths)):
+        for path in paths:
+            for entry in read_entries(path):
+                # Deny is written last, so it wins for an entry on both lists
+                entries[entry_hash(entry)] = code
+    keys = np.array(sorted(entries), dtype=np.uint64)
+    lists = np.array([entries[key] for key in keys.tolist()], dtype=np.uint8)
+
+    os.makedirs(config.index_dir, exist_ok=True)
+    keys_path = os.path.join(config.index_dir, config.keys_file_name)
+    lists_path = os.path.join(config.index_dir, config.lists_file_name)
+    np.save(keys_path, keys)
+    np.save(lists_path, lists)
+    logging.info(f"Wrote {int((lists == 0).sum())} allowed and {int(lists.sum())} denied reputation entries "
+                 f"to {config.index_dir}")
+    return keys_path, lists_path
+
+
+class ReputationIndex:
+    """
+    Answers allow/deny lookups from a sorted hash array.
+
+    The arrays are memory-mapped, so every worker on a host shares the same
+    pages, and a lookup is a single vectorized binary search over the
+    handful of keys a URL can match.
+    """
+    def __init__(self, keys, lists):
+        self.keys = keys
+        self.lists = lists
+
+    @classmethod
+    def load(cls, config=None):
+        # The index from `config.index_dir`, or None when it has not been built
+        config = config or ReputationConfig()
+        keys_path = os.path.join(config.index_dir, config.keys_file_name)
+        lists_path = os.path.join(config.index_dir, config.lists_file_name)
+        if not os.path.exists(keys_path) or not os.path.exists(lists_path):
+            return None
+        # Plain ndarray views of the maps skip np.memmap's per-operation overhead
+        keys = np.load(keys_path, mmap_mode="r").view(np.ndarray)
+        lists = np.load(lists_path, mmap_mode="r").view(np.ndarray)
+        if not len(keys):
+            return None
+        logging.info(f"Loaded reputation index from {config.index_dir} ({len(keys)} entries)")
+        return cls(keys, lists)
+
+    def lookup(self, url):
+        """
+        Returns:
+        str: DENY or ALLOW when the URL or one of its domains is listed, else None.
+        """
+        hashes = lookup_hashes(url)
+        positions = self.keys.searchsorted(hashes)
+        positions[positions == len(self.keys)] = 0
+        found = self.lists[positions[self.keys[positions] == hashes]]
+        if not len(found):
+            return None
+        verdict = LISTS[found.max()]
+        REPUTATION_HITS.inc(list=verdict)
+        return verdict
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--allow", action="append", default=[], help="File of allowed domains/URLs (repeatable)")
+    parser.add_argument("--deny", action="append", default=[], help="File of denied domains/URLs (repeatable)")
+    parser.add_argument("--index-dir", default=ReputationConfig.index_dir, help="Directory to write the index to")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    for path in build_reputation_index(args.allow, args.deny, ReputationConfig(index_dir=args.index_dir)):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+"""
+Continuous watchlist monitoring.
+
+Registered URLs are re-checked on a schedule: the model verdict, the TLS
+certificate (validity, issuer, expiry) and the security headers. Only
+differences from the previous scan are stored, as a change log that can
+be read back from any point in time.
+
+    python src/pipeline/watchlist.py add urls.txt --interval 3600
+    python src/pipeline/watchlist.py run --model-dir artifacts
+    python src/pipeline/watchlist.py changes --since 2026-10-01T00:00:00
+
+Run a single `run` process per deployment; the app only registers URLs
+and reads changes (see /api/watchlist).
+"""
+import argparse
+import hashlib
+import heapq
+import json
+import logging
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+# Adding the project root to the system path for module import
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.pipeline.cache import normalize_url
+from src.pipeline.metrics import REGISTRY
+from src.pipeline.model_loader import ModelLoaderConfig, ModelWatcher, load_compiled_model, load_model
+from src.pipeline.predict_pipeline import PredictPipeline
+from src.pipeline.probe import HEADER_ANALYZERS, ProbeConfig, ProbeEngine, ProbeResult
+from src.pipeline.reputation import ReputationConfig, ReputationIndex
+
+WATCHLIST_SCANS = REGISTRY.counter(
+    "slm_watchlist_scans_total", "Watchlist scans completed, by whether anything changed.", ("outcome",))
+
+
+@dataclass
+class WatchlistConfig:
+    # Location of the watched URLs and their change log
+    path: str = os.path.join("artifacts", "watchlist.db")
+    # Seconds between two scans of a URL unless it was registered with its own interval
+    interval: float = 3600.0
+    # Shortest interval a URL may be registered with
+    min_interval: float = 60.0
+    # Scans in flight at once
+    max_concurrency: int = 8
+    # Certificates expiring within this many days are reported as expiring
+    expiry_warning_days: int = 14
+    # Seconds between re-reads of the URL list, which picks up added and removed URLs
+    refresh_interval: float = 30.0
+
+
+def take_snapshot(prediction, probe, expiry_warning_days=WatchlistConfig.expiry_warning_days):
+    """
+    Reduce one scan to the fields whose changes are reported.
+
+    Returns:
+    dict: JSON-serializable field values; header fields are None when the
+    site could not be reached.
+    """
+    certificate = probe.certificate
+    days = certificate.expires_in_days if certificate is not None else None
+    snapshot = {
+        'verdict': prediction.safe_status,
+        'reachable': probe.error is None,
+        'status_code': probe.status_code,
+        'certificate_valid': certificate.valid if certificate is not None else None,
+        'certificate_issuer': certificate.issuer if certificate is not None else None,
+        'certificate_not_after': certificate.not_after if certificate is not None else None,
+        'certificate_expiring': days is not None and days < expiry_warning_days,
+    }
+    for analyzer in HEADER_ANALYZERS:
+        finding = probe.finding(analyzer.name)
+        snapshot[analyzer.name] = None if finding.error else finding.present
+    return snapshot
+
+
+def parse_since(value):
+    # Epoch seconds from a number or an ISO 8601 timestamp (local time when no offset is given)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(value).timestamp()
+
+
+class WatchlistStore:
+    """
+    Watched URLs with their latest snapshot, plus an append-only log of changes.
+
+    The latest snapshot is only kept as the baseline for the next diff; the
+    history is the change log alone. Stored in SQLite (WAL mode) so the
+    scheduler process and every app worker can share one file.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        dir_path = os.path.dirname(path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+
+    @property
+    def conn(self):
+        # SQLite connections must not cross fork(), so each worker process opens its own
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS targets "
+                "(url TEXT PRIMARY KEY, interval REAL, added REAL, last_scanned REAL, snapshot TEXT)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS changes "
+                "(id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT, field TEXT, old TEXT, new TEXT, detected REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS changes_detected ON changes (detected)")
+            self._pid = os.getpid()
+        return self._conn
+
+    def add(self, urls, interval):
+        # Register URLs, or change the interval of ones already watched
+        now = time.time()
+        with self._lock:
+            self.conn.executemany(
+                "INSERT INTO targets (url, interval, added) VALUES (?, ?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET interval = excluded.interval",
+                [(url, interval, now) for url in urls],
+            )
+        return len(urls)
+
+    def remove(self, urls):
+        with self._lock:
+            cursor = self.conn.executemany("DELETE FROM targets WHERE url = ?", [(url,) for url in urls])
+        return cursor.rowcount
+
+    def targets(self):
+        # (url, interval, last_scanned) of every watched URL
+        with self._lock:
+            return self.conn.execute("SELECT url, interval, last_scanned FROM targets").fetchall()
+
+    def record_scan(self, url, snapshot, scanned_at):
+        """
+        Store a scan, keeping only the fields that differ from the previous one.
+
+        The first scan of a URL sets its baseline and reports no changes.
+
+        Returns:
+        list: (field, old, new) tuples, empty when nothing changed or the URL
+        is no longer watched.
+        """
+        with self._lock:
+            conn = self.conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT snapshot FROM targets WHERE url = ?", (url,)).fetchone()
+                if row is None:
+                    conn.execute("ROLLBACK")
+                    return []
+                previous = json.loads(row[0]) if row[0] else None
+                changes = [] if previous is None else [
+                    (field, previous.get(field), value)
+                    for field, value in snapshot.items() if previous.get(field) != value
+                ]
+                conn.executemany(
+                    "INSERT INTO changes (url, field, old, new, detected) VALUES (?, ?, ?, ?, ?)",
+                    [(url, field, json.dumps(old), json.dumps(new), scanned_at) for field, old, new in changes],
+                )
+                conn.execute("UPDATE targets SET snapshot = ?, last_scanned = ? WHERE url = ?",
+                             (json.dumps(snapshot), scanned_at, url))
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+        return changes
+
+    def changes(self, since=0.0, url=None, after_id=0, limit=1000):
+        """
+        Changes detected after `since` (epoch seconds), oldest first.
+
+        Parameters:
+        after_id (int): Only changes with a larger id; pass the last id seen to page through.
+
+        Returns:
+        list: One dict per changed field with its old and new value.
+        """
+        query = "SELECT id, url, field, old, new, detected FROM changes WHERE detected > ? AND id > ?"
+        params = [since, after_id]
+        if url is not None:
+            query += " AND url = ?"
+            params.append(url)
+        query += " ORDER BY id LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [
+            {'id': id_, 'url': url_, 'field': field, 'old': json.loads(old), 'new': json.loads(new), 'detected': detected}
+            for id_, url_, field, old, new, detected in rows
+        ]
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM targets").fetchone()[0]
+
+
+def scan_phase(url, interval):
+    # Fixed offset of a URL's scans within its interval, uniform across URLs
+    digest = hashlib.blake2b(normalize_url(url).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") / 2 ** 64 * interval
+
+
+def next_scan_time(url, interval, after):
+    # First of the URL's scan slots (phase + k * interval) strictly after `after`
+    phase = scan_phase(url, interval)
+    return phase + (math.floor((after - phase) / interval) + 1) * interval
+
+
+class WatchScheduler:
+    """
+    Re-scans every watched URL once per interval.
+
+    Each URL owns a fixed slot within its interval derived from a hash of the
+    URL, so scans of tens of thousands of URLs are spread evenly over the
+    interval and stay spread across restarts: URLs that fell overdue while
+    the scheduler was down are picked up at their next slot rather than all
+    at once. Due scans come off a priority queue and at most
+    `max_concurrency` of them are in flight; a scan that cannot get a slot
+    waits, it never piles extra probes onto the sites. Newly published
+    models are picked up between scans.
+    """
+    def __init__(self, store, pipeline, engine, config=None, model_watcher=None):
+        self.store = store
+        self.pipeline = pipeline
+        self.engine = engine
+        self.config = config or WatchlistConfig()
+        self.model_watcher = model_watcher
+        # (due, url) heap; entries whose due time no longer matches `_scheduled` are stale
+        self._queue = []
+        self._scheduled = {}
+        self._slots = threading.BoundedSemaphore(self.config.max_concurrency)
+        self._next_refresh = 0.0
+
+    def refresh(self, now=None):
+        # Schedule newly watched URLs and drop removed ones
+        now = time.time() if now is None else now
+        targets = {url: (interval, last_scanned) for url, interval, last_scanned in self.store.targets()}
+        removed = [url for url in self._scheduled if url not in targets]
+        for url in removed:
+            del self._scheduled[url]
+        added = 0
+        for url, (interval, last_scanned) in targets.items():
+            current = self._scheduled.get(url)
+            if current is not None and current[0] == interval:
+                continue
+            due = next_scan_time(url, interval, max(now, last_scanned or 0.0))
+            self._scheduled[url] = (interval, due)
+            heapq.heappush(self._queue, (due, url))
+            added += 1
+        if added or removed:
+            logging.info(f"Watching {len(self._scheduled)} URLs ({added} scheduled, {len(removed)} removed)")
+        # Stale entries pile up as intervals change; rebuild once they outnumber the live ones
+        if len(self._queue) > 2 * len(self._scheduled) + 1024:
+            self._queue = [(due, url) for url, (_, due) in self._scheduled.items()]
+            heapq.heapify(self._queue)
+
+    def reload_model(self):
+        version = self.model_watcher.poll() if self.model_watcher is not None else None
+        if version is None:
+            return
+        try:
+            model = load_model(self.model_watcher.config)
+            compiled = load_compiled_model(model, self.model_watcher.config)
+        except Exception as e:
+            logging.error(f"Could not load model version {version}, keeping the current one: {e}")
+            return
+        self.pipeline = PredictPipeline(model, compiled=compiled, reputation=self.pipeline.reputation)
+        logging.info(f"Watchlist scanning with model version {version}")
+
+    def scan(self, url):
+        # Start one scan; the probe finishes on the engine's threads and releases the slot
+        prediction = self.pipeline.predict_one(url)
+        future = self.engine.submit(url)
+        future.add_done_callback(lambda done: self._finish(url, prediction, done))
+
+    def _finish(self, url, prediction, future):
+        try:
+            try:
+                probe = future.result()
+            except Exception as e:
+                probe = ProbeResult(url=url, error=str(e))
+            snapshot = take_snapshot(prediction, probe, self.config.expiry_warning_days)
+            changes = self.store.record_scan(url, snapshot, time.time())
+            WATCHLIST_SCANS.inc(outcome="changed" if changes else "unchanged")
+            for field, old, new in changes:
+                logging.info(f"Watchlist change for {url}: {field} {old!r} -> {new!r}",
+                             extra={'event': 'watchlist_change'})
+        except Exception as e:
+            logging.error(f"Recording the watchlist scan of {url} failed: {e}")
+        finally:
+            self._slots.release()
+
+    def run_pending(self, now=None, stop=None):
+        """
+        Start every scan that is due, waiting for free slots as needed.
+
+        Returns:
+        float: Seconds until the next scan is due (or the next refresh).
+        """
+        now = time.time() if now is None else now
+        if now >= self._next_refresh:
+            self.refresh(now)
+            self._next_refresh = now + self.config.refresh_interval
+        self.reload_model()
+        while self._queue and self._queue[0][0] <= now and not (stop is not None and stop.is_set()):
+            due, url = heapq.heappop(self._queue)
+            scheduled = self._scheduled.get(url)
+            if scheduled is None or scheduled[1] != due:
+                continue
+            self._slots.acquire()
+            try:
+                self.scan(url)
+            except Exception as e:
+                self._slots.release()
+                logging.error(f"Watchlist scan of {url} failed: {e}")
+            # Waiting for a slot takes time; the clock only moves forward from the caller's `now`
+            now = max(now, time.time())
+            # A scan that started late skips the slots it missed instead of queueing a catch-up burst
+            interval = scheduled[0]
+            self._scheduled[url] = (interval, next_scan_time(url, interval, max(due, now)))
+            heapq.heappush(self._queue, (self._scheduled[url][1], url))
+        next_due = self._queue[0][0] if self._queue else math.inf
+        return max(0.0, min(next_due, self._next_refresh) - now)
+
+    def run(self, stop=None):
+        # Scan until `stop` (a threading.Event) is set
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            stop.wait(self.run_pending(stop=stop))
+        # Let scans in flight finish recording
+        for _ in range(self.config.max_concurrency):
+            self._slots.acquire()
+        for _ in range(self.config.max_concurrency):
+            self._slots.release()
+
+
+def build_scheduler(config, model_dir):
+    # Scheduler scoring with the model in `model_dir` and probing without a cache, so every scan is fresh
+    loader_config = ModelLoaderConfig(model_dir=model_dir)
+    model = load_model(loader_config)
+    pipeline = PredictPipeline(model, compiled=load_compiled_model(model, loader_config),
+                               reputation=ReputationIndex.load(ReputationConfig(index_dir=model_dir)))
+    # Each probe runs a header fetch and a certificate inspection side by side
+    engine = ProbeEngine(ProbeConfig(max_workers=2 * config.max_concurrency))
+    return WatchScheduler(WatchlistStore(config.path), pipeline, engine, config, ModelWatcher(loader_config))
+
+
+def read_urls(path):
+    with open(path, encoding='utf-8') as url_file:
+        return [line.strip() for line in url_file if line.strip() and not line.startswith('#')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default=WatchlistConfig.path, help='Watchlist database')
+    commands = parser.add_subparsers(dest='command', required=True)
+    add = commands.add_parser('add', help='Watch the URLs in a file (one per line)')
+    add.add_argument('file')
+    add.add_argument('--interval', type=float, default=WatchlistConfig.interval, help='Seconds between scans')
+    remove = commands.add_parser('remove', help='Stop watching the URLs in a file')
+    remove.add_argument('file')
+    run = commands.add_parser('run', help='Scan watched URLs until interrupted')
+    run.add_argument('--model-dir', default='artifacts')
+    run.add_argument('--max-concurrency', type=int, default=WatchlistConfig.max_concurrency)
+    run.add_argument('--expiry-warning-days', type=int, default=WatchlistConfig.expiry_warning_days)
+    changes = commands.add_parser('changes', help='Print changes as JSON lines')
+    changes.add_argument('--since', default='0', help='Epoch seconds or ISO 8601 timestamp')
+    changes.add_argument('--url')
+    changes.add_argument('--after-id', type=int, default=0, help='Only changes with a larger id')
+    changes.add_argument('--limit', type=int, default=1000)
+    args = parser.parse_args()
+    # inf/nan would schedule NaN due times, and such URLs would never be scanned
+    if args.command == 'add' and not math.isfinite(args.interval):
+        parser.error("--interval must be a finite number of seconds")
+
+    logging.basicConfig(level=logging.INFO)
+    store = WatchlistStore(args.db)
+    if args.command == 'add':
+        interval = max(args.interval, WatchlistConfig.min_interval)
+        print(f"Watching {store.add(read_urls(args.file), interval)} URLs every {interval:.0f}s")
+    elif args.command == 'remove':
+        print(f"Removed {store.remove(read_urls(args.file))} URLs")
+    elif args.command == 'changes':
+        for change in store.changes(parse_since(args.since), url=args.url, after_id=args.after_id,
+                                    limit=args.limit):
+            print(json.dumps(change))
+    else:
+        config = WatchlistConfig(path=args.db, max_concurrency=args.max_concurrency,
+                                 expiry_warning_days=args.expiry_warning_days)
+        try:
+            build_scheduler(config, args.model_dir).run()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
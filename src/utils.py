@@ -4,6 +4,9 @@ import os
 from src.exception import securelinkException
 import pickle
 import sys
+import time
+import joblib
+from joblib import Parallel, delayed
 from sklearn.metrics import confusion_matrix
 from sklearn.metrics import f1_score
 from src.logger import logging
@@ -31,53 +34,237 @@ def save_object(file_path, obj):
     except Exception as ex:
         # Raise custom exception in case of error
         raise securelinkException(ex, sys)
-def evaluate_models(X_train, y_train, X_test, y_test, models):
+
+def save_mmap_object(file_path, obj):
+    """
+    Save a Python object with joblib so its NumPy arrays can be memory-mapped on load.
+
+    Parameters:
+    file_path (str): The path where the object should be saved.
+    obj (object): The Python object to be saved.
+    """
+    try:
+        dir_path = os.path.dirname(file_path)
+        os.makedirs(dir_path, exist_ok=True)
+
+        # Compression must stay off, otherwise joblib cannot memory-map the arrays.
+        # Writing beside the target and renaming leaves workers that still map
+        # the old file untouched instead of truncating it under them.
+        tmp_path = f"{file_path}.{os.getpid()}.tmp"
+        joblib.dump(obj, tmp_path, compress=0)
+        os.replace(tmp_path, file_path)
+
+    except Exception as ex:
+        raise securelinkException(ex, sys)
+
+def save_array(file_path, array):
+    """
+    Save a NumPy array in the binary .npy format.
+
+    Parameters:
+    file_path (str): The path where the array should be saved.
+    array (ndarray): The array to be saved.
+    """
+    try:
+        dir_path = os.path.dirname(file_path)
+        os.makedirs(dir_path, exist_ok=True)
+
+        # Contiguous arrays can later be memory-mapped without a copy
+        np.save(file_path, np.ascontiguousarray(array), allow_pickle=False)
+
+    except Exception as ex:
+        raise securelinkException(ex, sys)
+
+def load_array(file_path, mmap_mode='r'):
+    """
+    Load a .npy array, memory-mapped by default.
+
+    Parameters:
+    file_path (str): The path of the saved array.
+    mmap_mode (str): NumPy memory-map mode, or None to read into memory.
+
+    Returns:
+    ndarray: The loaded (or memory-mapped) array.
+    """
+    try:
+        return np.load(file_path, mmap_mode=mmap_mode, allow_pickle=False)
+
+    except Exception as ex:
+        raise securelinkException(ex, sys)
+
+class NpyAppender:
+    """
+    Write a .npy array incrementally, one block of rows at a time.
+
+    A fixed-size header is reserved up front and rewritten with the final
+    row count on close, so the full array never has to be held in memory.
+    The result loads (and memory-maps) like any other .npy file.
+    """
+    # Header bytes reserved for the .npy preamble; a multiple of 64 keeps the data aligned
+    HEADER_SIZE = 128
+
+    def __init__(self, file_path, dtype, row_shape=()):
+        dir_path = os.path.dirname(file_path)
+        os.makedirs(dir_path, exist_ok=True)
+        self.file_path = file_path
+        self.dtype = np.dtype(dtype)
+        self.row_shape = tuple(row_shape)
+        self.rows = 0
+        self._file = open(file_path, "wb")
+        self._write_header()
+
+    def _write_header(self):
+        header = {
+            "descr": np.lib.format.dtype_to_descr(self.dtype),
+            "fortran_order": False,
+            "shape": (self.rows,) + self.row_shape
+        }
+        text = repr(header).encode("latin1")
+        # magic (6) + version (2) + header length (2) + padded header + newline
+        padding = self.HEADER_SIZE - 10 - len(text) - 1
+        self._file.seek(0)
+        self._file.write(b"\x93NUMPY\x01\x00")
+        self._file.write((self.HEADER_SIZE - 10).to_bytes(2, "little"))
+        self._file.write(text + b" " * padding + b"\n")
+
+    def append(self, block):
+        block = np.ascontiguousarray(block, dtype=self.dtype)
+        self._file.write(block.tobytes())
+        self.rows += block.shape[0]
+
+    def close(self):
+        self._write_header()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def fit_and_score_model(model_name, model, X_train, y_train, X_test, y_test):
+    """
+    Fit one model and score it on the training and test data.
+
+    Runs inside evaluate_models' worker processes, so it returns the fitted
+    model alongside its report row instead of logging.
+
+    Returns:
+    tuple: (report row dict, fitted model)
+    """
+    # Train the model
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+
+    # Predict on training and test sets
+    start = time.perf_counter()
+    y_train_pred = model.predict(X_train)
+    y_test_pred = model.predict(X_test)
+    predict_time = time.perf_counter() - start
+
+    # Calculate training and test accuracies
+    train_accuracy = np.mean(y_train_pred == y_train) * 100  # Convert to percentage
+    test_accuracy = np.mean(y_test_pred == y_test) * 100  # Convert to percentage
+
+    # Generate confusion matrix for test predictions
+    cm = confusion_matrix(y_test, y_test_pred)
+
+    row = {
+        "Model": model_name,
+        "Train Accuracy (%)": train_accuracy,
+        "Test Accuracy (%)": test_accuracy,
+        "Confusion Matrix": cm,
+        "Fit Time (s)": fit_time,
+        "Predict Time (s)": predict_time
+    }
+    return row, model
+
+def benchmark_model_inference(model, X_sample, n_single=200, batch_size=1000):
+    """
+    Measure the serving cost of a fitted model.
+
+    Parameters:
+    model (object): Fitted model exposing predict_proba.
+    X_sample (array): Feature rows to score, e.g. the test set.
+    n_single (int): Number of single-row calls timed for the latency percentiles.
+    batch_size (int): Rows scored in the batch timing.
+
+    Returns:
+    dict: Single-row p50/p99 latency (us), batch latency (us per row),
+    pickled size (bytes) and unpickle time (ms).
+    """
+    try:
+        X_sample = np.asarray(X_sample)
+        rows = X_sample[np.arange(n_single) % len(X_sample)]
+        latencies = []
+        for row in rows:
+            start = time.perf_counter()
+            model.predict_proba(row.reshape(1, -1))
+            latencies.append(time.perf_counter() - start)
+        latencies = np.array(latencies) * 1e6
+
+        batch = X_sample[np.arange(batch_size) % len(X_sample)]
+        start = time.perf_counter()
+        model.predict_proba(batch)
+        batch_us_per_row = (time.perf_counter() - start) * 1e6 / batch_size
+
+        serialized = pickle.dumps(model)
+        start = time.perf_counter()
+        pickle.loads(serialized)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        return {
+            "Single p50 (us)": float(np.percentile(latencies, 50)),
+            "Single p99 (us)": float(np.percentile(latencies, 99)),
+            "Batch (us/row)": batch_us_per_row,
+            "Size (bytes)": len(serialized),
+            "Load Time (ms)": load_ms
+        }
+
+    except Exception as ex:
+        raise securelinkException(ex, sys)
+
+def evaluate_models(X_train, y_train, X_test, y_test, models, n_jobs=1):
     """
     Evaluate multiple models on the given training and test data.
 
+    Candidates are fitted in parallel worker processes. Arrays larger than
+    1 MB are memory-mapped into the workers instead of pickled to each one,
+    and the fitted models replace the unfitted ones in `models`.
+
     Parameters:
     X_train (array): Training data features
     y_train (array): Training data labels
     X_test (array): Test data features
     y_test (array): Test data labels
     models (dict): Dictionary of models to be evaluated
+    n_jobs (int): Number of worker processes, -1 for one per core, 1 to run in-process
 
     Returns:
     DataFrame: A Pandas DataFrame containing the evaluation results of each model
     """
     try:
-        results = []
-
-        for model_name, model in models.items():
-            logging.info(f"Training and evaluating model: {model_name}")
+        logging.info(f"Training and evaluating models: {list(models)} with n_jobs={n_jobs}")
 
-            # Train the model
-            model.fit(X_train, y_train)
+        outputs = Parallel(n_jobs=n_jobs, max_nbytes="1M", mmap_mode="r")(
+            delayed(fit_and_score_model)(model_name, model, X_train, y_train, X_test, y_test)
+            for model_name, model in models.items()
+        )
 
-            # Predict on training and test sets
-            y_train_pred = model.predict(X_train)
-            y_test_pred = model.predict(X_test)
-
-            # Calculate training and test accuracies
-            train_accuracy = np.mean(y_train_pred == y_train) * 100  # Convert to percentage
-            test_accuracy = np.mean(y_test_pred == y_test) * 100  # Convert to percentage
-
-            # Generate confusion matrix for test predictions
-            cm = confusion_matrix(y_test, y_test_pred)
-
-            # Append the results for the current model
-            results.append({
-                "Model": model_name,
-                "Train Accuracy (%)": train_accuracy,
-                "Test Accuracy (%)": test_accuracy,
-                "Confusion Matrix": cm
-            })
+        results = []
+        for row, fitted_model in outputs:
+            models[row["Model"]] = fitted_model
+            results.append(row)
+            logging.info(
+                f"Completed {row['Model']}: Train Accuracy = {row['Train Accuracy (%)']}%, "
+                f"Test Accuracy = {row['Test Accuracy (%)']}%, fit {row['Fit Time (s)']:.2f}s, "
+                f"predict {row['Predict Time (s)']:.2f}s"
+            )
 
-            logging.info(f"Completed {model_name}: Train Accuracy = {train_accuracy}%, Test Accuracy = {test_accuracy}%")
-        
         # Return the results as a Pandas DataFrame
         return pd.DataFrame(results)
 
     except Exception as ex:
         # Raise custom exception in case of error
-        raise securelinkException(ex, sys)
\ No newline at end of file
+        raise securelinkException(ex, sys)
@@ -0,0 +1,113 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Keep the log files written at import time out of the working tree
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="slm-test-logs-"))
+# Adding the project root to the system path for module import
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+SECURE_HEADERS = {
+    "Server": "test/1.0",
+    "Strict-Transport-Security": "max-age=31536000",
+    "X-XSS-Protection": "1; mode=block",
+}
+
+
+class LocalSite:
+    """
+    A local HTTP site whose first path segment picks the behaviour:
+    /secure (all security headers), /bare (none), /slow (answers after
+    `slow_seconds`), /drip (headers at once, then a body trickling out for
+    seconds). Requests are counted per path segment.
+    """
+    slow_seconds = 0.3
+
+    def __init__(self):
+        self.requests = Counter()
+        self._lock = threading.Lock()
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def send_response(self, code, message=None):
+                # Skip the default Server/Date headers so /bare really sends none
+                self.send_response_only(code, message)
+
+            def do_GET(self):
+                kind = self.path.lstrip("/").split("/", 1)[0]
+                with site._lock:
+                    site.requests[kind] += 1
+                if kind == "slow":
+                    time.sleep(site.slow_seconds)
+                headers = SECURE_HEADERS if kind in ("secure", "slow", "drip") else {}
+                body = b"x" * (40 if kind == "drip" else 2)
+                self.send_response(200)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    for i in range(len(body)):
+                        self.wfile.write(body[i:i + 1])
+                        self.wfile.flush()
+                        if kind == "drip":
+                            time.sleep(0.1)
+                except OSError:
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def url(self, path):
+        return f"{self.base_url}/{path}"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def site():
+    local_site = LocalSite()
+    yield local_site
+    local_site.close()
+
+
+@pytest.fixture(scope="session")
+def model_dir(tmp_path_factory):
+    # A small synthetic forest with its serving artifacts, shared by every app test
+    from benchmarks.load_test import build_model_dir
+    return build_model_dir(str(tmp_path_factory.mktemp("model")), train_size=2000, seed=0)
+
+
+@pytest.fixture(scope="session")
+def app_module(model_dir):
+    # app.py configures itself from the environment at import, so it is imported once per session
+    os.environ.update({
+        "MODEL_DIR": model_dir,
+        "VERDICT_CACHE_TTL": "0",
+        "PROBE_CACHE_TTL": "0",
+        "MODEL_RELOAD_INTERVAL": "3600",
+    })
+    import app
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    app_module.app.config["TESTING"] = True
+    return app_module.app.test_client()
@@ -0,0 +1,85 @@
+import pytest
+
+
+def test_batch_scores_every_url_in_order(client):
+    urls = ["https://example.com/", "http://login-example.xyz/verify?id=1", "https://docs.python.org/3/"]
+    response = client.post("/api/predict/batch", json={"urls": urls, "probe": False})
+
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [result["url"] for result in results] == urls
+    for result in results:
+        assert result["label"] in (0, 1)
+        assert result["status"] in ("safe", "unsafe")
+        assert 0 <= result["probability"] <= 100
+        assert result["source"] == "model"
+        assert "probe" not in result
+
+
+def test_batch_accepts_a_bare_list(client):
+    response = client.post("/api/predict/batch", json=["https://example.com/"])
+
+    assert response.status_code == 200
+    assert len(response.get_json()["results"]) == 1
+
+
+def test_batch_matches_single_predictions(client, app_module):
+    urls = [f"http://site{i}.example.net/path/{i}?q={'a' * i}" for i in range(40)]
+    results = client.post("/api/predict/batch", json={"urls": urls, "probe": False}).get_json()["results"]
+
+    single = [app_module.predict_pipeline.predict_one(url) for url in urls]
+    assert [result["label"] for result in results] == [prediction.label for prediction in single]
+
+
+@pytest.mark.parametrize("payload", [
+    "not json",
+    {"urls": "https://example.com/"},
+    {"urls": ["https://example.com/", 3]},
+    {"items": []},
+])
+def test_batch_rejects_malformed_payloads(client, payload):
+    if isinstance(payload, str):
+        response = client.post("/api/predict/batch", data=payload, content_type="application/json")
+    else:
+        response = client.post("/api/predict/batch", json=payload)
+
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_batch_rejects_oversized_requests(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "MAX_BATCH_SIZE", 2)
+    response = client.post("/api/predict/batch", json={"urls": ["a", "b", "c"], "probe": False})
+
+    assert response.status_code == 413
+
+
+def test_batch_probes_model_scored_urls(client, site):
+    url = site.url("secure/batch")
+    results = client.post("/api/predict/batch", json={"urls": [url]}).get_json()["results"]
+
+    probe = results[0]["probe"]
+    assert probe["url"] == url
+    assert probe["status_code"] == 200
+    assert probe["findings"]["hsts"]["present"]
+
+
+def test_malformed_urls_get_an_error_entry_and_the_rest_is_scored(client, site):
+    urls = ["http://ok.com", "http://[bad", "https://example.com/℀x", site.url("secure/after")]
+    response = client.post("/api/predict/batch", json={"urls": urls})
+
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [result["url"] for result in results] == urls
+    assert results[1]["source"] == "invalid" and "Invalid IPv6 URL" in results[1]["error"]
+    assert "probe" not in results[1] and "label" not in results[1]
+    for i in (0, 3):
+        assert results[i]["source"] == "model" and "error" not in results[i]
+    assert results[3]["probe"]["findings"]["hsts"]["present"]
+
+
+def test_predict_page_rejects_a_malformed_url(client):
+    response = client.post("/predict", data={"urlinput": "http://[bad"})
+
+    assert response.status_code == 400
+    assert "Invalid URL" in response.get_data(as_text=True)
@@ -0,0 +1,68 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from src.pipeline import bulk_scan as bulk_scan_module
+from src.pipeline.bulk_scan import bulk_scan, iter_url_chunks
+from src.pipeline.predict_pipeline import Prediction
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def read_records(path):
+    with open(path, encoding="utf-8") as output_file:
+        return [json.loads(line) for line in output_file]
+
+
+def test_malformed_lines_get_error_records_and_the_scan_continues(model_dir, tmp_path):
+    input_path = tmp_path / "urls.txt"
+    input_path.write_text("http://ok.com/login\nhttp://[bad\n# comment\n\nhttps://example.org/a?b=1\n")
+    output_path = tmp_path / "results.jsonl"
+
+    assert bulk_scan(str(input_path), str(output_path), model_dir=model_dir, chunk_size=2, workers=1) == 3
+
+    records = read_records(output_path)
+    assert [record["url"] for record in records] == ["http://ok.com/login", "http://[bad", "https://example.org/a?b=1"]
+    assert "Invalid IPv6 URL" in records[1]["error"] and "label" not in records[1]
+    for record in (records[0], records[2]):
+        assert record["source"] == "model" and record["label"] in (0, 1) and "error" not in record
+
+
+def test_a_failing_chunk_is_rescored_url_by_url(monkeypatch):
+    class Pipeline:
+        def predict(self, urls):
+            if any("boom" in url for url in urls):
+                raise ValueError("cannot featurize")
+            return [Prediction(url=url, label=0, probability=0.1, source="model") for url in urls]
+
+    monkeypatch.setattr(bulk_scan_module, "_worker_pipeline", Pipeline())
+
+    records = bulk_scan_module.score_chunk(["http://a", "http://boom", "http://b"])
+
+    assert records[1] == {"url": "http://boom", "error": "cannot featurize"}
+    assert [records[0]["label"], records[2]["label"]] == [0, 0]
+
+
+def test_csv_input_is_read_from_the_url_column(tmp_path):
+    input_path = tmp_path / "feed.csv"
+    input_path.write_text("id,link\n1,http://a.com\n2,\n3,http://b.com\n")
+
+    assert list(iter_url_chunks(str(input_path), 1, url_column="link")) == [["http://a.com"], [], ["http://b.com"]]
+
+
+def test_cli_writes_one_record_per_input_line(model_dir, tmp_path):
+    input_path = tmp_path / "urls.txt"
+    input_path.write_text("http://ok.com\nhttp://[bad\nhttp://fine.net/x\n")
+    output_path = tmp_path / "results.jsonl"
+
+    result = subprocess.run(
+        [sys.executable, "-m", "src.pipeline.bulk_scan", str(input_path), str(output_path),
+         "--model-dir", model_dir, "--workers", "1"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=120,
+    )
+
+    assert result.returncode == 0, result.stderr
+    records = read_records(output_path)
+    assert len(records) == 3
+    assert "error" in records[1] and "error" not in records[0] and "error" not in records[2]
@@ -0,0 +1,92 @@
+from src.pipeline import cache as cache_module
+from src.pipeline.cache import CacheConfig, SQLiteCache, TieredCache, TTLCache, build_caches, host_key, normalize_url
+from src.pipeline.predict_pipeline import PredictPipeline, Prediction
+
+
+def test_normalize_url_lowercases_scheme_and_host_and_drops_fragment():
+    assert normalize_url(" HTTP://Example.COM/Path?q=A#frag ") == "http://example.com/Path?q=A"
+    assert normalize_url("https://example.com") == "https://example.com/"
+
+
+def test_host_key_drops_default_ports():
+    assert host_key("https://Example.com:443/a") == "https://example.com"
+    assert host_key("http://example.com:8080/a") == "http://example.com:8080"
+    assert host_key("http://example.com:bad/") == "http://example.com"
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=5)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=20)
+
+    now[0] += 10
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    SQLiteCache(path, "verdicts", maxsize=10, ttl=60).set("key", {"label": 1})
+
+    assert SQLiteCache(path, "verdicts", maxsize=10, ttl=60).get("key") == {"label": 1}
+    assert SQLiteCache(path, "probes", maxsize=10, ttl=60).get("key") is None
+
+
+def test_tiered_cache_copies_shared_hits_into_the_local_tier(tmp_path):
+    shared = SQLiteCache(str(tmp_path / "cache.db"), "verdicts", maxsize=10, ttl=60)
+    shared.set("key", "value")
+    cache = TieredCache(TTLCache(maxsize=10, ttl=60), shared)
+
+    assert cache.get("key") == "value"
+    assert cache.local.get("key") == "value"
+    assert set(cache.stats()) == {"local", "shared"}
+
+
+def test_build_caches_without_shared_path_stays_in_process():
+    verdicts, probes = build_caches(CacheConfig())
+    assert verdicts.shared is None and probes.shared is None
+
+
+class CountingPipeline(PredictPipeline):
+    # Scores by URL length so differently spelled URLs get different verdicts
+    def __init__(self, cache):
+        super().__init__(model=None, cache=cache)
+        self.scored = []
+
+    def score(self, urls):
+        self.scored.extend(urls)
+        return [Prediction(url=url, label=len(url) % 2, probability=float(len(url))) for url in urls]
+
+
+def test_verdict_cache_reuses_verdicts_for_the_exact_url():
+    pipeline = CountingPipeline(TTLCache(maxsize=10, ttl=60))
+    first = pipeline.predict_one("http://example.com/")
+    second = pipeline.predict_one("http://example.com/")
+
+    assert first == second
+    assert pipeline.scored == ["http://example.com/"]
+
+
+def test_verdict_cache_keys_on_the_exact_url():
+    # Case and fragment change the features, so the verdict must not be shared
+    pipeline = CountingPipeline(TTLCache(maxsize=10, ttl=60))
+    plain = pipeline.predict_one("http://example.com/")
+    spelled = pipeline.predict_one("HTTP://Example.com/#x")
+
+    assert pipeline.scored == ["http://example.com/", "HTTP://Example.com/#x"]
+    assert spelled.url == "HTTP://Example.com/#x"
+    assert spelled.probability != plain.probability
@@ -0,0 +1,115 @@
+import shutil
+import ssl
+import threading
+import time
+
+import pytest
+
+from benchmarks.stub_sites import DEFAULT_PROFILES, TLSStubServer, make_certificates, make_handler
+from src.pipeline.certificate import CertificateInspector, inspect_certificate
+
+pytestmark = pytest.mark.skipif(shutil.which("openssl") is None, reason="needs the openssl command-line tool")
+
+
+@pytest.fixture(scope="module")
+def certificates(tmp_path_factory):
+    # (ca_path, cert_path, key_path) for a throwaway CA and its localhost/127.0.0.1 server certificate
+    return make_certificates(str(tmp_path_factory.mktemp("certs")))
+
+
+def serve_tls(certificates, address):
+    _, cert_path, key_path = certificates
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_path, key_path)
+    server = TLSStubServer((address, 0), make_handler(DEFAULT_PROFILES[0]), context)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def tls_server(certificates):
+    server = serve_tls(certificates, "127.0.0.1")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def trusting(certificates):
+    # Client context that trusts only the throwaway CA
+    return ssl.create_default_context(cafile=certificates[0])
+
+
+def test_valid_certificate_reports_issuer_san_and_expiry(certificates, tls_server):
+    port = tls_server.server_address[1]
+    info = inspect_certificate("127.0.0.1", port, handshake_timeout=2, context=trusting(certificates))
+
+    assert info.error is None
+    assert info.valid and info.hostname_match
+    assert info.issuer == "secure_link_monitor load-test CA"
+    assert info.subject == "localhost"
+    assert info.san == ["localhost"]
+    assert info.protocol.startswith("TLS")
+    # make_certificates issues certificates valid for two days
+    assert 86400 < info.not_after - time.time() <= 2 * 86400
+    assert info.expires_in_days == 1
+
+
+def test_untrusted_certificate_is_invalid_without_a_host_mismatch(tls_server):
+    info = inspect_certificate("127.0.0.1", tls_server.server_address[1], handshake_timeout=2)
+
+    assert not info.valid
+    assert info.hostname_match is None
+    assert info.error
+    assert info.issuer is None
+
+
+def test_certificate_for_another_host_is_a_hostname_mismatch(certificates):
+    # The certificate names 127.0.0.1, so serving it from 127.0.0.2 is a mismatch
+    try:
+        server = serve_tls(certificates, "127.0.0.2")
+    except OSError:
+        pytest.skip("127.0.0.2 is not routed to loopback here")
+    try:
+        info = inspect_certificate("127.0.0.2", server.server_address[1], handshake_timeout=2,
+                                   context=trusting(certificates))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert not info.valid
+    assert info.hostname_match is False
+    assert "mismatch" in info.error.lower()
+
+
+def test_inspector_caches_valid_certificates_until_the_expiry_margin(certificates, tls_server):
+    port = tls_server.server_address[1]
+    inspector = CertificateInspector(max_ttl=30 * 86400, expiry_margin=3600, handshake_timeout=2)
+    inspector.context = trusting(certificates)
+
+    info = inspector.inspect("127.0.0.1", port)
+
+    assert info.valid
+    assert inspector.cached(f"https://127.0.0.1:{port}/x") is info
+    # Lifetime runs to an hour before the two-day certificate expires, not to max_ttl
+    assert inspector._ttl(info) == pytest.approx(info.not_after - time.time() - 3600, abs=5)
+    assert inspector._ttl(info) < 2 * 86400
+
+
+def test_inspector_does_not_cache_certificates_inside_the_expiry_margin(certificates, tls_server):
+    port = tls_server.server_address[1]
+    inspector = CertificateInspector(expiry_margin=3 * 86400, handshake_timeout=2)
+    inspector.context = trusting(certificates)
+
+    assert inspector.inspect("127.0.0.1", port).valid
+    assert inspector._ttl(inspector.inspect("127.0.0.1", port)) == 0
+    assert inspector.cached(f"https://127.0.0.1:{port}/") is None
+
+
+def test_inspector_retries_failed_handshakes_after_the_failure_ttl(tls_server):
+    inspector = CertificateInspector(failure_ttl=60, handshake_timeout=2)
+
+    info = inspector.inspect("127.0.0.1", tls_server.server_address[1])
+
+    assert not info.valid
+    assert inspector._ttl(info) == 60
+    assert inspector.cached(f"https://127.0.0.1:{tls_server.server_address[1]}/") is info
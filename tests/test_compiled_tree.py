@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from benchmarks.corpus import synthetic_corpus
+from src.pipeline.compiled_tree import (NODE_ARRAYS, CompiledTreeModel, export_tree_model, is_tree_model,
+                                        verify_compiled_model)
+from src.pipeline.model_loader import ModelLoaderConfig, load_compiled_model
+from src.pipeline.predict_pipeline import PredictPipeline
+
+
+@pytest.fixture(scope="module")
+def training_data():
+    urls, labels = synthetic_corpus(1500, seed=1)
+    return PredictPipeline(model=None).build_features(urls), np.asarray(labels)
+
+
+@pytest.fixture(scope="module")
+def rows(training_data):
+    # Real feature rows plus random ones that reach unusual branches
+    rng = np.random.default_rng(2)
+    X = training_data[0]
+    return np.vstack([X[:200], rng.integers(0, 100, size=(200, X.shape[1]))])
+
+
+def compile_model(model, tmp_path):
+    path = str(tmp_path / "trees.npz")
+    export_tree_model(model, path)
+    return CompiledTreeModel.load(path)
+
+
+@pytest.mark.parametrize("model", [
+    DecisionTreeClassifier(random_state=0),
+    DecisionTreeClassifier(max_depth=3, random_state=0),
+    RandomForestClassifier(n_estimators=20, random_state=0),
+    RandomForestClassifier(n_estimators=5, max_depth=4, random_state=0),
+], ids=["tree", "shallow-tree", "forest", "shallow-forest"])
+def test_compiled_model_matches_sklearn(model, training_data, rows, tmp_path):
+    model.fit(*training_data)
+    compiled = compile_model(model, tmp_path)
+
+    # Batch path
+    assert np.allclose(compiled.predict_proba(rows), model.predict_proba(rows))
+    assert np.array_equal(compiled.predict(rows), model.predict(rows))
+    # Single-row path, as used for /predict
+    for row in rows[:50]:
+        assert np.allclose(compiled.predict_proba(row[None, :]), model.predict_proba(row[None, :]))
+    assert verify_compiled_model(model, compiled, rows)
+
+
+def test_non_tree_models_are_not_compiled():
+    from sklearn.linear_model import LogisticRegression
+    assert not is_tree_model(LogisticRegression())
+    assert not is_tree_model(DecisionTreeClassifier())
+
+
+def test_stale_export_is_not_served(training_data, tmp_path):
+    served = RandomForestClassifier(n_estimators=10, random_state=0).fit(*training_data)
+    stale = RandomForestClassifier(n_estimators=10, random_state=1, max_depth=2).fit(*training_data)
+    config = ModelLoaderConfig(model_dir=str(tmp_path))
+    export_tree_model(stale, str(tmp_path / config.compiled_file_name))
+
+    assert load_compiled_model(served, config) is None
+
+    export_tree_model(served, str(tmp_path / config.compiled_file_name))
+    assert load_compiled_model(served, config) is not None
+
+
+def test_node_arrays_are_memory_mapped_from_the_export(training_data, rows, tmp_path):
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(*training_data)
+    path = str(tmp_path / "trees.npz")
+    export_tree_model(model, path)
+
+    mapped = CompiledTreeModel.load(path, mmap_mode="r")
+    private = CompiledTreeModel.load(path)
+
+    for name in NODE_ARRAYS:
+        assert isinstance(getattr(mapped, name), np.memmap)
+        assert np.array_equal(getattr(mapped, name), getattr(private, name))
+    assert not isinstance(private.threshold, np.memmap)
+    assert verify_compiled_model(model, mapped, rows)
+    assert np.allclose(mapped.predict_proba(rows[:1]), model.predict_proba(rows[:1]))
+
+
+def test_compressed_exports_are_read_into_memory(training_data, rows, tmp_path):
+    model = DecisionTreeClassifier(random_state=0).fit(*training_data)
+    path = str(tmp_path / "trees.npz")
+    export_tree_model(model, path)
+    with np.load(path) as arrays:
+        np.savez_compressed(path, **{name: arrays[name] for name in arrays.files})
+
+    compiled = CompiledTreeModel.load(path, mmap_mode="r")
+
+    assert not isinstance(compiled.threshold, np.memmap)
+    assert verify_compiled_model(model, compiled, rows)
@@ -0,0 +1,130 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.pipeline.cache import TTLCache
+from src.pipeline.probe import HEADER_ANALYZERS, Deadline, ProbeConfig, ProbeEngine
+
+
+@pytest.fixture
+def engine():
+    probe_engine = ProbeEngine(ProbeConfig(connect_timeout=1, read_timeout=3), cache=TTLCache(100, 60))
+    yield probe_engine
+    probe_engine.close()
+
+
+def wait_within(engine, url, seconds):
+    deadline = Deadline(seconds)
+    return engine.result_within(engine.submit(url, deadline=deadline), deadline)
+
+
+def test_callers_with_deadlines_still_share_one_probe(engine, site):
+    urls = [site.url(f"slow/page{i}") for i in range(40)]
+    with ThreadPoolExecutor(max_workers=40) as callers:
+        results = list(callers.map(lambda url: wait_within(engine, url, 2), urls))
+
+    assert site.requests["slow"] == 1
+    assert [result.url for result in results] == urls
+    assert not any(result.timed_out for result in results)
+
+
+def test_short_deadline_ends_only_that_callers_wait(engine, site):
+    site.slow_seconds = 0.5
+    impatient = wait_within(engine, site.url("slow/a"), 0.1)
+
+    assert "headers" in impatient.timed_out
+    assert all(impatient.finding(analyzer.name).timed_out for analyzer in HEADER_ANALYZERS)
+    # The shared probe was not cut short: a caller with time left gets the full result from it
+    patient = wait_within(engine, site.url("slow/b"), 5)
+    assert patient.timed_out == [] and patient.finding("hsts").present
+    assert site.requests["slow"] == 1
+    # ... and it was cached for later callers
+    assert wait_within(engine, site.url("slow/c"), 0.01).finding("hsts").present
+    assert site.requests["slow"] == 1
+
+
+def test_custom_analyzer_probes_are_bound_by_their_own_deadline(engine, site):
+    site.slow_seconds = 1.0
+    deadline = Deadline(0.1)
+    start = time.monotonic()
+    future = engine.submit(site.url("slow/custom"), analyzers=HEADER_ANALYZERS[:1], deadline=deadline)
+    result = engine.result_within(future, deadline)
+
+    assert time.monotonic() - start < 0.5
+    assert "headers" in result.timed_out
+    # Its checks ran on timeouts shortened to the deadline, so they end soon after it
+    future.checks[0].exception(timeout=2)
+
+
+@pytest.fixture
+def busy_engine(site):
+    # One probe thread, kept busy by a slow probe so later checks sit in the queue
+    site.slow_seconds = 0.5
+    probe_engine = ProbeEngine(ProbeConfig(connect_timeout=1, read_timeout=3, max_workers=1))
+    blocker = probe_engine.submit(site.url("slow/blocker"))
+    yield probe_engine
+    blocker.result(timeout=10)
+    probe_engine.close()
+
+
+def test_queued_checks_are_cancelled_once_every_caller_gives_up(busy_engine, site):
+    # localhost is another site than 127.0.0.1 as far as probe sharing goes
+    url = site.url("bare/page").replace("127.0.0.1", "localhost")
+    deadline = Deadline(0.1)
+    future = busy_engine.submit(url)
+    result = busy_engine.result_within(future, deadline)
+
+    assert result.timed_out == ["headers", "certificate"]
+    assert all(check.cancelled() for check in future.checks)
+    # A later caller starts a fresh probe instead of joining the cancelled one
+    retry = busy_engine.submit(url)
+    assert retry.checks[0] is not future.checks[0]
+    assert retry.result(timeout=10).error is None
+    assert site.requests["bare"] == 1
+
+
+def test_queued_checks_keep_running_while_a_caller_still_waits(busy_engine, site):
+    url = site.url("bare/page").replace("127.0.0.1", "localhost")
+    impatient = busy_engine.submit(url)
+    patient = busy_engine.submit(url)
+
+    assert busy_engine.result_within(impatient, Deadline(0.1)).timed_out == ["headers", "certificate"]
+    assert not any(check.cancelled() for check in impatient.checks)
+    assert patient.result(timeout=10).error is None
+    assert site.requests["bare"] == 1
+
+
+@pytest.fixture
+def sync_app(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "ASYNC_PROBES", False)
+    return app_module
+
+
+@pytest.mark.parametrize("deadline", ["soon", "0", "-1", "nan", ""])
+def test_both_endpoints_reject_invalid_deadlines(client, sync_app, deadline):
+    page = client.post("/predict", data={"urlinput": "https://example.com/", "deadline": deadline})
+    batch = client.post("/api/predict/batch", json={"urls": ["https://example.com/"], "deadline": deadline})
+
+    assert page.status_code == 400 and "deadline" in page.get_data(as_text=True)
+    assert batch.status_code == 400
+
+
+def test_predict_reports_checks_past_the_deadline(client, sync_app, site):
+    site.slow_seconds = 1.0
+    start = time.monotonic()
+    page = client.post("/predict", data={"urlinput": site.url("slow/page"), "deadline": "0.2"})
+
+    assert time.monotonic() - start < 0.9
+    assert page.status_code == 200
+    assert "HSTS: check timed out before the response deadline." in page.get_data(as_text=True)
+
+
+def test_batch_reports_timed_out_checks(client, sync_app, site):
+    site.slow_seconds = 1.0
+    urls = [site.url(f"slow/{i}") for i in range(5)]
+    results = client.post("/api/predict/batch", json={"urls": urls, "deadline": 0.2}).get_json()["results"]
+
+    assert all("headers" in result["probe"]["timed_out"] for result in results)
+    assert all(result["probe"]["error"] == "timed out" for result in results)
+    assert site.requests["slow"] == 1
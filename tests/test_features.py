@@ -0,0 +1,91 @@
+import random
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pytest
+
+from benchmarks.corpus import synthetic_corpus
+from src.features import FEATURE_COLUMNS, VECTORIZE_MIN_BATCH, build_feature_matrix, extract_url_features, url_error
+
+
+def reference_features(url):
+    # The original urlparse/parse_qs definitions the fast paths must reproduce
+    parsed_url = urlparse(url)
+    domain, path = parsed_url.netloc, parsed_url.path
+    return [len(domain), len(path), len(url.split('/')[-1]), url.count('-'),
+            url.count('@'), url.count('?'), url.count('%'), url.count('.'),
+            url.count('='), url.count('http'), url.count('https'), url.count('www'),
+            sum(c.isdigit() for c in url), sum(c.isalpha() for c in url), url.count('/'),
+            1 if domain.replace('.', '').isdigit() else 0,
+            url.count('-'), len(url), url.count('~'), url.count('.'),
+            url.count('%'), len(domain), len(parse_qs(parsed_url.query)), url.count('&'),
+            url.count('-'), len(path.split('/')), url.count('='), url.count('='),
+            url.count('/'), url.count('/') - 1, len(path.split('/')[-1]), url.count('&'),
+            url.count('.')]
+
+
+EDGE_CASES = [
+    "",
+    "example.com",
+    "https://example.com",
+    "HTTP://Example.com/#x",
+    "http://192.168.0.1:8080/admin/login.php?user=a&pass=b",
+    "https://user:pw@www.example.com/a-b/c~d/file.tar.gz?x=1&x=2&y=&=z#frag?not=query",
+    "https://[2001:db8::1]/path;params?q=1",
+    "https://example.com/a%20b?q=%41%42&q2=caf%C3%A9",
+    "ftp://files.example.org//double//slashes/",
+    "http://www.wwwhttps.example/httphttps?https=www",
+    "https://bücher.example/straße?q=ñ",
+    "https://example.com/١٢٣?x=²",
+    "mailto:someone@example.com",
+    "//protocol-relative.example/x?y=1",
+    "http://example.com/?a=1&a=2&b=3&c",
+    " https://padded.example/ ",
+    "https://example.com/\ttab",
+]
+
+
+@pytest.mark.parametrize("url", EDGE_CASES)
+def test_extract_url_features_matches_the_original_definitions(url):
+    assert extract_url_features(url) == reference_features(url)
+
+
+def test_feature_rows_have_one_value_per_column():
+    assert len(extract_url_features("https://example.com/")) == len(FEATURE_COLUMNS)
+
+
+def test_batch_matrix_matches_per_url_features():
+    urls, _ = synthetic_corpus(500, seed=3)
+    urls = list(urls) + EDGE_CASES
+    matrix = build_feature_matrix(urls, batch_size=128)
+
+    assert matrix.shape == (len(urls), len(FEATURE_COLUMNS))
+    assert matrix.dtype == np.int64
+    for url, row in zip(urls, matrix):
+        assert row.tolist() == reference_features(url), url
+
+
+def test_small_batches_take_the_per_url_path():
+    urls = EDGE_CASES[:VECTORIZE_MIN_BATCH - 1]
+    assert build_feature_matrix(urls).tolist() == [reference_features(url) for url in urls]
+
+
+def test_empty_input_gives_an_empty_matrix():
+    assert build_feature_matrix([]).shape == (0, len(FEATURE_COLUMNS))
+
+
+@pytest.mark.parametrize("url", ["http://[bad", "https://ex]ample.com/", "http://[::1/x", "https://example.com\u2100/"])
+def test_url_error_flags_urls_urlparse_rejects(url):
+    assert url_error(url)
+    with pytest.raises(ValueError):
+        urlparse(url)
+
+
+def test_urls_passing_url_error_can_always_be_featurized():
+    rng = random.Random(5)
+    alphabet = "ab1.:/?#&=[]@%;-~ \u2100\u00e9"
+    urls = ["http://" + "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 20))) for _ in range(3000)]
+    valid = [url for url in urls if url_error(url) is None]
+
+    assert 0 < len(valid) < len(urls)
+    assert build_feature_matrix(valid).tolist() == [reference_features(url) for url in valid]
@@ -0,0 +1,146 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import SGDClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from benchmarks.corpus import synthetic_corpus
+from src.components.model_updater import ModelUpdater
+from src.features import build_feature_matrix, extract_url_features
+from src.pipeline import feedback as feedback_module
+from src.pipeline.feedback import FeedbackLog
+
+TOKEN = "s3cret"
+
+
+@pytest.fixture
+def feedback_log(tmp_path):
+    return FeedbackLog(str(tmp_path / "feedback.db"))
+
+
+@pytest.fixture(scope="module")
+def training_data():
+    urls, labels = synthetic_corpus(1000, seed=4)
+    return build_feature_matrix(urls), np.asarray(labels, dtype=np.int64)
+
+
+def test_feedback_round_trips_with_feature_rows(feedback_log):
+    urls = ["https://example.com/", "http://login-example.xyz/verify?id=1"]
+    last_id = feedback_log.record(urls, [0, 1])
+    ids, features, labels = feedback_log.read()
+
+    assert ids.tolist() == [last_id - 1, last_id]
+    assert labels.tolist() == [0, 1]
+    assert features.tolist() == [extract_url_features(url) for url in urls]
+    assert len(feedback_log) == 2
+    assert feedback_log.read(after_id=last_id)[0].tolist() == []
+
+
+def test_rows_from_an_older_feature_schema_are_recomputed(feedback_log, monkeypatch):
+    monkeypatch.setattr(feedback_module, "FEATURE_SCHEMA_VERSION", 0)
+    monkeypatch.setattr(feedback_module, "build_feature_matrix", lambda urls: np.zeros((len(urls), 33), dtype=np.int64))
+    feedback_log.record(["https://example.com/a"], [1])
+    monkeypatch.undo()
+
+    _, features, _ = feedback_log.read()
+    assert features[0].tolist() == extract_url_features("https://example.com/a")
+
+
+def test_partial_fit_models_learn_from_new_rows_only(training_data):
+    X, y = training_data
+    model = SGDClassifier(random_state=0).partial_fit(X[:500], y[:500], classes=[0, 1])
+    updated, strategy = ModelUpdater().update_model(model, (X[500:520], y[500:520]), (X[500:520], y[500:520]), (X, y))
+
+    assert strategy == "partial_fit" and updated is model
+
+
+def test_forests_grow_extra_trees(training_data):
+    X, y = training_data
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+    first_tree = model.estimators_[0]
+    updater = ModelUpdater()
+    updated, strategy = updater.update_model(model, (X[:20], y[:20]), (X[:20], y[:20]), (X, y))
+
+    assert strategy == "warm_start"
+    assert len(updated.estimators_) == 10 + updater.model_updater_config.trees_per_update
+    assert updated.estimators_[0] is first_tree
+
+
+def test_forests_missing_a_class_are_refit(training_data):
+    X, y = training_data
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    one_class = y == 1
+    # No training rows to replay, and every feedback row has the same label
+    updated, strategy = ModelUpdater().update_model(
+        model, (X[one_class][:5], y[one_class][:5]), (X[one_class][:5], y[one_class][:5]), (X[:0], y[:0]))
+
+    assert strategy == "refit" and updated is not model
+
+
+def test_other_models_are_refit_on_training_rows_plus_feedback(training_data):
+    X, y = training_data
+    model = DecisionTreeClassifier(random_state=0).fit(X, y)
+    updated, strategy = ModelUpdater().update_model(model, (X[:5], 1 - y[:5]), (X[:5], 1 - y[:5]), (X, y))
+
+    assert strategy == "refit" and updated is not model
+    assert updated.n_features_in_ == X.shape[1]
+
+
+@pytest.fixture
+def feedback_app(app_module, feedback_log, monkeypatch):
+    monkeypatch.setattr(app_module, "FEEDBACK_TOKEN", TOKEN)
+    monkeypatch.setattr(app_module, "feedback_log", feedback_log)
+    return app_module
+
+
+def post_feedback(client, payload, token=TOKEN):
+    headers = {"Authorization": f"Bearer {token}"} if token is not None else {}
+    return client.post("/api/feedback", json=payload, headers=headers)
+
+
+def test_feedback_endpoint_is_disabled_without_a_token(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "FEEDBACK_TOKEN", None)
+    assert post_feedback(client, {"url": "https://example.com/", "label": "safe"}).status_code == 403
+
+
+@pytest.mark.parametrize("token", [None, "wrong", "s3cret-but-longer", "ünicode"])
+def test_feedback_endpoint_rejects_bad_tokens(client, feedback_app, feedback_log, token):
+    response = post_feedback(client, {"url": "https://example.com/", "label": "safe"}, token=token)
+
+    assert response.status_code == 401
+    assert len(feedback_log) == 0
+
+
+def test_feedback_endpoint_records_labels(client, feedback_app, feedback_log):
+    response = post_feedback(client, [{"url": "https://example.com/", "label": "safe"},
+                                      {"url": "http://bad.example/", "label": 1}])
+
+    assert response.status_code == 200
+    assert response.get_json()["recorded"] == 2
+    assert feedback_log.read()[2].tolist() == [0, 1]
+
+
+@pytest.mark.parametrize("item", [
+    {"url": "https://example.com/", "label": []},
+    {"url": "https://example.com/", "label": {"a": 1}},
+    {"url": "https://example.com/", "label": True},
+    {"url": "https://example.com/", "label": 2},
+    {"url": "https://example.com/", "label": "maybe"},
+    {"url": "https://example.com/"},
+    {"url": 3, "label": 0},
+    "https://example.com/",
+])
+def test_feedback_endpoint_rejects_bad_items(client, feedback_app, feedback_log, item):
+    response = post_feedback(client, [item])
+
+    assert response.status_code == 400
+    assert len(feedback_log) == 0
+
+
+def test_feedback_endpoint_rejects_malformed_urls(client, feedback_app, feedback_log):
+    response = post_feedback(client, [{"url": "https://example.com/", "label": "safe"},
+                                      {"url": "http://[bad", "label": "unsafe"}])
+
+    assert response.status_code == 400
+    assert "http://[bad" in response.get_json()["error"]
+    assert len(feedback_log) == 0
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.corpus import synthetic_corpus
+from src.components.data_ingestion import DataIngestion, split_is_test
+from src.components.feature_store import FeatureStore
+from src.features import FEATURE_COLUMNS, extract_url_features
+from src.utils import NpyAppender
+
+
+@pytest.mark.parametrize("dtype,row_shape", [(np.int64, ()), (np.int64, (3,)), (np.float32, (2, 2))])
+def test_npy_appender_round_trips_through_a_memory_map(tmp_path, dtype, row_shape):
+    path = str(tmp_path / "out" / "array.npy")
+    blocks = [np.arange(n * int(np.prod(row_shape)), dtype=dtype).reshape((n,) + row_shape) for n in (4, 0, 7)]
+
+    with NpyAppender(path, dtype, row_shape) as appender:
+        for block in blocks:
+            appender.append(block)
+
+    loaded = np.load(path, mmap_mode="r")
+    assert isinstance(loaded, np.memmap)
+    assert loaded.offset == NpyAppender.HEADER_SIZE
+    assert loaded.dtype == np.dtype(dtype)
+    assert np.array_equal(loaded, np.concatenate(blocks))
+
+
+def test_npy_appender_with_no_rows_is_an_empty_array(tmp_path):
+    path = str(tmp_path / "empty.npy")
+    NpyAppender(path, np.int64, (len(FEATURE_COLUMNS),)).close()
+
+    assert np.load(path, mmap_mode="r").shape == (0, len(FEATURE_COLUMNS))
+
+
+@pytest.fixture
+def corpus_csv(tmp_path):
+    urls, labels = synthetic_corpus(300, seed=3)
+    path = tmp_path / "urls.csv"
+    pd.DataFrame({"url": urls, "result": labels}).to_csv(path, index=False)
+    return str(path), urls, np.asarray(labels)
+
+
+def streaming_ingest(dataset_path, directory, chunksize, use_feature_store=False):
+    ingestion = DataIngestion()
+    config = ingestion.ingestion_config
+    config.dataset_path = dataset_path
+    config.chunksize = chunksize
+    config.n_jobs = 1
+    config.use_feature_store = use_feature_store
+    config.feature_store_path = str(directory / "feature_store.db")
+    for name in ("train_features", "train_labels", "test_features", "test_labels"):
+        setattr(config, f"{name}_path", str(directory / f"{name}.npy"))
+    (train_features, train_labels), (test_features, test_labels) = ingestion.initiate_streaming_ingestion()
+    return [np.load(path, mmap_mode="r") for path in (train_features, train_labels, test_features, test_labels)]
+
+
+def test_split_does_not_depend_on_chunk_size(corpus_csv, tmp_path):
+    dataset_path, urls, labels = corpus_csv
+    small = streaming_ingest(dataset_path, tmp_path / "small", chunksize=7)
+    large = streaming_ingest(dataset_path, tmp_path / "large", chunksize=1000)
+
+    for small_array, large_array in zip(small, large):
+        assert np.array_equal(small_array, large_array)
+
+    # Rows are the per-URL features, split by the URL hash alone
+    is_test = np.array([split_is_test(url, 0.20, 42) for url in urls])
+    expected = np.array([extract_url_features(url) for url in urls], dtype=np.int64)
+    train_features, train_labels, test_features, test_labels = small
+    assert 0 < is_test.sum() < len(urls)
+    assert np.array_equal(train_features, expected[~is_test])
+    assert np.array_equal(test_features, expected[is_test])
+    assert np.array_equal(train_labels, labels[~is_test])
+    assert np.array_equal(test_labels, labels[is_test])
+
+
+def test_streaming_ingestion_reuses_the_feature_store(corpus_csv, tmp_path):
+    dataset_path, urls, _ = corpus_csv
+    first = streaming_ingest(dataset_path, tmp_path, chunksize=50, use_feature_store=True)
+    second = streaming_ingest(dataset_path, tmp_path, chunksize=50, use_feature_store=True)
+
+    for first_array, second_array in zip(first, second):
+        assert np.array_equal(first_array, second_array)
+    store = FeatureStore(str(tmp_path / "feature_store.db"))
+    assert len(store.lookup([store.url_key(url) for url in set(urls)])) == len(set(urls))
+    store.close()
+
+
+def test_feature_store_computes_only_unknown_urls(tmp_path):
+    store = FeatureStore(str(tmp_path / "store.db"), schema_version=1, n_features=2)
+    computed = []
+
+    def compute(urls):
+        computed.append(list(urls))
+        return np.array([[len(url), url.count(".")] for url in urls], dtype=np.int64)
+
+    first = store.get_or_compute(["a.com", "b.org"], compute)
+    second = store.get_or_compute(["b.org", "c.net.io"], compute)
+
+    assert computed == [["a.com", "b.org"], ["c.net.io"]]
+    assert first.tolist() == [[5, 1], [5, 1]]
+    assert second.tolist() == [[5, 1], [8, 2]]
+    assert (store.hits, store.misses) == (1, 3)
+    store.close()
+
+
+def test_feature_store_drops_rows_from_other_schema_versions(tmp_path):
+    path = str(tmp_path / "store.db")
+    keys = [FeatureStore.url_key(url) for url in ("a.com", "b.org")]
+    store = FeatureStore(path, schema_version=1, n_features=2)
+    store.put_many(keys, np.array([[1, 2], [3, 4]]))
+    store.close()
+
+    same = FeatureStore(path, schema_version=1, n_features=2)
+    assert len(same.lookup(keys)) == 2
+    same.close()
+
+    changed = FeatureStore(path, schema_version=2, n_features=2)
+    assert changed.lookup(keys) == {}
+    assert changed.conn.execute("SELECT COUNT(*) FROM features").fetchone()[0] == 0
+    changed.close()
@@ -0,0 +1,88 @@
+import io
+import json
+import logging
+import os
+import warnings
+
+import pytest
+
+from src.logger import SamplingFilter, configure_logging, parse_sample_rates, shutdown_logging
+
+
+@pytest.fixture
+def restore_logging():
+    yield
+    configure_logging(log_file=None, stream=None)
+
+
+def records(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_records_are_json_with_extra_fields(restore_logging):
+    stream = io.StringIO()
+    configure_logging(log_file=None, stream=stream)
+    logging.info("probe of %s", "https://example.com/", extra={'event': 'probe_response', 'status_code': 200})
+    shutdown_logging()
+
+    [entry] = records(stream)
+    assert entry['msg'] == "probe of https://example.com/"
+    assert entry['event'] == 'probe_response' and entry['status_code'] == 200
+    assert entry['level'] == 'INFO'
+
+
+def test_tracebacks_keep_their_own_field(restore_logging):
+    stream = io.StringIO()
+    configure_logging(log_file=None, stream=stream)
+    try:
+        raise ValueError("bad row")
+    except ValueError:
+        logging.exception("scoring failed")
+    shutdown_logging()
+
+    [entry] = records(stream)
+    assert entry['msg'] == "scoring failed"
+    assert entry['exc'].startswith("Traceback") and "ValueError: bad row" in entry['exc']
+
+
+def test_sampling_keeps_warnings_and_unlisted_events():
+    sampler = SamplingFilter({'probe_response': 0})
+
+    assert not sampler.filter(logging.makeLogRecord({'levelno': logging.INFO, 'event': 'probe_response'}))
+    assert sampler.filter(logging.makeLogRecord({'levelno': logging.WARNING, 'event': 'probe_response'}))
+    assert sampler.filter(logging.makeLogRecord({'levelno': logging.INFO, 'event': 'other'}))
+    assert parse_sample_rates("probe_response=0.1, cache=0.5") == {'probe_response': 0.1, 'cache': 0.5}
+
+
+def test_full_queue_drops_instead_of_blocking(restore_logging):
+    handler = configure_logging(log_file=None, stream=None, queue_size=1)
+    # With the writer stopped nothing drains the queue
+    shutdown_logging()
+    for _ in range(5):
+        logging.info("queued")
+
+    assert handler.dropped == 4
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork()")
+def test_forked_children_write_their_own_file(tmp_path, restore_logging):
+    log_file = str(tmp_path / "app.log")
+    configure_logging(log_file=log_file)
+    logging.info("from parent")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        pid = os.fork()
+    if pid == 0:
+        try:
+            logging.info("from child")
+            shutdown_logging()
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+    shutdown_logging()
+
+    with open(log_file) as parent_file:
+        assert [json.loads(line)['msg'] for line in parent_file] == ["from parent"]
+    with open(str(tmp_path / f"app.{pid}.log")) as child_file:
+        assert [json.loads(line)['msg'] for line in child_file] == ["from child"]
@@ -0,0 +1,70 @@
+from src.pipeline.metrics import MetricsRegistry
+
+
+def test_counter_renders_one_line_per_label_set():
+    registry = MetricsRegistry()
+    counter = registry.counter("slm_test_total", "Test counter.", ("outcome",))
+    counter.inc(outcome="ok")
+    counter.inc(2, outcome="ok")
+    counter.inc(outcome="failed")
+
+    assert registry.render().splitlines() == [
+        "# HELP slm_test_total Test counter.",
+        "# TYPE slm_test_total counter",
+        'slm_test_total{outcome="failed"} 1',
+        'slm_test_total{outcome="ok"} 3',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("slm_test_seconds", "Test histogram.", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 5.0):
+        histogram.observe(value, stage="a")
+
+    lines = registry.render().splitlines()
+    assert 'slm_test_seconds_bucket{stage="a",le="0.1"} 2' in lines
+    assert 'slm_test_seconds_bucket{stage="a",le="1.0"} 3' in lines
+    assert 'slm_test_seconds_bucket{stage="a",le="+Inf"} 4' in lines
+    assert 'slm_test_seconds_sum{stage="a"} 5.65' in lines
+    assert 'slm_test_seconds_count{stage="a"} 4' in lines
+
+
+def test_histogram_time_works_as_a_decorator():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("slm_test_seconds", "Test histogram.", ("stage",))
+
+    @histogram.time(stage="call")
+    def work():
+        return 42
+
+    assert work() == 42 and work() == 42
+    assert 'slm_test_seconds_count{stage="call"} 2' in registry.render().splitlines()
+
+
+def test_collectors_are_rendered_at_scrape_time():
+    registry = MetricsRegistry()
+    values = ["slm_a 1"]
+    registry.add_collector(lambda: list(values))
+    values[0] = "slm_a 2"
+
+    assert registry.render() == "slm_a 2\n"
+
+
+def test_metrics_endpoint_exposes_stage_latency_and_cache_counters(client):
+    client.post("/api/predict/batch", json={"urls": ["https://example.com/"], "probe": False})
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    body = response.get_data(as_text=True)
+    assert 'slm_stage_duration_seconds_count{stage="predict_batch_total"}' in body
+    assert 'slm_stage_duration_seconds_count{stage="inference"}' in body
+    assert 'slm_cache_requests_total{cache="verdicts",tier="local",result="misses"}' in body
+
+
+def test_cache_stats_endpoint(client):
+    stats = client.get("/api/cache/stats").get_json()
+
+    assert set(stats) == {"verdicts", "probes"}
+    assert {"hits", "misses", "maxsize"} <= set(stats["verdicts"]["local"])
@@ -0,0 +1,41 @@
+import time
+
+import requests
+
+from src.pipeline.probe import HEADER_ANALYZERS, probe_url
+
+
+def test_probe_url_runs_every_analyzer_on_one_request(site):
+    result = probe_url(site.url("secure/page"))
+
+    assert result.error is None
+    assert result.status_code == 200
+    assert set(result.findings) == {analyzer.name for analyzer in HEADER_ANALYZERS}
+    assert all(finding.present for finding in result.findings.values())
+    assert site.requests["secure"] == 1
+
+
+def test_probe_url_reports_missing_headers_as_absent(site):
+    result = probe_url(site.url("bare"))
+
+    assert result.error is None
+    assert not any(finding.present for finding in result.findings.values())
+    assert not any(finding.error for finding in result.findings.values())
+
+
+def test_probe_url_does_not_wait_for_the_body(site):
+    # The drip body takes ~4s to arrive; only the headers should be read
+    start = time.monotonic()
+    result = probe_url(site.url("drip"), timeout=1, session=requests.Session())
+
+    assert time.monotonic() - start < 1
+    assert result.error is None
+    assert result.finding("hsts").present
+
+
+def test_probe_url_failure_marks_findings_as_errors():
+    result = probe_url("http://127.0.0.1:9/", timeout=1)
+
+    assert result.error is not None
+    assert result.status_code is None
+    assert all(result.finding(analyzer.name).error for analyzer in HEADER_ANALYZERS)
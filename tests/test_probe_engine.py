@@ -0,0 +1,99 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+
+from src.pipeline.cache import TTLCache
+from src.pipeline.certificate import CertificateInfo
+from src.pipeline.probe import Deadline, DeadlineExceeded, OutboundLimiter, ProbeConfig, ProbeEngine, RateLimiter
+
+
+@pytest.fixture
+def engine():
+    probe_engine = ProbeEngine(ProbeConfig(connect_timeout=1, read_timeout=2), cache=TTLCache(100, 60))
+    yield probe_engine
+    probe_engine.close()
+
+
+def test_rate_limiter_allows_bursts_then_spaces_tokens():
+    limiter = RateLimiter(rate=10, burst=3)
+
+    assert [limiter.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert 0 < limiter.try_acquire() <= 0.1
+    assert limiter.acquire(timeout=0.5)
+
+
+def test_rate_limiter_gives_up_when_no_token_arrives_in_time():
+    limiter = RateLimiter(rate=0.5, burst=1)
+    limiter.try_acquire()
+
+    assert not limiter.acquire(timeout=0.1)
+
+
+def test_outbound_limiter_bounds_concurrency_per_host():
+    limiter = OutboundLimiter(per_host_concurrency=2, per_host_rate=1000, per_host_burst=1000, max_outbound=10)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def check():
+        with limiter.slot("example.com"):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=check) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+
+
+def test_outbound_limiter_respects_the_deadline():
+    limiter = OutboundLimiter(per_host_concurrency=1, per_host_rate=1000, per_host_burst=1000, max_outbound=10)
+    with limiter.slot("example.com"):
+        with pytest.raises(DeadlineExceeded):
+            with limiter.slot("example.com", Deadline(0.05)):
+                pass
+        # Other hosts are unaffected
+        with limiter.slot("other.example", Deadline(0.05)):
+            pass
+
+
+def test_concurrent_probes_of_one_host_share_one_request(engine, site):
+    urls = [site.url(f"slow/page{i}") for i in range(40)]
+    futures = [engine.submit(url) for url in urls]
+    results = [future.result(timeout=10) for future in futures]
+
+    assert site.requests["slow"] == 1
+    assert [result.url for result in results] == urls
+    assert all(result.finding("hsts").present for result in results)
+
+
+def test_completed_probes_are_served_from_the_cache(engine, site):
+    engine.probe(site.url("secure/a"))
+    result = engine.probe(site.url("secure/b"))
+
+    assert site.requests["secure"] == 1
+    assert result.url == site.url("secure/b")
+
+
+def test_cached_certificates_take_no_limiter_slot(engine, monkeypatch):
+    url = "https://cached.example/"
+    info = CertificateInfo(host="cached.example", port=443, valid=True, issuer="Test CA")
+    engine.inspector.cache.set("cached.example:443", info)
+    slots = []
+
+    @contextmanager
+    def counting_slot(host, deadline=None):
+        slots.append(host)
+        yield
+
+    monkeypatch.setattr(engine.limiter, "slot", counting_slot)
+    for _ in range(10):
+        assert engine._inspect_certificate(url, Deadline(1)) is info
+    assert slots == []
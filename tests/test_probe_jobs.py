@@ -0,0 +1,123 @@
+import re
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+from src.pipeline.probe import ProbeResult
+from src.pipeline.probe_jobs import DONE, FAILED, PENDING, ProbeJobConfig, ProbeJobQueue
+
+
+class ManualEngine:
+    # Probe engine whose futures the test resolves by hand
+    def __init__(self):
+        self.futures = {}
+
+    def submit(self, url):
+        self.futures[url] = Future()
+        return self.futures[url]
+
+
+class ShutDownEngine:
+    def submit(self, url):
+        raise RuntimeError("cannot schedule new futures after shutdown")
+
+
+def test_job_is_pending_until_its_probe_finishes():
+    engine = ManualEngine()
+    jobs = ProbeJobQueue(engine)
+    job = jobs.submit("https://example.com/")
+
+    assert job.status == PENDING and jobs.pending() == 1
+    engine.futures["https://example.com/"].set_result(ProbeResult(url="https://example.com/", status_code=200))
+
+    finished = jobs.get(job.id)
+    assert finished.status == DONE and finished.result.status_code == 200
+    assert jobs.pending() == 0
+
+
+def test_failed_probe_marks_the_job_failed():
+    engine = ManualEngine()
+    jobs = ProbeJobQueue(engine)
+    job = jobs.submit("https://example.com/")
+    engine.futures["https://example.com/"].set_exception(ValueError("boom"))
+
+    assert jobs.get(job.id).status == FAILED
+    assert jobs.get(job.id).error == "boom"
+
+
+def test_submissions_beyond_max_pending_are_rejected():
+    jobs = ProbeJobQueue(ManualEngine(), ProbeJobConfig(max_pending=2))
+
+    assert jobs.submit("https://a.example/") is not None
+    assert jobs.submit("https://b.example/") is not None
+    assert jobs.submit("https://c.example/") is None
+
+
+def test_engine_errors_do_not_leak_pending_slots():
+    jobs = ProbeJobQueue(ShutDownEngine(), ProbeJobConfig(max_pending=1))
+
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            jobs.submit("https://example.com/")
+    assert jobs.pending() == 0
+
+
+def test_wait_returns_when_the_job_finishes():
+    engine = ManualEngine()
+    jobs = ProbeJobQueue(engine)
+    job = jobs.submit("https://example.com/")
+    threading.Timer(0.1, engine.futures["https://example.com/"].set_result,
+                    args=(ProbeResult(url="https://example.com/"),)).start()
+
+    assert jobs.wait(job.id, timeout=5).status == DONE
+    assert jobs.wait("unknown", timeout=0.1) is None
+
+
+def test_jobs_are_shared_through_sqlite(tmp_path):
+    config = ProbeJobConfig(shared_path=str(tmp_path / "jobs.db"))
+    engine = ManualEngine()
+    job = ProbeJobQueue(engine, config).submit("https://example.com/")
+    engine.futures["https://example.com/"].set_result(ProbeResult(url="https://example.com/"))
+
+    # Another worker's queue answers for the job
+    assert ProbeJobQueue(ManualEngine(), config).get(job.id).status == DONE
+
+
+def test_predict_queues_checks_and_the_job_can_be_fetched(client, app_module, site, monkeypatch):
+    monkeypatch.setattr(app_module, "ASYNC_PROBES", True)
+    url = site.url("secure/async")
+    response = client.post("/predict", data={"urlinput": url})
+    assert response.status_code == 200
+
+    # The page polls the job's status URL
+    job_id = re.search(r"/api/probe/([0-9a-f]{32})", response.get_data(as_text=True)).group(1)
+    app_module.probe_jobs.wait(job_id, timeout=5)
+    payload = client.get(f"/api/probe/{job_id}").get_json()
+    assert payload["status"] == DONE
+    assert payload["results"][2] == "✅ HSTS is enabled for the website."
+    assert client.get("/api/probe/unknown").status_code == 404
+
+
+def test_event_stream_delivers_the_result(client, app_module, site):
+    job = app_module.probe_jobs.submit(site.url("slow/events"))
+    response = client.get(f"/api/probe/{job.id}/events")
+
+    assert response.mimetype == "text/event-stream"
+    body = response.get_data(as_text=True)
+    assert body.startswith("event: result\n") or "\nevent: result\n" in body
+    assert '"status": "done"' in body
+
+
+def test_event_streams_are_capped_per_worker(client, app_module, site, monkeypatch):
+    monkeypatch.setattr(app_module, "event_stream_slots", threading.BoundedSemaphore(1))
+    job = app_module.probe_jobs.submit(site.url("slow/capped"))
+    held = client.get(f"/api/probe/{job.id}/events", buffered=False)
+
+    refused = client.get(f"/api/probe/{job.id}/events")
+    assert refused.status_code == 503
+    assert refused.get_json()["poll"] == f"/api/probe/{job.id}"
+
+    # Closing the open stream frees its slot
+    held.close()
+    assert client.get(f"/api/probe/{job.id}/events").status_code == 200
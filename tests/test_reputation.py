@@ -0,0 +1,74 @@
+import pytest
+
+from src.pipeline.predict_pipeline import PredictPipeline
+from src.pipeline.reputation import ALLOW, DENY, ReputationConfig, ReputationIndex, build_reputation_index
+
+
+@pytest.fixture
+def index(tmp_path):
+    allow = tmp_path / "allow.txt"
+    allow.write_text("# trusted\nexample.com\n*.docs.example.org\nhttps://shared.example/safe/page\nboth.example\n")
+    deny = tmp_path / "deny.txt"
+    deny.write_text("evil.example  # phishing kit\nshared.example/login\nboth.example\n\n")
+    config = ReputationConfig(index_dir=str(tmp_path / "index"))
+    build_reputation_index([str(allow)], [str(deny)], config)
+    return ReputationIndex.load(config)
+
+
+@pytest.mark.parametrize("url, verdict", [
+    ("https://example.com/", ALLOW),
+    ("http://login.EXAMPLE.com./anything?x=1", ALLOW),
+    ("https://docs.example.org/en/", ALLOW),
+    ("https://api.docs.example.org/", ALLOW),
+    ("https://example.org/", None),
+    ("https://notexample.com/", None),
+    ("https://evil.example/", DENY),
+    ("https://a.b.evil.example/path", DENY),
+    ("HTTPS://Shared.example/safe/page#top", ALLOW),
+    ("https://shared.example/safe/other", None),
+    ("http://shared.example/login", DENY),
+    ("https://both.example/", DENY),
+    ("not a url", None),
+    # Typed without a scheme, as on the home form
+    ("evil.example", DENY),
+    ("  login.evil.example/verify ", DENY),
+    ("Example.com", ALLOW),
+    ("shared.example/login", DENY),
+    ("shared.example/safe/page", None),
+    ("example.org/", None),
+])
+def test_lookup(index, url, verdict):
+    assert index.lookup(url) == verdict
+
+
+def test_missing_or_empty_index_loads_as_none(tmp_path):
+    config = ReputationConfig(index_dir=str(tmp_path))
+    assert ReputationIndex.load(config) is None
+
+    build_reputation_index([], [], config)
+    assert ReputationIndex.load(config) is None
+
+
+def test_listed_urls_skip_the_model(index):
+    class NoModel:
+        def predict_proba(self, X):
+            raise AssertionError("listed URLs must not be scored")
+
+    pipeline = PredictPipeline(NoModel(), reputation=index)
+    allowed, denied = pipeline.predict(["https://example.com/", "https://evil.example/"])
+
+    assert (allowed.label, allowed.source, allowed.safe_status) == (0, ALLOW, "safe")
+    assert (denied.label, denied.source, denied.probability) == (1, DENY, 100.0)
+
+
+def test_listed_urls_are_not_probed(client, app_module, index, monkeypatch):
+    monkeypatch.setattr(app_module.predict_pipeline, "reputation", index)
+    submitted = []
+    monkeypatch.setattr(app_module.probe_engine, "submit", lambda url, **kwargs: submitted.append(url))
+
+    results = client.post("/api/predict/batch", json={"urls": ["https://evil.example/x"]}).get_json()["results"]
+    assert results[0]["source"] == DENY and "probe" not in results[0]
+
+    page = client.post("/predict", data={"urlinput": "https://example.com/"}).get_data(as_text=True)
+    assert "Security checks skipped" in page
+    assert submitted == []
@@ -0,0 +1,41 @@
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+import pytest
+import requests
+
+from benchmarks.stub_sites import StubSites
+
+
+@pytest.fixture
+def stubs():
+    with StubSites(hosts=2, https=False) as stub_sites:
+        yield stub_sites
+
+
+def test_each_listener_serves_one_profile(stubs):
+    profiles_by_port = defaultdict(set)
+    for url in stubs.urls(400, seed=1):
+        parts = urlsplit(url)
+        profiles_by_port[parts.port].add(parts.path.split("/")[1])
+
+    assert all(len(profiles) == 1 for profiles in profiles_by_port.values())
+    assert len(profiles_by_port) == 2 * len(stubs.profiles)
+
+
+def test_mix_weights_pick_listeners_of_those_profiles(stubs):
+    urls = stubs.urls(1000, mix={"secure": 4, "bare": 1}, seed=2)
+    counts = Counter(urlsplit(url).path.split("/")[1] for url in urls)
+
+    assert set(counts) == {"secure", "bare"}
+    assert 3 < counts["secure"] / counts["bare"] < 5
+    # The profile comes from the port, whatever the path says
+    bare_port = urlsplit(stubs.base_urls("bare")[0]).port
+    response = requests.get(f"http://127.0.0.1:{bare_port}/secure/login", timeout=5)
+    assert response.text == "stub bare\n"
+    assert "Strict-Transport-Security" not in response.headers
+
+
+def test_unknown_profiles_in_the_mix_are_rejected(stubs):
+    with pytest.raises(ValueError, match="nosuch"):
+        stubs.urls(10, mix={"secure": 1, "nosuch": 1})
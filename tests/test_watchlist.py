@@ -0,0 +1,224 @@
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+import pytest
+
+from src.pipeline.certificate import CertificateInfo
+from src.pipeline.predict_pipeline import Prediction
+from src.pipeline.probe import HeaderFinding, ProbeResult
+from src.pipeline.watchlist import (WatchlistConfig, WatchlistStore, WatchScheduler, next_scan_time, parse_since,
+                                    scan_phase, take_snapshot)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+@pytest.fixture
+def store(tmp_path):
+    return WatchlistStore(str(tmp_path / "watchlist.db"))
+
+
+def probe_result(url, hsts=True, issuer="Test CA"):
+    return ProbeResult(url=url, status_code=200, ssl_valid=True,
+                       certificate=CertificateInfo(host="example.com", port=443, valid=True, issuer=issuer,
+                                                   not_after=4102444800.0),
+                       findings={"hsts": HeaderFinding(present=hsts)})
+
+
+def test_snapshot_reports_headers_as_unknown_when_unreachable():
+    prediction = Prediction(url="https://example.com/", label=0, probability=1.0)
+    reachable = take_snapshot(prediction, probe_result("https://example.com/"))
+    unreachable = take_snapshot(prediction, ProbeResult(url="https://example.com/", error="refused",
+                                                        findings={"hsts": HeaderFinding(error=True)}))
+
+    assert reachable["verdict"] == "safe" and reachable["hsts"] is True
+    assert reachable["certificate_issuer"] == "Test CA" and not reachable["certificate_expiring"]
+    assert unreachable["reachable"] is False and unreachable["hsts"] is None
+
+
+def test_first_scan_is_a_baseline_and_later_scans_store_only_changes(store):
+    store.add(["https://example.com/"], 3600)
+
+    assert store.record_scan("https://example.com/", {"verdict": "safe", "hsts": True}, 100.0) == []
+    assert store.record_scan("https://example.com/", {"verdict": "safe", "hsts": True}, 200.0) == []
+    assert store.record_scan("https://example.com/", {"verdict": "unsafe", "hsts": True}, 300.0) == [
+        ("verdict", "safe", "unsafe")]
+    assert store.changes() == [{"id": 1, "url": "https://example.com/", "field": "verdict",
+                                "old": "safe", "new": "unsafe", "detected": 300.0}]
+    # Removed URLs are not recorded
+    store.remove(["https://example.com/"])
+    assert store.record_scan("https://example.com/", {"verdict": "safe"}, 400.0) == []
+
+
+def test_changes_can_be_filtered_and_paged(store):
+    urls = ["https://a.example/", "https://b.example/"]
+    store.add(urls, 3600)
+    for url in urls:
+        store.record_scan(url, {"n": 0}, 0.0)
+    for n in range(1, 4):
+        for url in urls:
+            store.record_scan(url, {"n": n}, float(n))
+
+    assert [change["new"] for change in store.changes(since=1.5)] == [2, 2, 3, 3]
+    assert [change["new"] for change in store.changes(url="https://b.example/")] == [1, 2, 3]
+    first_page = store.changes(limit=4)
+    second_page = store.changes(after_id=first_page[-1]["id"], limit=4)
+    assert len(first_page) == 4 and len(second_page) == 2
+
+
+def test_parse_since_accepts_epoch_and_iso_8601():
+    assert parse_since("1700000000") == 1700000000.0
+    assert parse_since("2026-10-01T00:00:00+00:00") == 1790812800.0
+    with pytest.raises(ValueError):
+        parse_since("yesterday")
+
+
+def test_scan_slots_are_fixed_and_spread_over_the_interval():
+    urls = [f"https://site{i}.example/" for i in range(2000)]
+    phases = [scan_phase(url, 3600) for url in urls]
+    # Roughly uniform: each tenth of the interval holds about a tenth of the URLs
+    buckets = [0] * 10
+    for phase in phases:
+        buckets[int(phase // 360)] += 1
+    assert min(buckets) > 150 and max(buckets) < 250
+
+    url = urls[0]
+    due = next_scan_time(url, 3600, 1_000_000.0)
+    assert 1_000_000.0 < due <= 1_003_600.0
+    assert (due - scan_phase(url, 3600)) % 3600 == pytest.approx(0, abs=1e-6)
+    assert next_scan_time(url, 3600, due) == pytest.approx(due + 3600)
+
+
+class FakePipeline:
+    reputation = None
+
+    def predict_one(self, url):
+        return Prediction(url=url, label=0, probability=1.0)
+
+
+class FakeEngine:
+    # Probes resolve immediately unless `hold` is set, in which case the test releases them
+    def __init__(self, hold=False):
+        self.hold = hold
+        self.submitted = []
+        self.futures = []
+
+    def submit(self, url):
+        self.submitted.append(url)
+        future = Future()
+        if self.hold:
+            self.futures.append((future, url))
+        else:
+            future.set_result(probe_result(url))
+        return future
+
+
+def test_scheduler_scans_each_url_once_per_interval(store):
+    urls = [f"https://site{i}.example/" for i in range(50)]
+    store.add(urls, 600)
+    engine = FakeEngine()
+    scheduler = WatchScheduler(store, FakePipeline(), engine, WatchlistConfig(refresh_interval=10_000))
+
+    # Simulated time runs ahead of the wall clock so only the given `now` counts
+    start = time.time() + 86400
+    scheduler.run_pending(now=start)
+    assert engine.submitted == []
+    # Scans follow their slots: about half of the URLs fall due in the first half of the interval
+    scheduler.run_pending(now=start + 300)
+    assert 10 < len(engine.submitted) < 40
+    scheduler.run_pending(now=start + 600)
+    assert sorted(engine.submitted) == sorted(urls)
+    scheduler.run_pending(now=start + 1200)
+    assert len(engine.submitted) == 2 * len(urls)
+    assert all(last_scanned is not None for _, _, last_scanned in store.targets())
+
+
+def test_scheduler_bounds_scans_in_flight(store):
+    urls = [f"https://site{i}.example/" for i in range(6)]
+    store.add(urls, 600)
+    engine = FakeEngine(hold=True)
+    scheduler = WatchScheduler(store, FakePipeline(), engine, WatchlistConfig(max_concurrency=2))
+    scheduler.refresh(now=0.0)
+
+    runner = threading.Thread(target=scheduler.run_pending, kwargs={"now": 10_000.0})
+    runner.start()
+    runner.join(timeout=0.3)
+    assert runner.is_alive() and len(engine.submitted) == 2
+
+    while runner.is_alive() or engine.futures:
+        if engine.futures:
+            future, url = engine.futures.pop(0)
+            future.set_result(probe_result(url))
+        runner.join(timeout=0.05)
+    assert sorted(engine.submitted) == sorted(urls)
+
+
+def test_scheduler_drops_removed_urls(store):
+    store.add(["https://a.example/", "https://b.example/"], 600)
+    engine = FakeEngine()
+    scheduler = WatchScheduler(store, FakePipeline(), engine)
+    scheduler.refresh(now=0.0)
+    store.remove(["https://a.example/"])
+    scheduler.refresh(now=0.0)
+    scheduler.run_pending(now=700.0)
+
+    assert engine.submitted == ["https://b.example/"]
+
+
+def test_cli_rejects_non_finite_intervals(tmp_path):
+    urls = tmp_path / "urls.txt"
+    urls.write_text("https://example.com/\n")
+    command = [sys.executable, "src/pipeline/watchlist.py", "--db", str(tmp_path / "w.db"), "add", str(urls)]
+
+    for interval in ("inf", "nan"):
+        rejected = subprocess.run(command + ["--interval", interval], cwd=PROJECT_ROOT, capture_output=True, text=True)
+        assert rejected.returncode == 2 and "finite" in rejected.stderr
+    assert subprocess.run(command + ["--interval", "120"], cwd=PROJECT_ROOT, capture_output=True).returncode == 0
+
+
+@pytest.fixture
+def watch_app(app_module, store, monkeypatch):
+    monkeypatch.setattr(app_module, "watchlist", store)
+    return app_module
+
+
+def test_watchlist_endpoints_register_remove_and_list_changes(client, watch_app, store):
+    urls = ["https://a.example/", "https://b.example/"]
+    assert client.post("/api/watchlist", json={"urls": urls, "interval": 120}).get_json() == {
+        "watching": 2, "interval": 120}
+    assert sorted(store.targets()) == [(url, 120.0, None) for url in urls]
+
+    store.record_scan(urls[0], {"hsts": True}, 10.0)
+    store.record_scan(urls[0], {"hsts": False}, 20.0)
+    page = client.get("/api/watchlist/changes", query_string={"since": "5", "url": urls[0]}).get_json()
+    assert [change["field"] for change in page["changes"]] == ["hsts"]
+    assert client.get("/api/watchlist/changes", query_string={"after_id": page["last_id"]}).get_json() == {
+        "changes": [], "last_id": page["last_id"]}
+    assert client.get("/api/watchlist/changes", query_string={"since": "soon"}).status_code == 400
+
+    store.record_scan(urls[0], {"hsts": True}, 30.0)
+    assert len(client.get("/api/watchlist/changes").get_json()["changes"]) == 2
+    assert len(client.get("/api/watchlist/changes", query_string={"limit": "1"}).get_json()["changes"]) == 1
+    for limit in ("0", "-1", "-1000"):
+        assert client.get("/api/watchlist/changes", query_string={"limit": limit}).status_code == 400
+
+    assert client.delete("/api/watchlist", json={"urls": urls}).get_json() == {"removed": 2}
+
+
+@pytest.mark.parametrize("interval", ["Infinity", "-Infinity", "NaN", "1e400", "10" + "0" * 400,
+                                      "59", "true", "\"3600\"", "null"],
+                         ids=["inf", "-inf", "nan", "float-overflow", "huge-int", "too-short", "bool", "string", "null"])
+def test_watchlist_rejects_bad_intervals(client, watch_app, store, interval):
+    body = '{"urls": ["https://example.com/"], "interval": %s}' % interval
+    response = client.post("/api/watchlist", data=body, content_type="application/json")
+
+    assert response.status_code == 400
+    assert len(store) == 0
+
+
+def test_watchlist_rejects_bad_url_lists(client, watch_app):
+    assert client.post("/api/watchlist", json={"urls": "https://example.com/"}).status_code == 400
+    assert client.post("/api/watchlist", json=["https://example.com/"]).status_code == 400